@@ -3,45 +3,284 @@ Definición de agentes que utilizan diferentes estrategias:
 - MinimaxAgent
 - ExpectimaxAgent
 - RandomAgent
+- MCTSAgent
 """
 
 import random
+import time
 from abc import ABC, abstractmethod
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional, Union
 from .board import Board, get_valid_moves
-from .minimax_search import find_best_move_minimax
-from .expectimax_search import find_best_move_expectimax
+from .bitboard import BitBoard, as_bitboard
+from .minimax_search import DRIVERS, find_best_move_minimax, iterative_deepening_minimax
+from .expectimax_search import find_best_move_expectimax, iterative_deepening_expectimax
 from .config import MAX_PLAYER, MIN_PLAYER
+from .transposition import TranspositionTable
+from .move_ordering import MoveOrderer
+from .parallel_search import ParallelSearcher
+from .opening_book import OpeningBook, book_move
+from .opponent_model import OpponentModel
+from .search_stats import SearchStats
+from .endgame_solver import EndgameSolver, win_distance
+from .geometry import Geometry
+from .mcts import MCTS, PARALLEL_MODES, root_parallel_search
+from .deadline import SearchTimeout, make_deadline
+
+# Casillas vacías con las que las interfaces y los torneos pasan al
+# EndgameSolver: con 12 resuelve en milisegundos en el tablero estándar
+ENDGAME_CELLS = 12
 
 
 class Agent(ABC):
     @abstractmethod
-    def get_move(self, board: Board) -> int:
-        """Devuelve la columna elegida por el agente."""
+    def get_move(self, board: Union[Board, BitBoard]) -> int:
+        """Devuelve la columna elegida por el agente (acepta Board o BitBoard)."""
         pass
 
 
 class RandomAgent(Agent):
-    def get_move(self, board: Board) -> int:
-        moves = get_valid_moves(board)
+    def get_move(self, board: Union[Board, BitBoard]) -> int:
+        if isinstance(board, BitBoard):
+            moves = board.get_valid_moves()
+        else:
+            moves = get_valid_moves(board)
         if not moves:
             raise ValueError("No hay movimientos válidos")
         return random.choice(moves)
 
 
 class MinimaxAgent(Agent):
-    def __init__(self, depth: int = 4, player_symbol: str = MAX_PLAYER):
+    """
+    Agente Minimax. Con 'time_limit_ms' busca por profundización iterativa
+    con ese presupuesto por jugada en lugar de usar 'depth';
+    'last_depth' guarda la profundidad alcanzada en la última jugada.
+    Con 'ordering' (por defecto) usa un MoveOrderer cuyas estadísticas
+    de la última búsqueda están en self.ordering.stats().
+    Con 'workers' > 0 la búsqueda a profundidad fija reparte la raíz entre
+    ese número de procesos (ver parallel_search.py); llamar a close() al
+    terminar para detenerlos.
+    Con 'book' consulta primero el libro de aperturas.
+    Con 'stats' instrumenta la búsqueda: tras cada get_move,
+    self.stats.summary() tiene nodos, podas, tiempos y variante principal
+    (la búsqueda paralela no se instrumenta).
+    Con 'endgame_cells' > 0 (desactivado por defecto; las interfaces y los
+    torneos usan ENDGAME_CELLS), cuando quedan como
+    mucho ese número de casillas vacías resuelve la posición de forma
+    exacta con un EndgameSolver en lugar de buscar con la heurística;
+    'last_score' y 'last_distance' guardan entonces la puntuación exacta y
+    las jugadas hasta la victoria (ver endgame_solver.py), o None si la
+    jugada no se resolvió. Con 'time_limit_ms' el solver usa el mismo
+    presupuesto y, si no termina, el tiempo que queda va a la búsqueda
+    con la heurística.
+    'geometry' es la variante de los Board que recibe (por defecto, sus
+    medidas con CONNECT en línea); una BitBoard ya lleva la suya.
+    'driver' elige cómo se busca: "alphabeta" (por defecto), "pvs" o
+    "mtdf" (ver minimax_search.DRIVERS); todos eligen la misma jugada. La
+    búsqueda paralela usa el mismo driver y ordena la raíz con el
+    MoveOrderer del agente, pero cada proceso tiene su propia tabla de
+    'tt_mb' (tt_mb=0 las desactiva también; ver parallel_search.py).
+    """
+
+    def __init__(self, depth: int = 4, player_symbol: str = MAX_PLAYER, tt_mb: float = 16,
+                 time_limit_ms: Optional[float] = None, ordering: bool = True,
+                 workers: int = 0, book: Optional[OpeningBook] = None, stats: bool = False,
+                 endgame_cells: int = 0, geometry: Optional[Geometry] = None,
+                 driver: str = "alphabeta"):
+        if driver not in DRIVERS:
+            raise ValueError(f"Driver de búsqueda desconocido: {driver}")
         self.depth = depth
         self.player_symbol = player_symbol  
+        # Tabla de transposiciones que se conserva entre jugadas (tt_mb=0 la desactiva)
+        self.tt = TranspositionTable(max_mb=tt_mb) if tt_mb else None
+        self.ordering = MoveOrderer() if ordering else None
+        self.time_limit_ms = time_limit_ms
+        self.last_depth = 0
+        # Cada proceso tiene su propia tabla de tt_mb (en total, workers * tt_mb)
+        self.parallel = ParallelSearcher(workers, ordering, tt_mb, driver) if workers > 0 else None
+        self.book = book
+        self.stats = SearchStats() if stats else None
+        self.endgame_cells = endgame_cells
+        self.solver = EndgameSolver() if endgame_cells > 0 else None
+        self.last_score: Optional[int] = None
+        self.last_distance: Optional[int] = None
+        self.geometry = geometry
+        self.driver = driver
     
-    def get_move(self, board: Board) -> int:
-        return find_best_move_minimax(board, self.depth, self.player_symbol)  
+    def close(self) -> None:
+        """Libera los procesos de la búsqueda paralela (si se usa)."""
+        if self.parallel is not None:
+            self.parallel.close()
+
+    def get_move(self, board: Union[Board, BitBoard]) -> int:
+        pos = as_bitboard(board, self.player_symbol, geometry=self.geometry)
+        move = book_move(self.book, pos, self.player_symbol)
+        if move is not None:
+            self.last_depth = self.book.depth
+            _book_stats(self.stats, move)
+            return move
+        self.last_score = self.last_distance = None
+        time_limit_ms = self.time_limit_ms
+        if self.solver is not None:
+            empty = pos.geometry.size - pos.moves
+            if empty <= self.endgame_cells:
+                deadline = None if time_limit_ms is None else make_deadline(time_limit_ms)
+                try:
+                    move, score = self.solver.best_move(pos, self.player_symbol, self.stats, deadline)
+                except SearchTimeout:
+                    time_limit_ms = max(0.0, (deadline - time.perf_counter()) * 1000.0)
+                else:
+                    self.last_depth = empty
+                    self.last_score = score
+                    self.last_distance = win_distance(pos.moves, score, pos.geometry.size)
+                    return move
+        if self.time_limit_ms is None and self.parallel is not None:
+            self.last_depth = self.depth
+            if self.stats is not None:
+                self.stats.reset()
+            return self.parallel.find_best_move(pos, self.depth, self.player_symbol, self.ordering)
+        if self.time_limit_ms is None:
+            self.last_depth = self.depth
+            return find_best_move_minimax(pos, self.depth, self.player_symbol, self.tt, self.ordering,
+                                          self.stats, self.driver)
+        move, self.last_depth = iterative_deepening_minimax(
+            pos, time_limit_ms, self.player_symbol, self.tt, ordering=self.ordering,
+            stats=self.stats, driver=self.driver)
+        return move
 
 
 class ExpectimaxAgent(Agent):
-    def __init__(self, depth: int = 4, player_symbol: str = MAX_PLAYER):  
+    """
+    Agente Expectimax. Igual que MinimaxAgent, acepta 'time_limit_ms' para
+    buscar con presupuesto de tiempo y deja en 'last_depth' la profundidad alcanzada.
+    Con 'book' consulta primero el libro de aperturas y con 'stats'
+    instrumenta la búsqueda (ver self.stats.summary()).
+    'pruning' elige la poda de los nodos "chance": "star1" (por defecto),
+    "star2" o None (sin poda; la jugada es la misma).
+    'opponent_model' sustituye al rival uniforme (p. ej. SoftmaxModel());
+    su caché se conserva entre jugadas.
+    'geometry' es la variante de los Board que recibe, como en MinimaxAgent.
+    """
+
+    def __init__(self, depth: int = 4, player_symbol: str = MAX_PLAYER,
+                 time_limit_ms: Optional[float] = None, book: Optional[OpeningBook] = None,
+                 stats: bool = False, pruning: Optional[str] = "star1",
+                 opponent_model: Optional[OpponentModel] = None,
+                 geometry: Optional[Geometry] = None):  
+        self.geometry = geometry
         self.depth = depth
         self.player_symbol = player_symbol
+        self.pruning = pruning
+        self.opponent_model = opponent_model
+        self.time_limit_ms = time_limit_ms
+        self.last_depth = 0
+        self.book = book
+        self.stats = SearchStats() if stats else None
+
+    def get_move(self, board: Union[Board, BitBoard]) -> int:
+        pos = as_bitboard(board, self.player_symbol, geometry=self.geometry)
+        move = book_move(self.book, pos, self.player_symbol)
+        if move is not None:
+            self.last_depth = self.book.depth
+            _book_stats(self.stats, move)
+            return move
+        if self.time_limit_ms is None:
+            self.last_depth = self.depth
+            return find_best_move_expectimax(pos, self.depth, self.player_symbol, self.stats,
+                                             self.pruning, self.opponent_model)
+        move, self.last_depth = iterative_deepening_expectimax(
+            pos, self.time_limit_ms, self.player_symbol, stats=self.stats, pruning=self.pruning,
+            model=self.opponent_model)
+        return move
+
+
+class MCTSAgent(Agent):
+    """
+    Agente Monte Carlo Tree Search (ver mcts.py): 'playouts' simulaciones
+    por jugada o, con 'time_limit_ms', las que quepan en ese tiempo.
+    'rollout' es la política de simulación ("tactical" o "random") y
+    'exploration' la constante de UCT. Con 'reuse' (por defecto) el árbol
+    se conserva entre jugadas.
+    Con 'workers' > 0 las simulaciones se reparten entre ese número de
+    procesos: 'parallel' = "root" (un árbol por proceso; no reutiliza el
+    árbol entre jugadas) o "leaf" (un árbol, simulaciones por lotes).
+    Llamar a close() al terminar para detener los procesos.
+    Con 'stats', self.stats cuenta una simulación como un nodo y guarda la
+    línea más visitada como variante principal; 'last_depth' es su longitud.
+    'seed' fija las simulaciones (por defecto, una al azar por agente).
+    'geometry' es la variante de los Board que recibe, como en MinimaxAgent.
+    """
+
+    def __init__(self, playouts: Optional[int] = 1000, player_symbol: str = MAX_PLAYER,
+                 time_limit_ms: Optional[float] = None, rollout: str = "tactical",
+                 exploration: float = 1.4, reuse: bool = True, workers: int = 0,
+                 parallel: str = "root", capacity: int = 500_000, stats: bool = False,
+                 seed: Optional[int] = None, geometry: Optional[Geometry] = None):
+        if parallel not in PARALLEL_MODES:
+            raise ValueError(f"Paralelismo desconocido: {parallel}")
+        self.playouts = playouts
+        self.player_symbol = player_symbol
+        self.time_limit_ms = time_limit_ms
+        self.rollout = rollout
+        self.exploration = exploration
+        self.reuse = reuse
+        self.workers = workers
+        self.parallel = parallel
+        self.capacity = capacity
+        self.seed = random.getrandbits(32) if seed is None else seed
+        self.tree = MCTS(exploration, rollout, capacity, self.seed)
+        self.stats = SearchStats() if stats else None
+        self.geometry = geometry
+        self.last_depth = 0
+        self.last_playouts = 0
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._searches = 0
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.workers)
+        return self._pool
+
+    def close(self) -> None:
+        """Libera los procesos de las simulaciones en paralelo (si se usan)."""
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+    def get_move(self, board: Union[Board, BitBoard]) -> int:
+        pos = as_bitboard(board, self.player_symbol, geometry=self.geometry)
+        if self.stats is not None:
+            self.stats.new_search(pos)
+        playouts = None if self.time_limit_ms is not None else self.playouts
+        if self.workers > 0 and self.parallel == "root":
+            # Cada búsqueda usa semillas nuevas para que los árboles no se repitan
+            self._searches += 1
+            move, _, self.last_playouts = root_parallel_search(
+                self._get_pool(), self.workers, pos, playouts, self.time_limit_ms,
+                self.exploration, self.rollout, self.capacity,
+                self.seed + self._searches * self.workers)
+            pv = [move]
+            if self.stats is not None:
+                self.stats.nodes = self.last_playouts
+        else:
+            if not self.reuse:
+                self.tree.reset()
+            deadline = make_deadline(self.time_limit_ms) if self.time_limit_ms is not None else None
+            executor = self._get_pool() if self.workers > 0 else None
+            move = self.tree.search(pos, playouts, deadline, self.stats, executor, self.workers)
+            self.last_playouts = self.tree.playouts
+            pv = self.tree.principal_variation()
+        self.last_depth = len(pv)
+        if self.stats is not None:
+            self.stats.pv = pv
+            self.stats.depth = len(pv)
+            self.stats.stop()
+        return move
+
 
-    def get_move(self, board: Board) -> int:
-        return find_best_move_expectimax(board, self.depth, self.player_symbol)
+def _book_stats(stats: Optional[SearchStats], move: int) -> None:
+    """Jugada del libro: sin búsqueda, la variante principal es solo esa jugada."""
+    if stats is not None:
+        stats.reset()
+        stats.pv = [move]
 
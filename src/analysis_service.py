@@ -0,0 +1,402 @@
+"""
+Servicio de análisis de posiciones (asyncio) y su cliente.
+
+El servidor atiende peticiones "mejor jugada para esta posición" de
+muchos clientes a la vez sobre TCP local. Cada petición y respuesta es
+una línea JSON:
+
+    -> {"id": 1, "position": "3342", "algorithm": "minimax", "depth": 6}
+    <- {"id": 1, "move": 3, "depth": 6, "nodes": 5120, "pv": [3, 2, ...],
+        "seconds": 0.41, "cached": false}
+
+- position: jugadas desde el tablero vacío (ver BitBoard.from_moves).
+- algorithm: "minimax" o "expectimax".
+- depth o time_ms: profundidad fija o presupuesto de tiempo.
+
+Las búsquedas (find_best_move_* / iterative_deepening_*) se hacen en un
+ProcessPoolExecutor para no bloquear el bucle de eventos. Las peticiones
+simultáneas de la misma posición y configuración esperan a una sola
+búsqueda, y los resultados se guardan en una caché LRU indexada por la
+clave canónica de la posición (una posición y su reflejo comparten
+entrada) y la configuración.
+
+Uso desde consola:
+    python -m src.analysis_service serve --port 8765 --workers 4
+    python -m src.analysis_service query 3342 --algorithm minimax --depth 6
+"""
+
+import argparse
+import asyncio
+import json
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Tuple
+from .config import ROWS, COLS
+from .bitboard import BitBoard, canonical_key
+from .minimax_search import find_best_move_minimax, iterative_deepening_minimax
+from .expectimax_search import find_best_move_expectimax, iterative_deepening_expectimax
+from .move_ordering import MoveOrderer
+from .search_stats import SearchStats
+from .transposition import TranspositionTable
+
+ALGORITHMS = ("minimax", "expectimax")
+DEFAULT_PORT = 8765
+
+# Clave de la caché: (clave canónica de la posición, algoritmo, profundidad, time_ms)
+CacheKey = Tuple[int, str, Optional[int], Optional[float]]
+
+
+class AnalysisError(Exception):
+    """Error devuelto por el servidor de análisis (petición inválida o fallo de la búsqueda)."""
+
+
+def run_analysis(position: str, algorithm: str, depth: Optional[int],
+                 time_ms: Optional[float]) -> Dict[str, object]:
+    """
+    Analiza 'position' en el proceso actual (es la tarea de los procesos
+    del pool). Devuelve la jugada, la profundidad alcanzada, los nodos,
+    la variante principal y los segundos de búsqueda.
+    """
+    pos = BitBoard.from_moves(position)
+    if pos.is_terminal():
+        raise ValueError("La posición ya es terminal")
+    stats = SearchStats()
+    player = pos.player
+    if algorithm == "minimax":
+        tt = TranspositionTable(max_mb=16)
+        if time_ms is None:
+            move = find_best_move_minimax(pos, depth, player, tt, MoveOrderer(), stats)
+            reached = depth
+        else:
+            move, reached = iterative_deepening_minimax(pos, time_ms, player, tt,
+                                                        ordering=MoveOrderer(), stats=stats)
+    else:
+        if time_ms is None:
+            move = find_best_move_expectimax(pos, depth, player, stats)
+            reached = depth
+        else:
+            move, reached = iterative_deepening_expectimax(pos, time_ms, player, stats=stats)
+    return {
+        "move": move,
+        "depth": reached,
+        "nodes": stats.nodes,
+        "pv": stats.pv or [move],
+        "seconds": stats.elapsed,
+    }
+
+
+def _mirror_result(result: Dict[str, object]) -> Dict[str, object]:
+    """Resultado con las jugadas reflejadas (columna c <-> COLS - 1 - c)."""
+    mirrored = dict(result)
+    mirrored["move"] = COLS - 1 - result["move"]
+    mirrored["pv"] = [COLS - 1 - col for col in result["pv"]]
+    return mirrored
+
+
+def _parse_request(request: Dict[str, object]) -> Tuple[str, str, Optional[int], Optional[float]]:
+    """Valida una petición y devuelve (posición, algoritmo, profundidad, time_ms)."""
+    position = str(request.get("position", ""))
+    algorithm = request.get("algorithm", "minimax")
+    if algorithm not in ALGORITHMS:
+        raise ValueError(f"Algoritmo desconocido: {algorithm}")
+    time_ms = request.get("time_ms")
+    depth = request.get("depth")
+    if time_ms is not None:
+        time_ms = float(time_ms)
+        if time_ms <= 0:
+            raise ValueError("time_ms debe ser positivo")
+        depth = None
+    else:
+        depth = int(depth) if depth is not None else 4
+        if not 1 <= depth <= ROWS * COLS:
+            raise ValueError(f"Profundidad fuera de rango: {depth}")
+    return position, algorithm, depth, time_ms
+
+
+class AnalysisServer:
+    """
+    Servidor de análisis.
+
+    - host / port: dirección de escucha (port=0 elige un puerto libre;
+      tras start() está en self.port).
+    - workers: procesos del pool de búsqueda.
+    - cache_size: número máximo de resultados en la caché LRU.
+
+    analyze() se puede llamar también directamente, sin pasar por la red.
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = DEFAULT_PORT,
+                 workers: int = 2, cache_size: int = 10_000):
+        if workers < 1:
+            raise ValueError("Se necesita al menos un proceso")
+        self.host = host
+        self.port = port
+        self.workers = workers
+        self.cache_size = cache_size
+        self._cache: "OrderedDict[CacheKey, Dict[str, object]]" = OrderedDict()
+        self._pending: Dict[CacheKey, "asyncio.Future"] = {}
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._connections = set()
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+    async def start(self) -> None:
+        """Arranca el pool y empieza a aceptar conexiones."""
+        self._pool = ProcessPoolExecutor(max_workers=self.workers)
+        self._server = await asyncio.start_server(self._handle_client, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+
+    async def serve_forever(self) -> None:
+        """Arranca el servidor (si hace falta) y atiende hasta que se cancele."""
+        if self._server is None:
+            await self.start()
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def close(self) -> None:
+        """Deja de aceptar conexiones, corta las abiertas y detiene el pool."""
+        if self._server is not None:
+            self._server.close()
+            for connection in self._connections:
+                connection.cancel()
+            await asyncio.gather(*self._connections, return_exceptions=True)
+            await self._server.wait_closed()
+            self._server = None
+        if self._pool is not None:
+            self._pool.shutdown(cancel_futures=True)
+            self._pool = None
+
+    async def __aenter__(self) -> "AnalysisServer":
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        await self.close()
+
+    def stats(self) -> Dict[str, float]:
+        """Tamaño de la caché, aciertos, fallos y peticiones que esperaron a otra búsqueda."""
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._cache),
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+    async def analyze(self, position: str, algorithm: str = "minimax", depth: Optional[int] = 4,
+                      time_ms: Optional[float] = None) -> Dict[str, object]:
+        """
+        Mejor jugada para 'position' (jugadas desde el tablero vacío).
+        Sirve el resultado desde la caché, se une a una búsqueda igual en
+        curso o lanza una nueva en el pool.
+        """
+        if self._pool is None:
+            raise RuntimeError("El servidor no está arrancado")
+        key, mirrored = canonical_key(BitBoard.from_moves(position))
+        cache_key = (key, algorithm, depth, time_ms)
+
+        cached = self._cache.get(cache_key)
+        if cached is not None:
+            self.hits += 1
+            self._cache.move_to_end(cache_key)
+            result = cached
+        elif cache_key in self._pending:
+            self.coalesced += 1
+            result = await asyncio.shield(self._pending[cache_key])
+        else:
+            self.misses += 1
+            future = asyncio.get_running_loop().create_future()
+            self._pending[cache_key] = future
+            try:
+                loop = asyncio.get_running_loop()
+                found = await loop.run_in_executor(self._pool, run_analysis, position,
+                                                   algorithm, depth, time_ms)
+                # Se guarda en la orientación canónica
+                result = _mirror_result(found) if mirrored else found
+                self._cache[cache_key] = result
+                if len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+                future.set_result(result)
+            except Exception as error:
+                future.set_exception(error)
+                future.exception()  # Marcada como leída aunque nadie más espere
+                raise
+            finally:
+                del self._pending[cache_key]
+                if not future.done():
+                    future.cancel()  # Búsqueda cancelada: tampoco esperan las unidas a ella
+            return dict(found, cached=False)
+
+        result = _mirror_result(result) if mirrored else result
+        return dict(result, cached=True)
+
+    async def _handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """Atiende una conexión: cada línea es una petición y se responde en cuanto termina."""
+        connection = asyncio.current_task()
+        self._connections.add(connection)
+        tasks = set()
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                task = asyncio.create_task(self._answer(line, writer))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+            if tasks:
+                await asyncio.gather(*tasks)
+        except asyncio.CancelledError:
+            # El servidor se está cerrando: se abandonan las peticiones en curso
+            for task in tasks:
+                task.cancel()
+        finally:
+            self._connections.discard(connection)
+            writer.close()
+
+    async def _answer(self, line: bytes, writer: asyncio.StreamWriter) -> None:
+        request_id = None
+        try:
+            request = json.loads(line)
+            request_id = request.get("id")
+            result = await self.analyze(*_parse_request(request))
+            response = dict(result, id=request_id)
+        except Exception as error:
+            response = {"id": request_id, "error": str(error)}
+        writer.write((json.dumps(response) + "\n").encode("utf-8"))
+        try:
+            await writer.drain()
+        except ConnectionError:
+            pass  # El cliente ya se fue
+
+
+class AnalysisClient:
+    """
+    Cliente del servidor de análisis. Una conexión admite muchas
+    peticiones a la vez: cada analyze() espera su propia respuesta.
+
+        async with AnalysisClient(port=8765) as client:
+            result = await client.analyze("3342", "minimax", depth=6)
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = DEFAULT_PORT):
+        self.host = host
+        self.port = port
+        self._reader: Optional[asyncio.StreamReader] = None
+        self._writer: Optional[asyncio.StreamWriter] = None
+        self._waiting: Dict[int, "asyncio.Future"] = {}
+        self._next_id = 0
+        self._listener: Optional["asyncio.Task"] = None
+
+    async def connect(self) -> None:
+        """Abre la conexión con el servidor."""
+        self._reader, self._writer = await asyncio.open_connection(self.host, self.port)
+        self._listener = asyncio.create_task(self._listen())
+
+    async def close(self) -> None:
+        """Cierra la conexión (las peticiones pendientes fallan con ConnectionError)."""
+        if self._writer is not None:
+            self._writer.close()
+            await self._writer.wait_closed()
+            self._writer = None
+        if self._listener is not None:
+            await self._listener
+            self._listener = None
+
+    async def __aenter__(self) -> "AnalysisClient":
+        await self.connect()
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        await self.close()
+
+    async def _listen(self) -> None:
+        """Reparte las respuestas del servidor entre las peticiones que las esperan."""
+        try:
+            while True:
+                line = await self._reader.readline()
+                if not line:
+                    break
+                response = json.loads(line)
+                future = self._waiting.pop(response.pop("id"), None)
+                if future is None or future.done():
+                    continue
+                if "error" in response:
+                    future.set_exception(AnalysisError(response["error"]))
+                else:
+                    future.set_result(response)
+        finally:
+            for future in self._waiting.values():
+                if not future.done():
+                    future.set_exception(ConnectionError("Conexión con el servidor cerrada"))
+            self._waiting.clear()
+
+    async def analyze(self, position: str, algorithm: str = "minimax", depth: Optional[int] = None,
+                      time_ms: Optional[float] = None) -> Dict[str, object]:
+        """
+        Pide la mejor jugada para 'position' con profundidad 'depth' (4 si
+        no se indica) o presupuesto 'time_ms'. Lanza AnalysisError si el
+        servidor rechaza la petición.
+        """
+        if self._writer is None:
+            raise RuntimeError("El cliente no está conectado")
+        self._next_id += 1
+        request = {"id": self._next_id, "position": position, "algorithm": algorithm,
+                   "depth": depth, "time_ms": time_ms}
+        future = asyncio.get_running_loop().create_future()
+        self._waiting[self._next_id] = future
+        self._writer.write((json.dumps(request) + "\n").encode("utf-8"))
+        await self._writer.drain()
+        return await future
+
+
+async def _serve(host: str, port: int, workers: int, cache_size: int) -> None:
+    server = AnalysisServer(host, port, workers, cache_size)
+    await server.start()
+    print(f"Servidor de análisis en {server.host}:{server.port} ({workers} procesos)")
+    try:
+        await server.serve_forever()
+    finally:
+        await server.close()
+
+
+async def _query(host: str, port: int, positions: List[str], algorithm: str,
+                 depth: Optional[int], time_ms: Optional[float]) -> None:
+    async with AnalysisClient(host, port) as client:
+        results = await asyncio.gather(*(client.analyze(p, algorithm, depth, time_ms) for p in positions),
+                                       return_exceptions=True)
+    for position, result in zip(positions, results):
+        print(f"{position or '(vacío)'}: {result}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Servicio de análisis de posiciones de Connect-4")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    commands = parser.add_subparsers(dest="command", required=True)
+    serve = commands.add_parser("serve", help="Arrancar el servidor")
+    serve.add_argument("--workers", type=int, default=2, help="Procesos de búsqueda")
+    serve.add_argument("--cache-size", type=int, default=10_000, help="Resultados en la caché LRU")
+    query = commands.add_parser("query", help="Analizar posiciones")
+    query.add_argument("positions", nargs="+", help='Jugadas desde el tablero vacío, p. ej. "3342"')
+    query.add_argument("--algorithm", choices=ALGORITHMS, default="minimax")
+    query.add_argument("--depth", type=int, default=None)
+    query.add_argument("--time-ms", type=float, default=None)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    if args.command == "serve":
+        try:
+            asyncio.run(_serve(args.host, args.port, args.workers, args.cache_size))
+        except KeyboardInterrupt:
+            pass
+    else:
+        asyncio.run(_query(args.host, args.port, args.positions, args.algorithm, args.depth, args.time_ms))
+        print(f"({time.perf_counter() - start:.2f} s)")
+
+
+if __name__ == "__main__":
+    main()
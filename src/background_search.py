@@ -0,0 +1,213 @@
+"""
+Búsqueda de la IA en un hilo aparte, con progreso y cancelación.
+
+Las interfaces no pueden llamar a agent.get_move() en su hilo principal:
+una búsqueda a profundidad 5-6 congela la ventana. BackgroundSearch
+lanza get_move() en un hilo y permite:
+
+- consultar el progreso mientras busca (profundidad completada, mejor
+  jugada hasta el momento y nodos), leyendo el SearchStats del agente,
+- cancelarla: el siguiente nodo que visite la búsqueda lanza
+  SearchCancelled y el hilo termina enseguida.
+
+El hilo nunca toca la interfaz: quien lo lanza consulta done() (en Tk,
+con root.after) y descarta el resultado si la búsqueda se canceló o ya
+no corresponde a la posición actual.
+
+Ponderer usa el mismo mecanismo para pensar durante el turno del rival.
+"""
+
+import threading
+from typing import Dict, List, Optional, Tuple, Union
+from .board import Board
+from .bitboard import BitBoard, as_bitboard
+from .agents import Agent
+from .search_stats import SearchStats
+
+
+class SearchCancelled(Exception):
+    """Se lanza dentro de la búsqueda cuando se cancela desde otro hilo."""
+
+
+class ProgressStats(SearchStats):
+    """
+    SearchStats que además comprueba en cada nodo si la búsqueda se
+    canceló. Se puede leer desde otro hilo mientras la búsqueda avanza.
+    """
+
+    def __init__(self):
+        self.cancel_event = threading.Event()
+        super().__init__()
+
+    def enter_moves(self, moves: int) -> int:
+        if self.cancel_event.is_set():
+            raise SearchCancelled()
+        return super().enter_moves(moves)
+
+    def best_so_far(self) -> Optional[int]:
+        """Jugada de la última iteración completa o, si no hay, la mejor de la iteración en curso."""
+        if self.pv:
+            return self.pv[0]
+        line = self._lines[0]
+        return line[0] if line else None
+
+
+class BackgroundSearch:
+    """
+    Una llamada a agent.get_move(board) en un hilo daemon.
+
+    El agente pasa a usar un ProgressStats como 'stats' (los agentes de
+    búsqueda lo aceptan; RandomAgent simplemente no da progreso). El
+    tablero se copia, así que la partida puede seguir cambiando mientras
+    se busca.
+    """
+
+    def __init__(self, agent: Agent, board: Union[Board, BitBoard]):
+        self.agent = agent
+        self.board = board.copy() if isinstance(board, BitBoard) else [row[:] for row in board]
+        self.stats = ProgressStats()
+        if hasattr(agent, "stats"):
+            agent.stats = self.stats
+        self.move: Optional[int] = None
+        self.error: Optional[Exception] = None
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self) -> None:
+        try:
+            self.move = self.agent.get_move(self.board)
+        except SearchCancelled:
+            pass
+        except Exception as error:  # Se entrega al hilo de la interfaz
+            self.error = error
+
+    def start(self) -> "BackgroundSearch":
+        """Lanza la búsqueda y devuelve self."""
+        self._thread.start()
+        return self
+
+    def cancel(self) -> None:
+        """Pide a la búsqueda que se detenga (no espera a que termine)."""
+        self.stats.cancel_event.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self.stats.cancel_event.is_set()
+
+    def done(self) -> bool:
+        """True cuando el hilo terminó (con jugada, con error o cancelado)."""
+        return not self._thread.is_alive()
+
+    def join(self, timeout: Optional[float] = None) -> None:
+        """Espera a que termine el hilo."""
+        self._thread.join(timeout)
+
+    def progress(self) -> Dict[str, Optional[int]]:
+        """Profundidad completada, mejor jugada hasta el momento y nodos visitados."""
+        return {
+            "depth": self.stats.depth,
+            "move": self.stats.best_so_far(),
+            "nodes": self.stats.nodes,
+        }
+
+
+class Ponderer:
+    """
+    Pensar durante el turno del rival ("pondering").
+
+    start(board) se llama cuando le toca al rival: en un hilo, el agente
+    busca su respuesta a cada jugada posible del rival, empezando por la
+    que predijo su última búsqueda (segunda jugada de la variante
+    principal) y siguiendo por el centro. Cada respuesta se guarda en una
+    caché por posición resultante, junto con su variante principal.
+
+    Cuando el rival juega, take(board) detiene el hilo y devuelve la
+    respuesta ya calculada si esa jugada se llegó a pensar (respuesta
+    instantánea) o None; en ese caso el agente busca normalmente, pero
+    con la tabla de transposiciones ya caliente si la usa (MinimaxAgent
+    la conserva entre jugadas). En un acierto el agente no busca, así que
+    sus estadísticas pasan a tener la variante principal pensada para esa
+    respuesta: la siguiente predicción sale de ella y no de una búsqueda
+    de hace dos jugadas.
+
+    El agente no se puede usar desde fuera mientras se piensa: take() o
+    stop() esperan a que el hilo termine antes de devolverlo.
+    """
+
+    def __init__(self, agent: Agent):
+        self.agent = agent
+        # Posición tras la jugada del rival -> (respuesta, profundidad, variante principal)
+        self._cache: Dict[int, Tuple[int, int, List[int]]] = {}
+        self._stats: Optional[ProgressStats] = None
+        self._saved_stats: Optional[SearchStats] = None
+        self._thread: Optional[threading.Thread] = None
+        self.hits = 0
+        self.misses = 0
+
+    def start(self, board: Union[Board, BitBoard]) -> None:
+        """Empieza a pensar las respuestas a cada jugada de quien mueve en 'board'."""
+        self.stop()
+        pos = self._position(board)
+        if pos.is_terminal():
+            return
+        self._cache = {}
+        self._saved_stats = getattr(self.agent, "stats", None)
+        self._stats = ProgressStats()
+        if hasattr(self.agent, "stats"):
+            self.agent.stats = self._stats
+        self._thread = threading.Thread(target=self._run, args=(pos, self._replies(pos)), daemon=True)
+        self._thread.start()
+
+    def _position(self, board: Union[Board, BitBoard]) -> BitBoard:
+        """'board' como BitBoard, con la geometría del agente si la tiene."""
+        return as_bitboard(board, geometry=getattr(self.agent, "geometry", None))
+
+    def _replies(self, pos: BitBoard) -> List[int]:
+        """Jugadas del rival en el orden en que se piensan: la predicha primero, después el centro."""
+        replies = [col for col in pos.geometry.center_order if pos.can_play(col)]
+        pv = self._saved_stats.pv if self._saved_stats is not None else []
+        if len(pv) > 1 and pv[1] in replies:
+            replies.remove(pv[1])
+            replies.insert(0, pv[1])
+        return replies
+
+    def _run(self, pos: BitBoard, replies: List[int]) -> None:
+        for col in replies:
+            pos.make_move(col)
+            if not pos.is_terminal():
+                try:
+                    move = self.agent.get_move(pos.copy())
+                except SearchCancelled:
+                    return
+                self._cache[pos.key()] = (move, self._stats.depth, list(self._stats.pv))
+            pos.undo_move()
+            if self._stats.cancel_event.is_set():
+                return
+
+    def stop(self) -> None:
+        """Deja de pensar, espera al hilo y devuelve al agente sus estadísticas."""
+        if self._thread is None:
+            return
+        self._stats.cancel_event.set()
+        self._thread.join()
+        self._thread = None
+        if hasattr(self.agent, "stats"):
+            self.agent.stats = self._saved_stats
+
+    def take(self, board: Union[Board, BitBoard]) -> Optional[int]:
+        """
+        Detiene el pondering y devuelve la respuesta ya pensada para
+        'board' (la posición tras la jugada del rival) o None.
+        """
+        self.stop()
+        pondered = self._cache.get(self._position(board).key())
+        self._cache = {}
+        if pondered is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        move, depth, pv = pondered
+        if self._saved_stats is not None:
+            self._saved_stats.reset()
+            self._saved_stats.depth = depth
+            self._saved_stats.pv = pv
+        return move
@@ -0,0 +1,168 @@
+"""
+Evaluación por lotes (vectorizada con NumPy) de muchas posiciones a la vez.
+
+Para generar datos o analizar partidas hay que evaluar miles de
+posiciones; evaluate() recorre un Board en bucles de Python. Aquí cada
+función recibe un lote de posiciones en uno de dos formatos:
+
+- Casillas: array (N, ROWS, COLS) de int8 con la misma orientación que
+  Board (fila 0 arriba): 0 vacía, 1 MAX_PLAYER, -1 MIN_PLAYER.
+- Bitboards empaquetados: array (N, 2) de uint64 con las fichas de MAX y
+  de MIN en el formato de BitBoard.bits.
+
+Las ventanas de la Geometry (69 de 4 casillas en el tablero estándar) se
+suman de una vez como índices sobre el lote, y una tabla (fichas propias,
+fichas del rival) -> puntos da los mismos pesos que score_window. Los
+resultados coinciden exactamente con heuristic_evaluation / evaluate
+posición a posición.
+
+Todas las funciones reciben 'geometry' (STANDARD por defecto) para
+evaluar otras variantes; el formato empaquetado necesita que el bitboard
+quepa en 64 bits ((filas + 1) * columnas <= 64).
+
+NumPy es opcional: el resto del proyecto no lo necesita y este módulo
+solo falla (ImportError) al llamar a sus funciones sin tenerlo instalado.
+"""
+
+from functools import lru_cache
+from typing import List, Sequence, Tuple, Union
+from .config import MAX_PLAYER, MIN_PLAYER
+from .board import Board
+from .bitboard import BitBoard, as_bitboard
+from .evaluation import _window_score
+from .geometry import Geometry, STANDARD
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover
+    np = None
+
+# Valores de las casillas en el formato (N, ROWS, COLS)
+CELL_EMPTY = 0
+CELL_MAX = 1
+CELL_MIN = -1
+
+
+@lru_cache(maxsize=None)
+def _tables(geometry: Geometry) -> Tuple[List[List[int]], List[int], List[int], List[List[int]]]:
+    """
+    Tablas de 'geometry' sobre casillas numeradas fila * cols + columna:
+    casillas de cada ventana (en el orden de Geometry.windows), bit de
+    BitBoard de cada casilla, casillas de la columna central y puntos de
+    una ventana según (fichas propias, fichas del rival).
+    """
+    cols = geometry.cols
+    connect = geometry.connect
+    windows = [[row * cols + col for row, col in window] for window in geometry.windows]
+    cell_bits = [geometry.bit(row, col) for row in range(geometry.rows) for col in range(cols)]
+    center_cells = [row * cols + geometry.center_col for row in range(geometry.rows)]
+    table = [[_window_score(a, b, connect) if a + b <= connect else 0 for b in range(connect + 1)]
+             for a in range(connect + 1)]
+    return windows, cell_bits, center_cells, table
+
+
+# Tablas del tablero estándar
+WINDOW_CELLS, CELL_BITS, CENTER_CELLS, WINDOW_TABLE = _tables(STANDARD)
+
+
+def _require_numpy() -> None:
+    """Lanza ImportError si NumPy no está instalado."""
+    if np is None:
+        raise ImportError("La evaluación por lotes necesita NumPy (pip install numpy)")
+
+
+def to_array(boards: Sequence[Union[Board, BitBoard]]) -> "np.ndarray":
+    """Convierte una lista de Board o BitBoard (de la misma variante) al formato (N, filas, columnas) int8."""
+    _require_numpy()
+    chars = np.array([board.to_board() if isinstance(board, BitBoard) else board for board in boards])
+    cells = np.where(chars == MAX_PLAYER, CELL_MAX, np.where(chars == MIN_PLAYER, CELL_MIN, CELL_EMPTY))
+    return cells.astype(np.int8)
+
+
+def pack_bitboards(boards: Sequence[Union[Board, BitBoard]],
+                   geometry: Geometry = STANDARD) -> "np.ndarray":
+    """Convierte una lista de Board o BitBoard de 'geometry' al formato empaquetado (N, 2) uint64."""
+    _require_numpy()
+    if geometry.column_bits * geometry.cols > 64:
+        raise ValueError(f"Un bitboard de {geometry.rows}x{geometry.cols} no cabe en 64 bits")
+    packed = np.zeros((len(boards), 2), dtype=np.uint64)
+    for i, board in enumerate(boards):
+        pos = board if isinstance(board, BitBoard) else as_bitboard(board, geometry=geometry)
+        if pos.geometry is not geometry:
+            raise ValueError(f"La posición {i} es de otra variante: {pos.geometry}")
+        packed[i, 0] = pos.bits[0]
+        packed[i, 1] = pos.bits[1]
+    return packed
+
+
+def _planes(positions: "np.ndarray", geometry: Geometry) -> Tuple["np.ndarray", "np.ndarray"]:
+    """Fichas de MAX y de MIN del lote como dos arrays (N, filas * columnas) de 0/1."""
+    _require_numpy()
+    positions = np.asarray(positions)
+    rows, cols = geometry.rows, geometry.cols
+    if positions.ndim == 3 and positions.shape[1:] == (rows, cols):
+        cells = positions.reshape(len(positions), rows * cols)
+        return (cells == CELL_MAX).view(np.int8), (cells == CELL_MIN).view(np.int8)
+    if positions.ndim == 2 and positions.shape[1] == 2:
+        shifts = np.array(_tables(geometry)[1], dtype=np.uint64)
+        packed = positions.astype(np.uint64)
+        max_plane = (packed[:, 0, None] >> shifts) & np.uint64(1)
+        min_plane = (packed[:, 1, None] >> shifts) & np.uint64(1)
+        return max_plane.astype(np.int8), min_plane.astype(np.int8)
+    raise ValueError(f"Se esperaba un array (N, {rows}, {cols}) o (N, 2), no {positions.shape}")
+
+
+def _window_counts(plane: "np.ndarray", geometry: Geometry) -> "np.ndarray":
+    """Fichas de 'plane' en cada ventana: array (N, ventanas)."""
+    return plane[:, _tables(geometry)[0]].sum(axis=2, dtype=np.int8)
+
+
+def _heuristic(own: "np.ndarray", opp: "np.ndarray", own_counts: "np.ndarray",
+               opp_counts: "np.ndarray", geometry: Geometry) -> "np.ndarray":
+    """heuristic_evaluation de las fichas 'own' frente a 'opp' para todo el lote (int64)."""
+    _, _, center_cells, window_table = _tables(geometry)
+    table = np.array(window_table, dtype=np.int64)
+    score = table[own_counts, opp_counts].sum(axis=1)
+    score += 3 * own[:, center_cells].sum(axis=1, dtype=np.int64)
+    return score
+
+
+def batch_heuristic(positions: "np.ndarray", player: str = MAX_PLAYER,
+                    geometry: Geometry = STANDARD) -> "np.ndarray":
+    """heuristic_evaluation(board, player) de cada posición del lote (array (N,) int64)."""
+    max_plane, min_plane = _planes(positions, geometry)
+    own, opp = (max_plane, min_plane) if player == MAX_PLAYER else (min_plane, max_plane)
+    return _heuristic(own, opp, _window_counts(own, geometry), _window_counts(opp, geometry), geometry)
+
+
+def batch_winner(positions: "np.ndarray", geometry: Geometry = STANDARD) -> "np.ndarray":
+    """
+    Ganador de cada posición del lote (array (N,) int8): CELL_MAX,
+    CELL_MIN o CELL_EMPTY si nadie tiene N en línea (MAX primero, como evaluate).
+    """
+    max_plane, min_plane = _planes(positions, geometry)
+    return _winner(_window_counts(max_plane, geometry), _window_counts(min_plane, geometry),
+                   geometry.connect)
+
+
+def _winner(max_counts: "np.ndarray", min_counts: "np.ndarray", connect: int) -> "np.ndarray":
+    max_wins = (max_counts == connect).any(axis=1)
+    min_wins = (min_counts == connect).any(axis=1)
+    return np.where(max_wins, CELL_MAX, np.where(min_wins, CELL_MIN, CELL_EMPTY)).astype(np.int8)
+
+
+def batch_evaluate(positions: "np.ndarray", geometry: Geometry = STANDARD) -> "np.ndarray":
+    """
+    evaluate() de cada posición del lote (array (N,) float64): +inf / -inf
+    si gana MAX / MIN, 0.0 si el tablero está lleno y si no la heurística de MAX.
+    """
+    max_plane, min_plane = _planes(positions, geometry)
+    max_counts = _window_counts(max_plane, geometry)
+    min_counts = _window_counts(min_plane, geometry)
+    values = _heuristic(max_plane, min_plane, max_counts, min_counts, geometry).astype(np.float64)
+    full = (max_plane + min_plane).sum(axis=1) == geometry.size
+    values[full] = 0.0
+    winner = _winner(max_counts, min_counts, geometry.connect)
+    values[winner == CELL_MAX] = np.inf
+    values[winner == CELL_MIN] = -np.inf
+    return values
@@ -0,0 +1,14 @@
+"""
+Benchmarks de rendimiento de Connect-4.
+
+Uso:
+    python -m src.benchmarks --out resultados.json
+    python -m src.benchmarks --quick --compare resultados.json
+
+Con --compare se marcan las métricas que empeoran más que el umbral
+respecto a un resultado guardado, y el proceso termina con código 1 si
+hay alguna regresión.
+"""
+
+from .positions import SUITES
+from .runner import run_benchmarks, compare_results, load_results, save_results
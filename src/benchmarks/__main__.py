@@ -0,0 +1,39 @@
+import argparse
+import sys
+from .runner import (
+    run_benchmarks,
+    compare_results,
+    load_results,
+    save_results,
+    print_results,
+    print_comparison,
+)
+
+SECTIONS = ("primitives", "search", "memory")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmarks de Connect-4")
+    parser.add_argument("--quick", action="store_true", help="Menos repeticiones y profundidades")
+    parser.add_argument("--only", default=",".join(SECTIONS),
+                        help="Secciones separadas por comas: " + ", ".join(SECTIONS))
+    parser.add_argument("--out", help="Guardar los resultados en este fichero JSON")
+    parser.add_argument("--compare", help="Comparar con un resultado guardado")
+    parser.add_argument("--threshold", type=float, default=0.10,
+                        help="Cambio relativo a partir del cual se marca (0.10 = 10%%)")
+    args = parser.parse_args()
+
+    results = run_benchmarks(args.quick, args.only.split(","))
+    print_results(results)
+    if args.out:
+        save_results(results, args.out)
+
+    if args.compare:
+        report = compare_results(load_results(args.compare), results, args.threshold)
+        print_comparison(report)
+        if report["regressions"]:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+"""
+Posiciones fijas para los benchmarks.
+
+Cada posición es la secuencia de columnas jugadas desde el tablero vacío
+(empieza MAX_PLAYER), en el formato de BitBoard.from_moves. No deben
+cambiarse: los resultados solo son comparables con la misma lista.
+"""
+
+from typing import Dict, List
+
+SUITES: Dict[str, List[str]] = {
+    # Primeras jugadas: árboles anchos y poco tácticos
+    "opening": [
+        "",
+        "3",
+        "33",
+        "332",
+        "3324",
+        "2233",
+    ],
+    # Medio juego: 12-16 fichas
+    "midgame": [
+        "211233221432114",
+        "1254036145342",
+        "0210033301513323",
+        "10411446215453",
+        "4013161461040330",
+        "656613434451450",
+    ],
+    # Posiciones con una victoria inmediata o un bloqueo obligado
+    "tactical": [
+        "12351001124231235264",
+        "16630434032634310232",
+        "3215215455232300155400",
+        "5514116013034663",
+        "31114146556553",
+        "103511341405424",
+    ],
+    # Cerca del final: 30 fichas o más
+    "endgame": [
+        "351312245242224551545364461010130",
+        "326155563321205154633345166122",
+        "522151246134434655224524501311",
+        "3651544315451611231333540524002",
+        "62134524506151640613415541006625",
+        "405340105304453355566326024413",
+    ],
+}
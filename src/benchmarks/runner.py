@@ -0,0 +1,272 @@
+"""
+Medición de rendimiento de las rutas críticas: primitivas del tablero,
+evaluación y búsqueda.
+
+Los resultados son un diccionario plano "métrica -> valor" que se guarda
+como JSON. El nombre de cada métrica indica en qué dirección es mejor:
+- *.ops_per_sec, *.nodes_per_sec, *.playouts_per_sec: más es mejor.
+- *.seconds, *.nodes, *.peak_bytes, *.node_ratio: menos es mejor.
+
+Minimax se mide con cada driver de la raíz: "minimax" (alfa-beta),
+"minimax_pvs" y "minimax_mtdf"; su node_ratio es la fracción de nodos de
+alfa-beta que necesita cada uno.
+
+Expectimax se mide sin poda ("expectimax") y con poda Star1/Star2
+("expectimax_star1", "expectimax_star2"); node_ratio es la fracción de
+nodos de expectimax sin poda que necesita cada variante.
+
+MCTS se mide por política de simulación ("mcts_tactical", "mcts_random"):
+simulaciones por segundo con un número fijo de playouts por posición.
+La fuerza por milisegundo frente a alfa-beta se mide con torneos a
+igual tiempo por jugada (ver tournament.py).
+"""
+
+import json
+import platform
+import sys
+import time
+import tracemalloc
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+from ..config import MAX_PLAYER
+from ..board import apply_move, check_winner
+from ..bitboard import BitBoard, has_four
+from ..evaluation import IncrementalBitBoard, heuristic_evaluation, evaluate_node
+from ..minimax_search import find_best_move_minimax
+from ..expectimax_search import find_best_move_expectimax
+from ..move_ordering import MoveOrderer
+from ..search_stats import SearchStats
+from ..mcts import MCTS, POLICIES
+from .. import batch_evaluation
+from ..transposition import TranspositionTable
+from .positions import SUITES
+
+# Profundidades medidas por algoritmo: (normal, rápido)
+SEARCH_DEPTHS = {
+    "minimax": ((2, 4, 6, 8), (2, 4, 6)),
+    "minimax_pvs": ((2, 4, 6, 8), (2, 4, 6)),
+    "minimax_mtdf": ((2, 4, 6, 8), (2, 4, 6)),
+    "expectimax": ((2, 3, 4), (2, 3)),
+    "expectimax_star1": ((2, 3, 4), (2, 3)),
+    "expectimax_star2": ((2, 3, 4), (2, 3)),
+}
+SEARCH_ALGORITHMS = tuple(SEARCH_DEPTHS)
+MCTS_PLAYOUTS = (2000, 500)  # Simulaciones por posición: (normal, rápido)
+PRIMITIVE_REPEAT = (200, 40)  # Vueltas sobre todas las posiciones: (normal, rápido)
+
+
+def suite_positions(suites: Optional[Sequence[str]] = None) -> List[BitBoard]:
+    """Posiciones de las suites indicadas (todas si es None)."""
+    names = SUITES if suites is None else suites
+    return [BitBoard.from_moves(moves) for name in names for moves in SUITES[name]]
+
+
+def _rate(repeat: int, items: Sequence, op: Callable) -> float:
+    """Operaciones por segundo de 'op(item)' aplicada 'repeat' veces a cada elemento."""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for item in items:
+            op(item)
+    return repeat * len(items) / (time.perf_counter() - start)
+
+
+def bench_primitives(quick: bool = False) -> Dict[str, float]:
+    """Operaciones por segundo de las primitivas del tablero y de la evaluación."""
+    repeat = PRIMITIVE_REPEAT[quick]
+    positions = suite_positions()
+    boards = [(pos.to_board(), pos.player) for pos in positions]
+    moves = [(board, col, player) for board, player in boards
+             for col in BitBoard.from_board(board, player).get_valid_moves()]
+    incremental = [(IncrementalBitBoard.from_bitboard(pos), col)
+                   for pos in positions for col in pos.get_valid_moves()]
+    plain = [(pos, col) for pos in positions for col in pos.get_valid_moves()]
+
+    def make_undo(item: Tuple[BitBoard, int]) -> None:
+        pos, col = item
+        pos.make_move(col)
+        pos.undo_move()
+
+    def child_node(item: Tuple[BitBoard, int]) -> None:
+        pos, col = item
+        pos.make_move(col)
+        evaluate_node(pos)
+        pos.undo_move()
+
+    results = {
+        "primitives.board.apply_move.ops_per_sec":
+            _rate(repeat, moves, lambda m: apply_move(*m)),
+        "primitives.board.check_winner.ops_per_sec":
+            _rate(repeat, boards, lambda b: check_winner(b[0], MAX_PLAYER)),
+        "primitives.evaluation.heuristic_evaluation.ops_per_sec":
+            _rate(repeat, boards, lambda b: heuristic_evaluation(b[0], MAX_PLAYER)),
+        "primitives.bitboard.make_undo.ops_per_sec":
+            _rate(repeat, plain, make_undo),
+        "primitives.bitboard.has_four.ops_per_sec":
+            _rate(repeat, positions, lambda p: has_four(p.bits[0])),
+        "primitives.incremental.make_undo.ops_per_sec":
+            _rate(repeat, incremental, make_undo),
+        "primitives.incremental.make_evaluate_undo.ops_per_sec":
+            _rate(repeat, incremental, child_node),
+    }
+    # Evaluación por lotes: posiciones por segundo (solo si NumPy está instalado)
+    if batch_evaluation.np is not None:
+        packed = batch_evaluation.pack_bitboards(positions)
+        results["primitives.batch_evaluation.batch_evaluate.ops_per_sec"] = \
+            _rate(repeat, [packed], batch_evaluation.batch_evaluate) * len(positions)
+    return results
+
+
+def _search(algorithm: str, pos: BitBoard, depth: int, stats: Optional[SearchStats] = None) -> None:
+    """
+    Busca 'pos' a 'depth' con la configuración por defecto de los agentes
+    ("minimax_<driver>" elige el driver de la raíz; "expectimax_<poda>" la
+    poda de expectimax; "expectimax" va sin poda).
+    """
+    if algorithm.startswith("minimax"):
+        driver = algorithm.partition("_")[2] or "alphabeta"
+        find_best_move_minimax(pos, depth, pos.player, TranspositionTable(max_mb=16), MoveOrderer(), stats,
+                               driver)
+    else:
+        pruning = algorithm.partition("_")[2] or None
+        find_best_move_expectimax(pos, depth, pos.player, stats, pruning)
+
+
+def bench_search(quick: bool = False, algorithms: Sequence[str] = SEARCH_ALGORITHMS) -> Dict[str, float]:
+    """
+    Tiempo hasta cada profundidad, nodos y nodos por segundo por suite y
+    algoritmo. El tiempo se mide sin instrumentar; los nodos se cuentan
+    con un SearchStats en una segunda pasada (la búsqueda es determinista).
+    """
+    results = {}
+    for algorithm in algorithms:
+        for depth in SEARCH_DEPTHS[algorithm][quick]:
+            for suite in SUITES:
+                seconds = 0.0
+                nodes = 0
+                for pos in suite_positions([suite]):
+                    start = time.perf_counter()
+                    _search(algorithm, pos, depth)
+                    seconds += time.perf_counter() - start
+                    stats = SearchStats()
+                    _search(algorithm, pos, depth, stats)
+                    nodes += stats.nodes
+                prefix = f"search.{algorithm}.{suite}.d{depth}"
+                results[f"{prefix}.seconds"] = seconds
+                results[f"{prefix}.nodes"] = nodes
+                results[f"{prefix}.nodes_per_sec"] = nodes / seconds
+                base = algorithm.partition("_")[0]
+                plain = results.get(f"search.{base}.{suite}.d{depth}.nodes")
+                if base != algorithm and plain:
+                    results[f"{prefix}.node_ratio"] = nodes / plain
+    return results
+
+
+def bench_mcts(quick: bool = False, policies: Sequence[str] = POLICIES) -> Dict[str, float]:
+    """
+    Tiempo y simulaciones por segundo de MCTS por suite y política, con
+    un árbol nuevo y semilla fija por posición. Las posiciones con una
+    sola jugada que no pierde no simulan y no cuentan.
+    """
+    results = {}
+    budget = MCTS_PLAYOUTS[quick]
+    for policy in policies:
+        for suite in SUITES:
+            seconds = 0.0
+            playouts = 0
+            for pos in suite_positions([suite]):
+                tree = MCTS(policy=policy, seed=0)
+                start = time.perf_counter()
+                tree.search(pos, budget)
+                seconds += time.perf_counter() - start
+                playouts += tree.playouts
+            if playouts:
+                prefix = f"search.mcts_{policy}.{suite}.p{budget}"
+                results[f"{prefix}.seconds"] = seconds
+                results[f"{prefix}.playouts_per_sec"] = playouts / seconds
+    return results
+
+
+def bench_memory(quick: bool = False, algorithms: Sequence[str] = ("minimax", "expectimax")) -> Dict[str, float]:
+    """Pico de memoria (tracemalloc) de buscar la suite de apertura a la mayor profundidad medida."""
+    results = {}
+    for algorithm in algorithms:
+        depth = SEARCH_DEPTHS[algorithm][quick][-1]
+        tracemalloc.start()
+        for pos in suite_positions(["opening"]):
+            _search(algorithm, pos, depth)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        results[f"memory.{algorithm}.opening.d{depth}.peak_bytes"] = peak
+    return results
+
+
+def run_benchmarks(quick: bool = False, sections: Sequence[str] = ("primitives", "search", "memory")) -> Dict:
+    """Ejecuta las secciones pedidas y devuelve {"meta": ..., "metrics": ...}."""
+    metrics: Dict[str, float] = {}
+    if "primitives" in sections:
+        metrics.update(bench_primitives(quick))
+    if "search" in sections:
+        metrics.update(bench_search(quick))
+        metrics.update(bench_mcts(quick))
+    if "memory" in sections:
+        metrics.update(bench_memory(quick))
+    return {
+        "meta": {
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "quick": quick,
+        },
+        "metrics": metrics,
+    }
+
+
+def higher_is_better(metric: str) -> bool:
+    """Dirección de mejora de una métrica según su nombre."""
+    return metric.endswith("_per_sec")
+
+
+def compare_results(baseline: Dict, current: Dict, threshold: float = 0.10) -> Dict[str, List[Tuple[str, float, float, float]]]:
+    """
+    Compara dos resultados de run_benchmarks. Devuelve las métricas que
+    empeoran o mejoran más de 'threshold' (fracción) como listas de
+    (métrica, valor base, valor actual, cambio relativo).
+    """
+    report = {"regressions": [], "improvements": []}
+    base_metrics = baseline["metrics"]
+    for metric, value in sorted(current["metrics"].items()):
+        base = base_metrics.get(metric)
+        if not base:
+            continue
+        change = (value - base) / base
+        gain = change if higher_is_better(metric) else -change
+        if gain < -threshold:
+            report["regressions"].append((metric, base, value, change))
+        elif gain > threshold:
+            report["improvements"].append((metric, base, value, change))
+    return report
+
+
+def print_results(results: Dict) -> None:
+    """Imprime todas las métricas de un resultado."""
+    for metric, value in results["metrics"].items():
+        print(f"{metric:<60} {value:>14.4f}" if isinstance(value, float) else f"{metric:<60} {value:>14}")
+
+
+def print_comparison(report: Dict[str, List[Tuple[str, float, float, float]]]) -> None:
+    """Imprime las regresiones y mejoras de compare_results."""
+    for title, key in (("Regresiones", "regressions"), ("Mejoras", "improvements")):
+        print(f"\n=== {title} ({len(report[key])}) ===")
+        for metric, base, value, change in report[key]:
+            print(f"{metric:<60} {base:>12.4g} -> {value:<12.4g} ({change:+.1%})")
+
+
+def load_results(path: str) -> Dict:
+    """Lee un resultado guardado con save_results."""
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_results(results: Dict, path: str) -> None:
+    """Guarda un resultado de run_benchmarks como JSON."""
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2, sort_keys=True)
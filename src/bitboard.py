@@ -0,0 +1,335 @@
+"""
+Representación del tablero de Connect-4 con bitboards.
+
+Cada jugador se guarda como un entero donde cada bit es una casilla.
+Las casillas se numeran por columnas: la columna c ocupa los bits
+c * (ROWS + 1) ... c * (ROWS + 1) + ROWS - 1 (bit más bajo = fila inferior).
+El bit extra de cada columna queda siempre a cero y actúa de separador,
+así los desplazamientos nunca "saltan" de una columna a la siguiente.
+
+Hacer y deshacer un movimiento es O(1) y la detección de 4 en línea se
+hace con desplazamientos y máscaras, sin recorrer casillas.
+
+Cada posición lleva su Geometry (filas, columnas y fichas en línea, ver
+geometry.py) con las máscaras y claves Zobrist de esa variante. Las
+constantes de este módulo son las de la geometría estándar (STANDARD).
+"""
+
+from typing import List, Optional, Tuple, Union
+from .config import EMPTY, MAX_PLAYER, MIN_PLAYER
+from .board import Board, board_geometry
+from .geometry import Geometry, STANDARD
+
+H = STANDARD.column_bits          # Altura de una columna incluyendo el separador
+PLAYERS = (MAX_PLAYER, MIN_PLAYER)  # Índice 0 = MAX, índice 1 = MIN
+
+# Máscaras precalculadas
+BOTTOM_MASK = STANDARD.bottom_mask
+BOARD_MASK = STANDARD.board_mask
+CENTER_MASK = STANDARD.center_mask
+
+# Claves Zobrist (ver Geometry): por (jugador, casilla), turno y posición reflejada
+ZOBRIST = STANDARD.zobrist
+ZOBRIST_SIDE = STANDARD.zobrist_side
+MIRROR_BIT = STANDARD.mirror_bit
+ZOBRIST_MIRROR = STANDARD.zobrist_mirror
+
+try:
+    popcount = int.bit_count  # Python 3.10+
+except AttributeError:  # pragma: no cover
+    def popcount(x: int) -> int:
+        return bin(x).count("1")
+
+
+# has_four(bits): True si las fichas 'bits' contienen 4 en línea.
+# winning_cells(bits, occupied): máscara de casillas vacías que completarían
+# un 4 en línea para las fichas 'bits' ('occupied' = todas las fichas del
+# tablero); no comprueba que sean jugables ya (eso es possible_mask).
+# Son las de la geometría estándar; en otra variante, pos.geometry.has_line
+# y pos.geometry.winning_cells.
+has_four = STANDARD.has_line
+winning_cells = STANDARD.winning_cells
+
+
+def mirror_key(key: int, geometry: Geometry = STANDARD) -> int:
+    """
+    Refleja horizontalmente una clave de posición (ver BitBoard.key):
+    la columna c pasa a ser la cols - 1 - c.
+    """
+    height = geometry.column_bits
+    cols = geometry.cols
+    column = (1 << height) - 1
+    mirrored = 0
+    for col in range(cols):
+        mirrored |= ((key >> (col * height)) & column) << ((cols - 1 - col) * height)
+    return mirrored
+
+
+def canonical_key(pos: "BitBoard") -> Tuple[int, bool]:
+    """
+    Clave canónica de la posición salvo simetría: la menor entre su clave
+    y la de su reflejo. Devuelve (clave, True si la menor es la reflejada);
+    en ese caso las jugadas guardadas con esa clave están reflejadas.
+    """
+    key = pos.key()
+    mirrored = mirror_key(key, pos.geometry)
+    if mirrored < key:
+        return mirrored, True
+    return key, False
+
+
+# Máscaras de las 69 ventanas de 4 casillas del tablero estándar
+WINDOW_MASKS = STANDARD.window_masks
+
+
+class BitBoard:
+    """
+    Posición de Connect-4 representada con dos enteros (uno por jugador)
+    y la altura de cada columna.
+
+    - bits[0] / bits[1]: fichas de MAX_PLAYER / MIN_PLAYER.
+    - heights[c]: índice del siguiente bit libre de la columna c.
+    - current: índice (0 o 1) del jugador al que le toca mover.
+    - hash: clave Zobrist de la posición (incluye el turno), incremental.
+    - mirror_hash: clave Zobrist de la posición reflejada, también incremental.
+    - geometry: dimensiones y tablas de la variante (ver geometry.py).
+    """
+
+    __slots__ = ("bits", "heights", "current", "moves", "history", "hash", "mirror_hash",
+                 "geometry")
+
+    def __init__(self, geometry: Geometry = STANDARD) -> None:
+        self.geometry = geometry
+        self.bits = [0, 0]
+        self.heights = [c * geometry.column_bits for c in range(geometry.cols)]
+        self.current = 0
+        self.moves = 0
+        self.history: List[int] = []
+        self.hash = 0
+        self.mirror_hash = 0
+
+    # --- Conversión desde / hacia Board ---
+
+    @classmethod
+    def from_board(cls, board: Board, player: Optional[str] = None,
+                   geometry: Optional[Geometry] = None) -> "BitBoard":
+        """
+        Construye la posición a partir de un Board (lista de listas).
+        'player' indica a quién le toca mover; si es None se deduce
+        contando fichas (MAX_PLAYER siempre empieza). 'geometry' fija la
+        variante; si es None se toman las medidas del tablero con
+        CONNECT en línea.
+        """
+        if geometry is None:
+            geometry = board_geometry(board)
+        elif (len(board), len(board[0])) != (geometry.rows, geometry.cols):
+            raise ValueError(f"El tablero es {len(board)}x{len(board[0])}, no "
+                             f"{geometry.rows}x{geometry.cols}")
+        pos = cls(geometry)
+        for col in range(geometry.cols):
+            for row in range(geometry.rows - 1, -1, -1):
+                cell = board[row][col]
+                if cell == EMPTY:
+                    break
+                index = 0 if cell == MAX_PLAYER else 1
+                pos.bits[index] |= 1 << pos.heights[col]
+                pos.heights[col] += 1
+                pos.moves += 1
+        if player is None:
+            pos.current = 0 if popcount(pos.bits[0]) <= popcount(pos.bits[1]) else 1
+        else:
+            pos.current = PLAYERS.index(player)
+        pos.hash = pos.compute_hash()
+        pos.mirror_hash = pos.compute_hash(mirror=True)
+        pos._refresh()
+        return pos
+
+    @classmethod
+    def from_moves(cls, moves: str, geometry: Geometry = STANDARD) -> "BitBoard":
+        """
+        Construye la posición jugando desde el tablero vacío la secuencia
+        de columnas 'moves' (p. ej. "3342"; empieza MAX_PLAYER).
+        Lanza ValueError si alguna jugada no es válida.
+        """
+        pos = cls(geometry)
+        for char in moves:
+            col = int(char)
+            if not 0 <= col < geometry.cols or not pos.can_play(col):
+                raise ValueError(f"Jugada inválida {char!r} en la secuencia {moves!r}")
+            if pos.is_terminal():
+                raise ValueError(f"La partida ya terminó antes de {char!r} en {moves!r}")
+            pos.make_move(col)
+        return pos
+
+    @classmethod
+    def from_bitboard(cls, other: "BitBoard") -> "BitBoard":
+        """Construye una posición de tipo 'cls' copiando otra BitBoard."""
+        pos = cls(other.geometry)
+        pos.bits = other.bits[:]
+        pos.heights = other.heights[:]
+        pos.current = other.current
+        pos.moves = other.moves
+        pos.history = other.history[:]
+        pos.hash = other.hash
+        pos.mirror_hash = other.mirror_hash
+        pos._refresh()
+        return pos
+
+    def _refresh(self) -> None:
+        """
+        Punto de extensión para subclases que guardan información derivada
+        de las fichas: se llama tras cargar una posición sin make_move.
+        """
+
+    def to_board(self) -> Board:
+        """Devuelve el Board equivalente a esta posición."""
+        geometry = self.geometry
+        board = [[EMPTY for _ in range(geometry.cols)] for _ in range(geometry.rows)]
+        for row in range(geometry.rows):
+            for col in range(geometry.cols):
+                bit = 1 << geometry.bit(row, col)
+                if self.bits[0] & bit:
+                    board[row][col] = MAX_PLAYER
+                elif self.bits[1] & bit:
+                    board[row][col] = MIN_PLAYER
+        return board
+
+    def copy(self) -> "BitBoard":
+        """Devuelve una copia independiente de la posición (del mismo tipo)."""
+        return type(self).from_bitboard(self)
+
+    def key(self) -> int:
+        """
+        Clave exacta y compacta de la posición (cabe en H * cols bits).
+        En cada columna, fichas de MAX + máscara de ocupadas da un valor
+        distinto para cada contenido posible. El turno no se incluye: se
+        supone el de una partida normal (MAX mueve con un número par de fichas).
+        """
+        return self.bits[0] + (self.bits[0] | self.bits[1])
+
+    def is_symmetric(self) -> bool:
+        """Devuelve True si la posición es igual a su reflejo izquierda/derecha."""
+        key = self.key()
+        return key == mirror_key(key, self.geometry)
+
+    def fold_symmetric(self, moves: List[int]) -> List[int]:
+        """
+        En una posición simétrica, quita de 'moves' las columnas cuyo
+        reflejo ya está en la lista (valen lo mismo); si no, o si la
+        heurística de la variante no es simétrica (Geometry.symmetric), la
+        devuelve igual.
+        """
+        if not self.geometry.symmetric or not self.is_symmetric():
+            return moves
+        last = self.geometry.cols - 1
+        return [c for c in moves if c <= last - c or (last - c) not in moves]
+
+    def compute_hash(self, mirror: bool = False) -> int:
+        """Calcula desde cero la clave Zobrist de la posición (o de su reflejo)."""
+        geometry = self.geometry
+        h = geometry.zobrist_side if self.current else 0
+        for index in (0, 1):
+            bits = self.bits[index]
+            keys = geometry.zobrist_mirror[index] if mirror else geometry.zobrist[index]
+            while bits:
+                low = bits & -bits
+                h ^= keys[low.bit_length() - 1]
+                bits ^= low
+        return h
+
+    # --- Movimientos ---
+
+    @property
+    def player(self) -> str:
+        """Símbolo del jugador al que le toca mover."""
+        return PLAYERS[self.current]
+
+    def can_play(self, col: int) -> bool:
+        """Devuelve True si la columna 'col' no está llena."""
+        return self.heights[col] < self.geometry.column_tops[col]
+
+    def get_valid_moves(self) -> List[int]:
+        """Devuelve la lista de columnas en las que aún se puede jugar."""
+        heights = self.heights
+        return [c for c, top in enumerate(self.geometry.column_tops) if heights[c] < top]
+
+    def possible_mask(self) -> int:
+        """Máscara con la casilla jugable (la más baja libre) de cada columna."""
+        geometry = self.geometry
+        return ((self.bits[0] | self.bits[1]) + geometry.bottom_mask) & geometry.board_mask
+
+    def winning_moves(self, index: int) -> List[int]:
+        """Columnas en las que el jugador 'index' ganaría colocando ficha ahora."""
+        geometry = self.geometry
+        cells = geometry.winning_cells(self.bits[index], self.bits[0] | self.bits[1])
+        heights = self.heights
+        return [c for c, top in enumerate(geometry.column_tops)
+                if cells >> heights[c] & 1 and heights[c] < top]
+
+    def make_move(self, col: int) -> None:
+        """Deja caer una ficha del jugador actual en 'col' (sin validar)."""
+        geometry = self.geometry
+        height = self.heights[col]
+        self.bits[self.current] ^= 1 << height
+        self.hash ^= geometry.zobrist[self.current][height] ^ geometry.zobrist_side
+        self.mirror_hash ^= geometry.zobrist_mirror[self.current][height] ^ geometry.zobrist_side
+        self.heights[col] = height + 1
+        self.history.append(col)
+        self.moves += 1
+        self.current ^= 1
+
+    def undo_move(self) -> None:
+        """Deshace el último movimiento hecho con make_move."""
+        geometry = self.geometry
+        col = self.history.pop()
+        self.current ^= 1
+        self.moves -= 1
+        height = self.heights[col] - 1
+        self.heights[col] = height
+        self.bits[self.current] ^= 1 << height
+        self.hash ^= geometry.zobrist[self.current][height] ^ geometry.zobrist_side
+        self.mirror_hash ^= geometry.zobrist_mirror[self.current][height] ^ geometry.zobrist_side
+
+    # --- Estado de la partida ---
+
+    def check_winner(self, player: str) -> bool:
+        """Comprueba si 'player' tiene N en línea."""
+        return self.geometry.has_line(self.bits[PLAYERS.index(player)])
+
+    def get_winner(self) -> Optional[str]:
+        """Devuelve MAX_PLAYER, MIN_PLAYER o None si no hay ganador."""
+        has_line = self.geometry.has_line
+        if has_line(self.bits[0]):
+            return MAX_PLAYER
+        if has_line(self.bits[1]):
+            return MIN_PLAYER
+        return None
+
+    def is_full(self) -> bool:
+        """Devuelve True si el tablero está lleno."""
+        return self.moves == self.geometry.size
+
+    def is_terminal(self) -> bool:
+        """Devuelve True si la partida terminó (alguien ganó o tablero lleno)."""
+        geometry = self.geometry
+        return (geometry.has_line(self.bits[0]) or geometry.has_line(self.bits[1])
+                or self.moves == geometry.size)
+
+
+def as_bitboard(board: Union[Board, BitBoard], player: Optional[str] = None,
+                cls: type = BitBoard, geometry: Optional[Geometry] = None) -> BitBoard:
+    """
+    Convierte 'board' a una posición de tipo 'cls' (BitBoard o subclase).
+    Las BitBoard se copian para que la búsqueda no modifique la posición
+    del llamador y conservan su geometría; 'geometry' es la variante de
+    un Board (por defecto, sus medidas con CONNECT en línea).
+    """
+    if isinstance(board, BitBoard):
+        pos = cls.from_bitboard(board)
+        if player is not None and pos.player != player:
+            side = pos.geometry.zobrist_side
+            pos.current ^= 1
+            pos.hash ^= side
+            pos.mirror_hash ^= side
+        return pos
+    return cls.from_board(board, player, geometry)
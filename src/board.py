@@ -1,17 +1,27 @@
 """
 Lógica del juego Connect-4: representación del tablero, movimientos,
 detección de ganador y estado terminal.
+
+Las medidas salen del propio tablero (filas = len(board)); las funciones
+que buscan líneas reciben 'connect' (fichas en línea para ganar, CONNECT
+por defecto) y recorren las ventanas precalculadas de su Geometry.
 """
 
 from typing import List, Optional
-from .config import ROWS, COLS, EMPTY, MAX_PLAYER, MIN_PLAYER
+from .config import ROWS, COLS, CONNECT, EMPTY, MAX_PLAYER, MIN_PLAYER
+from .geometry import Geometry, get_geometry
 
 Board = List[List[str]]
 
 
-def create_board() -> Board:
-    """Crea un tablero vacío de ROWS x COLS."""
-    return [[EMPTY for _ in range(COLS)] for _ in range(ROWS)]
+def create_board(rows: int = ROWS, cols: int = COLS) -> Board:
+    """Crea un tablero vacío de rows x cols (ROWS x COLS por defecto)."""
+    return [[EMPTY for _ in range(cols)] for _ in range(rows)]
+
+
+def board_geometry(board: Board, connect: int = CONNECT) -> Geometry:
+    """Geometría del tablero 'board' con 'connect' en línea."""
+    return get_geometry(len(board), len(board[0]), connect)
 
 
 def copy_board(board: Board) -> Board:
@@ -24,13 +34,13 @@ def print_board(board: Board) -> None:
     print("\nTablero:")
     for row in board:
         print(" ".join(row))
-    print(" ".join(map(str, range(COLS))))
+    print(" ".join(map(str, range(len(board[0])))))
     print()
 
 
 def get_valid_moves(board: Board) -> List[int]:
     """Devuelve la lista de columnas en las que aún se puede jugar."""
-    return [c for c in range(COLS) if board[0][c] == EMPTY]
+    return [c for c, cell in enumerate(board[0]) if cell == EMPTY]
 
 
 def apply_move(board: Board, col: int, player: str) -> Board:
@@ -39,7 +49,7 @@ def apply_move(board: Board, col: int, player: str) -> Board:
     Lanza ValueError si la columna está llena.
     """
     new_board = copy_board(board)
-    for row in range(ROWS - 1, -1, -1):
+    for row in range(len(board) - 1, -1, -1):
         if new_board[row][col] == EMPTY:
             new_board[row][col] = player
             return new_board
@@ -48,54 +58,35 @@ def apply_move(board: Board, col: int, player: str) -> Board:
 
 def is_full(board: Board) -> bool:
     """Devuelve True si el tablero está lleno (no hay movimientos posibles)."""
-    return all(board[0][c] != EMPTY for c in range(COLS))
-
-
-def check_winner(board: Board, player: str) -> bool:
-    """Comprueba si 'player' tiene 4 en línea (horizontal, vertical o diagonal)."""
+    return all(cell != EMPTY for cell in board[0])
 
-    # Horizontal
-    for row in range(ROWS):
-        for col in range(COLS - 3):
-            if all(board[row][col + i] == player for i in range(4)):
-                return True
-
-    # Vertical
-    for col in range(COLS):
-        for row in range(ROWS - 3):
-            if all(board[row + i][col] == player for i in range(4)):
-                return True
-
-    # Diagonal \
-    for row in range(ROWS - 3):
-        for col in range(COLS - 3):
-            if all(board[row + i][col + i] == player for i in range(4)):
-                return True
-
-    # Diagonal /
-    for row in range(3, ROWS):
-        for col in range(COLS - 3):
-            if all(board[row - i][col + i] == player for i in range(4)):
-                return True
 
+def check_winner(board: Board, player: str, connect: int = CONNECT) -> bool:
+    """
+    Comprueba si 'player' tiene 'connect' en línea (horizontal, vertical
+    o diagonal), recorriendo las ventanas precalculadas del tablero.
+    """
+    for window in board_geometry(board, connect).windows:
+        if all(board[row][col] == player for row, col in window):
+            return True
     return False
 
 
-def get_winner(board: Board) -> Optional[str]:
+def get_winner(board: Board, connect: int = CONNECT) -> Optional[str]:
     """
     Devuelve MAX_PLAYER, MIN_PLAYER si alguno ganó,
     o None si no hay ganador.
     """
-    if check_winner(board, MAX_PLAYER):
+    if check_winner(board, MAX_PLAYER, connect):
         return MAX_PLAYER
-    if check_winner(board, MIN_PLAYER):
+    if check_winner(board, MIN_PLAYER, connect):
         return MIN_PLAYER
     return None
 
 
-def is_terminal(board: Board) -> bool:
+def is_terminal(board: Board, connect: int = CONNECT) -> bool:
     """Devuelve True si la partida terminó (alguien ganó o tablero lleno)."""
-    if get_winner(board) is not None:
+    if get_winner(board, connect) is not None:
         return True
     if is_full(board):
         return True
@@ -4,6 +4,7 @@ Constantes de configuración del juego Connect-4.
 
 ROWS = 6          # Filas del tablero
 COLS = 7          # Columnas del tablero
+CONNECT = 4       # Fichas en línea para ganar
 EMPTY = "."       # Símbolo para casilla vacía
 MAX_PLAYER = "O"  # Agente MAX (IA principal)
 MIN_PLAYER = "X"  # Agente MIN (oponente)
@@ -0,0 +1,26 @@
+"""
+Control de tiempo para las búsquedas con presupuesto de tiempo.
+
+Las búsquedas reciben un 'deadline' (instante absoluto según
+time.perf_counter) y lanzan SearchTimeout cuando lo superan; la
+profundización iterativa captura la excepción y se queda con el
+resultado de la última iteración completa.
+"""
+
+import time
+from typing import Optional
+
+
+class SearchTimeout(Exception):
+    """Se lanza cuando una búsqueda agota su presupuesto de tiempo."""
+
+
+def make_deadline(time_limit_ms: float) -> float:
+    """Devuelve el instante (perf_counter) en que vence un presupuesto de 'time_limit_ms'."""
+    return time.perf_counter() + time_limit_ms / 1000.0
+
+
+def check_deadline(deadline: Optional[float]) -> None:
+    """Lanza SearchTimeout si 'deadline' ya pasó (None = sin límite)."""
+    if deadline is not None and time.perf_counter() > deadline:
+        raise SearchTimeout()
@@ -0,0 +1,264 @@
+"""
+Resolución exacta de finales de Connect-4.
+
+Con pocas casillas vacías se puede buscar hasta el final de la partida en
+lugar de cortar a una profundidad fija con la heurística. EndgameSolver
+calcula el valor teórico de la posición (victoria, derrota o tablas) y a
+cuántas jugadas está la victoria.
+
+Puntuación (desde el jugador que mueve), como en los solvers clásicos:
+- 0: tablas con juego perfecto.
+- > 0: gana; vale (ROWS * COLS + 2 - N) // 2, con N el número de fichas
+  del tablero tras su ficha ganadora (cuanto antes gana, más vale).
+- < 0: pierde; el mismo valor cambiado de signo para la ficha ganadora
+  del rival (cuanto más tarde pierde, menos negativo).
+
+La búsqueda es un negamax alfa-beta sobre los dos enteros del bitboard
+(sin hacer/deshacer jugadas) con:
+- ventana nula: solve() acota el valor por bisección con búsquedas
+  (alpha, alpha + 1), mucho más baratas que una ventana completa,
+- cotas de victoria/derrota: el valor nunca supera lo que se puede ganar
+  con las fichas que quedan, y esa cota recorta beta antes de buscar,
+- tabla de transposiciones con cotas superiores, que se conserva entre
+  llamadas,
+- solo jugadas que no pierden en el acto (no jugar debajo de una casilla
+  ganadora del rival; bloquear si tiene una sola amenaza inmediata),
+- orden por número de amenazas que crea cada jugada (centro ante empate).
+
+El solver trabaja en la geometría de la posición que recibe (tamaño del
+tablero y N en línea de su Geometry); al cambiar de variante vacía la tabla.
+
+Como las demás búsquedas, se puede cortar: con un 'deadline' lanza
+SearchTimeout al agotarlo, y con un 'stats' cuenta cada nodo con
+stats.enter_moves(), así que un ProgressStats cancelado (ver
+background_search.py) lo detiene con SearchCancelled. La tabla solo guarda
+nodos terminados, así que sigue siendo válida tras un corte.
+"""
+
+from typing import Dict, List, Optional, Tuple, Union
+from .config import MAX_PLAYER
+from .board import Board
+from .bitboard import BitBoard, as_bitboard, popcount
+from .geometry import Geometry, STANDARD
+from .search_stats import SearchStats
+from .deadline import check_deadline
+
+SIZE = STANDARD.size
+
+
+def win_distance(moves: int, score: int, size: int = SIZE) -> Optional[int]:
+    """
+    Jugadas (plies) que faltan hasta la ficha ganadora con juego perfecto,
+    para una posición con 'moves' fichas y puntuación 'score' de solve()
+    en un tablero de 'size' casillas.
+    None si son tablas. Es impar si gana el que mueve y par si gana el rival.
+    """
+    if score == 0:
+        return None
+    distance = size + 1 - 2 * abs(score) - moves
+    if (distance % 2 == 1) != (score > 0):
+        distance += 1
+    return distance
+
+
+class EndgameSolver:
+    """
+    Solver exacto de Connect-4 con tabla de transposiciones propia.
+
+    - max_entries: tamaño máximo de la tabla (se vacía al llenarse).
+    - nodes: nodos visitados en la última llamada a solve()/best_move().
+
+    Pensado para finales (pocas casillas vacías); desde posiciones con
+    muchas casillas libres la búsqueda puede tardar mucho.
+    """
+
+    def __init__(self, max_entries: int = 1_000_000):
+        self.max_entries = max_entries
+        self._table: Dict[int, int] = {}
+        self.nodes = 0
+        self._stats: Optional[SearchStats] = None
+        self._deadline: Optional[float] = None
+        self._use(STANDARD)
+
+    def clear(self) -> None:
+        """Vacía la tabla de transposiciones."""
+        self._table.clear()
+
+    def _use(self, geometry: Geometry) -> None:
+        """Prepara las tablas de 'geometry' (y vacía la de transposiciones si cambia)."""
+        self.geometry = geometry
+        self._table.clear()
+        self._size = geometry.size
+        self._possible = (geometry.bottom_mask, geometry.board_mask)
+        self._winning_cells = geometry.winning_cells
+        # Casillas de cada columna, en el orden en que se prueban las jugadas
+        self._columns = [(col, geometry.column_masks[col]) for col in geometry.center_order]
+
+    def _position(self, board: Union[Board, BitBoard], player: str) -> BitBoard:
+        """'board' como BitBoard con 'player' al turno, con las tablas de su geometría."""
+        pos = as_bitboard(board, player)
+        if pos.geometry is not self.geometry:
+            self._use(pos.geometry)
+        return pos
+
+    def _negamax(self, current: int, mask: int, moves: int, alpha: int, beta: int) -> int:
+        """
+        Valor de la posición para el jugador que mueve ('current' son sus
+        fichas y 'mask' todas) si está en (alpha, beta); si no, una cota:
+        <= alpha si no la supera, >= beta si la alcanza.
+        """
+        self.nodes += 1
+        if self._deadline is not None:
+            check_deadline(self._deadline)
+        if self._stats is not None:
+            self._stats.enter_moves(moves)
+        size = self._size
+        winning_cells = self._winning_cells
+        bottom, board_mask = self._possible
+        possible = (mask + bottom) & board_mask
+
+        # 1. Victoria inmediata
+        if winning_cells(current, mask) & possible:
+            return (size + 1 - moves) // 2
+
+        # 2. Jugadas que no pierden en el acto
+        opponent = current ^ mask
+        threats = winning_cells(opponent, mask)
+        forced = possible & threats
+        if forced:
+            if forced & (forced - 1):
+                return -((size - moves) // 2)  # Dos amenazas: pierde en la siguiente
+            possible = forced
+        possible &= ~(threats >> 1)
+        if not possible:
+            return -((size - moves) // 2)
+        if moves >= size - 2:
+            return 0  # Nadie puede ganar con las dos últimas fichas
+
+        # 3. Cotas: no se puede perder antes de dos jugadas ni ganar antes de tres
+        lower = -((size - 2 - moves) // 2)
+        if alpha < lower:
+            alpha = lower
+            if alpha >= beta:
+                return alpha
+        upper = (size - 1 - moves) // 2
+        key = current + mask
+        stored = self._table.get(key)
+        if stored is not None:
+            upper = stored
+        if beta > upper:
+            beta = upper
+            if alpha >= beta:
+                return beta
+
+        # 4. Hijos, primero los que crean más amenazas
+        children = []
+        for col, column in self._columns:
+            move = possible & column
+            if move:
+                created = popcount(winning_cells(current | move, mask))
+                children.append((-created, len(children), move))
+        children.sort()
+
+        for _, _, move in children:
+            score = -self._negamax(opponent, mask | move, moves + 1, -beta, -alpha)
+            if score >= beta:
+                return score
+            if score > alpha:
+                alpha = score
+
+        if len(self._table) >= self.max_entries:
+            self._table.clear()
+        self._table[key] = alpha
+        return alpha
+
+    def _solve(self, current: int, mask: int, moves: int) -> int:
+        """Valor exacto por bisección con búsquedas de ventana nula."""
+        size = self._size
+        bottom, board_mask = self._possible
+        if self._winning_cells(current, mask) & (mask + bottom) & board_mask:
+            return (size + 1 - moves) // 2
+        low = -((size - moves) // 2)
+        high = (size + 1 - moves) // 2
+        while low < high:
+            middle = low + (high - low) // 2
+            # Se prueba antes cerca de 0: las tablas y los finales rápidos son lo habitual
+            if middle <= 0 and int(low / 2) < middle:
+                middle = int(low / 2)
+            elif middle >= 0 and int(high / 2) > middle:
+                middle = int(high / 2)
+            result = self._negamax(current, mask, moves, middle, middle + 1)
+            if result <= middle:
+                high = result
+            else:
+                low = result
+        return low
+
+    def solve(self, board: Union[Board, BitBoard], player: str = MAX_PLAYER,
+              deadline: Optional[float] = None) -> int:
+        """
+        Puntuación exacta de 'board' para 'player', que es quien mueve.
+        Con 'deadline' lanza SearchTimeout si no termina a tiempo.
+        """
+        pos = self._position(board, player)
+        if pos.is_terminal():
+            raise ValueError("La posición ya es terminal")
+        self.nodes = 0
+        self._stats, self._deadline = None, deadline
+        return self._solve(pos.bits[pos.current], pos.bits[0] | pos.bits[1], pos.moves)
+
+    def best_move(self, board: Union[Board, BitBoard], player: str = MAX_PLAYER,
+                  stats: Optional[SearchStats] = None,
+                  deadline: Optional[float] = None) -> Tuple[int, int]:
+        """
+        Jugada óptima para 'player' y su puntuación exacta. Entre jugadas
+        igual de buenas elige la más central. 'stats' (opcional) recibe los
+        nodos, el tiempo y la jugada, y puede cancelar la búsqueda; con
+        'deadline' lanza SearchTimeout si no termina a tiempo.
+        """
+        pos = self._position(board, player)
+        if pos.is_terminal():
+            raise ValueError("No hay movimientos válidos")
+        if stats is not None:
+            stats.new_search(pos)
+        self.nodes = 0
+        self._stats, self._deadline = stats, deadline
+        current = pos.bits[pos.current]
+        mask = pos.bits[0] | pos.bits[1]
+        moves = pos.moves
+        best = self._solve(current, mask, moves)
+
+        # La primera jugada (en orden central) que consigue 'best'
+        possible = pos.possible_mask()
+        wins = self._winning_cells(current, mask) & possible
+        choice = None
+        for col, column in self._columns:
+            move = possible & column
+            if not move:
+                continue
+            if move & wins:
+                choice = col
+                break
+            if moves + 1 == self._size:
+                choice = col  # Última casilla: tablas
+                break
+            # Valor del hijo para el rival <= -best  <=>  la jugada alcanza 'best'
+            if self._negamax(current ^ mask, mask | move, moves + 1, -best, -best + 1) <= -best:
+                choice = col
+                break
+
+        if stats is not None:
+            stats.depth = self._size - moves
+            stats.pv = [choice]
+            stats.stop()
+        return choice, best
+
+    def principal_variation(self, board: Union[Board, BitBoard], player: str = MAX_PLAYER) -> List[int]:
+        """Partida óptima desde 'board' hasta el final (jugadas de ambos jugadores)."""
+        pos = as_bitboard(board, player)
+        line = []
+        while not pos.is_terminal():
+            col, _ = self.best_move(pos, pos.player)
+            line.append(col)
+            pos.make_move(col)
+        return line
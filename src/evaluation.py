@@ -3,85 +3,324 @@ Funciones de evaluación heurística para Connect-4.
 
 La idea es asignar una puntuación al tablero vista desde la perspectiva
 del jugador MAX_PLAYER (IA).
+
+Las ventanas son las líneas ganadoras de la Geometry de la partida (N
+casillas); los pesos son los mismos para cualquier N: N propias, N - 1
+o N - 2 con el resto vacío, y N - 1 del rival con una vacía.
 """
 
-from .config import ROWS, COLS, EMPTY, MAX_PLAYER, MIN_PLAYER
-from .board import Board, check_winner, is_full
+from functools import lru_cache
+from typing import List, Optional, Tuple
+from .config import CONNECT, EMPTY, MAX_PLAYER, MIN_PLAYER
+from .board import Board, board_geometry, check_winner, is_full
+from .bitboard import BitBoard, PLAYERS, popcount
+from .geometry import Geometry, STANDARD
 
 
 def score_window(window, player: str) -> int:
     """
-    Asigna una puntuación a una "ventana" de 4 celdas.
+    Asigna una puntuación a una "ventana" de N celdas (N = len(window)).
     Recompensa las formaciones del jugador y penaliza las del oponente.
     """
     opponent = MIN_PLAYER if player == MAX_PLAYER else MAX_PLAYER
+    n = len(window)
     score = 0
 
-    if window.count(player) == 4:
+    if window.count(player) == n:
         score += 1000
-    elif window.count(player) == 3 and window.count(EMPTY) == 1:
+    elif window.count(player) == n - 1 and window.count(EMPTY) == 1:
         score += 10
-    elif window.count(player) == 2 and window.count(EMPTY) == 2:
+    elif window.count(player) == n - 2 and window.count(EMPTY) == 2:
         score += 5
 
-    # Penalizar la posibilidad de que el oponente haga 4 en línea
-    if window.count(opponent) == 3 and window.count(EMPTY) == 1:
+    # Penalizar la posibilidad de que el oponente haga N en línea
+    if window.count(opponent) == n - 1 and window.count(EMPTY) == 1:
         score -= 80
 
     return score
 
 
-def heuristic_evaluation(board: Board, player: str) -> int:
+def heuristic_evaluation(board: Board, player: str, connect: int = CONNECT) -> int:
     """
-    Evalúa el tablero de forma heurística desde la perspectiva de 'player'.
+    Evalúa el tablero de forma heurística desde la perspectiva de 'player',
+    con ventanas de 'connect' casillas.
     """
+    geometry = board_geometry(board, connect)
     score = 0
 
     # 1. Recompensar fichas en la columna central
-    center_col_index = COLS // 2
-    center_col = [board[row][center_col_index] for row in range(ROWS)]
+    center_col = [row[geometry.center_col] for row in board]
     score += center_col.count(player) * 3
 
-    # 2. Horizontales
-    for row in range(ROWS):
-        for col in range(COLS - 3):
-            window = board[row][col:col + 4]
-            score += score_window(window, player)
-
-    # 3. Verticales
-    for col in range(COLS):
-        col_array = [board[row][col] for row in range(ROWS)]
-        for row in range(ROWS - 3):
-            window = col_array[row:row + 4]
-            score += score_window(window, player)
-
-    # 4. Diagonales \
-    for row in range(ROWS - 3):
-        for col in range(COLS - 3):
-            window = [board[row + i][col + i] for i in range(4)]
-            score += score_window(window, player)
-
-    # 5. Diagonales /
-    for row in range(3, ROWS):
-        for col in range(COLS - 3):
-            window = [board[row - i][col + i] for i in range(4)]
-            score += score_window(window, player)
+    # 2. Horizontales, verticales y diagonales (ventanas precalculadas)
+    for window in geometry.windows:
+        score += score_window([board[row][col] for row, col in window], player)
 
     return score
 
 
-def evaluate(board: Board) -> float:
+def evaluate(board: Board, connect: int = CONNECT) -> float:
     """
     Función de evaluación general:
     - +inf si gana MAX_PLAYER.
     - -inf si gana MIN_PLAYER.
     - heurística si no es estado terminal.
     """
-    if check_winner(board, MAX_PLAYER):
+    if check_winner(board, MAX_PLAYER, connect):
         return float("inf")
-    if check_winner(board, MIN_PLAYER):
+    if check_winner(board, MIN_PLAYER, connect):
         return -float("inf")
     if is_full(board):
         return 0.0  # Empate
-    return float(heuristic_evaluation(board, MAX_PLAYER))
+    return float(heuristic_evaluation(board, MAX_PLAYER, connect))
+
+
+# Estado de un nodo de búsqueda (ver evaluate_node)
+ONGOING = 0  # La partida sigue
+WIN = 1      # El jugador que acaba de mover ha ganado
+DRAW = 2     # Tablero lleno sin ganador
+
+
+def _window_score(own: int, opp: int, connect: int = CONNECT) -> int:
+    """Puntuación de score_window para una ventana con 'own' fichas propias y 'opp' del rival."""
+    score = 0
+    if opp == 0:
+        if own == connect:
+            score += 1000
+        elif own == connect - 1:
+            score += 10
+        elif own == connect - 2:
+            score += 5
+    if own == 0 and opp == connect - 1:
+        score -= 80
+    return score
+
+
+@lru_cache(maxsize=None)
+def gain_tables(connect: int = CONNECT) -> Tuple[List[List[int]], List[List[int]]]:
+    """
+    Cambio de puntuación al añadir una ficha a una ventana con (own, opp)
+    fichas, visto por el dueño de la ficha y por su rival.
+    """
+    size = connect + 1
+    gain_own = [[_window_score(a + 1, b, connect) - _window_score(a, b, connect)
+                 if a + b < connect else 0 for b in range(size)] for a in range(size)]
+    gain_opp = [[_window_score(b, a + 1, connect) - _window_score(b, a, connect)
+                 if a + b < connect else 0 for b in range(size)] for a in range(size)]
+    return gain_own, gain_opp
+
+
+@lru_cache(maxsize=None)
+def heuristic_bounds(geometry: Geometry = STANDARD) -> Tuple[int, int]:
+    """
+    Rango de heuristic_evaluation en posiciones no terminales: cada ventana
+    puntúa entre el mínimo y el máximo de score_window sin N en línea, y
+    la columna central suma como mucho 3 por casilla.
+    """
+    connect = geometry.connect
+    scores = [_window_score(a, b, connect) for a in range(connect) for b in range(connect + 1 - a)]
+    windows = len(geometry.windows)
+    return windows * min(scores), windows * max(scores) + 3 * geometry.rows
+
+
+@lru_cache(maxsize=None)
+def win_value(geometry: Geometry = STANDARD) -> float:
+    """Valor finito de una victoria (Expectimax): mayor que cualquier heurística."""
+    low, high = heuristic_bounds(geometry)
+    return float(max(-low, high) + 1)
+
+
+@lru_cache(maxsize=None)
+def mate_value(geometry: Geometry = STANDARD) -> int:
+    """
+    Base de las puntuaciones enteras de victoria de Minimax (negamax):
+    ganar con la ficha número N vale mate_value - N y perder así, lo mismo
+    con signo contrario. Cuanto antes se gana más vale, y cualquier
+    victoria (>= mate_value - casillas = win_value) supera a la heurística.
+    """
+    return int(win_value(geometry)) + geometry.size
+
+
+def mate_distance(score: int, moves: int, geometry: Geometry = STANDARD) -> Optional[int]:
+    """
+    Jugadas (plies) hasta la ficha ganadora para una puntuación 'score' de
+    negamax en una posición con 'moves' fichas, o None si 'score' no es una
+    victoria ni una derrota. Es impar si gana el que mueve y par si gana el rival.
+    """
+    mate = mate_value(geometry)
+    if abs(score) < mate - geometry.size:
+        return None
+    return mate - abs(score) - moves
+
+
+HEURISTIC_MIN, HEURISTIC_MAX = heuristic_bounds(STANDARD)
+WIN_VALUE = win_value(STANDARD)
+MATE_VALUE = mate_value(STANDARD)
+
+# Ventanas que contienen cada bit del tablero estándar
+CELL_WINDOWS = STANDARD.cell_windows
+
+
+class IncrementalBitBoard(BitBoard):
+    """
+    BitBoard que mantiene la heurística al día en cada make/undo.
 
+    Guarda cuántas fichas de cada jugador hay en cada ventana de N casillas
+    y el valor de heuristic_evaluation para los dos jugadores. Una ficha
+    solo toca las ventanas que pasan por su casilla (como mucho 16 con
+    N = 4, ver Geometry.cell_windows), así que evaluar una hoja pasa a ser O(1).
+    """
+
+    __slots__ = ("counts", "scores", "gains")
+
+    def __init__(self, geometry: Geometry = STANDARD) -> None:
+        super().__init__(geometry)
+        windows = len(geometry.window_masks)
+        self.counts = [[0] * windows, [0] * windows]
+        # Tablero vacío: con N = 2 cada ventana vacía ya vale (le faltan N - 2 fichas)
+        empty = _full_heuristic(0, 0, geometry)
+        self.scores = [empty, empty]
+        self.gains = gain_tables(geometry.connect)
+
+    def _refresh(self) -> None:
+        """Recalcula desde cero las cuentas por ventana y las puntuaciones."""
+        masks = self.geometry.window_masks
+        self.counts = [[popcount(bits & mask) for mask in masks] for bits in self.bits]
+        self.scores = [_full_heuristic(self.bits[i], self.bits[1 - i], self.geometry) for i in (0, 1)]
+
+    def make_move(self, col: int) -> None:
+        index = self.current
+        height = self.heights[col]
+        BitBoard.make_move(self, col)
+        self._update(index, height, 1)
+
+    def undo_move(self) -> None:
+        col = self.history[-1]
+        BitBoard.undo_move(self)
+        self._update(self.current, self.heights[col], -1)
+
+    def _update(self, index: int, bit: int, sign: int) -> None:
+        """Suma (sign=1) o quita (sign=-1) la ficha de 'index' en 'bit' de las ventanas."""
+        geometry = self.geometry
+        gain_own, gain_opp = self.gains
+        own = self.counts[index]
+        opp = self.counts[1 - index]
+        gain_self = 3 if geometry.center_mask >> bit & 1 else 0
+        gain_other = 0
+        if sign > 0:
+            for w in geometry.cell_windows[bit]:
+                a = own[w]
+                b = opp[w]
+                gain_self += gain_own[a][b]
+                gain_other += gain_opp[a][b]
+                own[w] = a + 1
+        else:
+            for w in geometry.cell_windows[bit]:
+                a = own[w] - 1
+                b = opp[w]
+                gain_self += gain_own[a][b]
+                gain_other += gain_opp[a][b]
+                own[w] = a
+        scores = self.scores
+        scores[index] += sign * gain_self
+        scores[1 - index] += sign * gain_other
+
+    def peek_scores(self, col: int) -> List[int]:
+        """Valor de 'scores' si el jugador que mueve jugara 'col' (sin modificar la posición)."""
+        geometry = self.geometry
+        gain_own, gain_opp = self.gains
+        index = self.current
+        bit = self.heights[col]
+        own = self.counts[index]
+        opp = self.counts[1 - index]
+        gain_self = 3 if geometry.center_mask >> bit & 1 else 0
+        gain_other = 0
+        for w in geometry.cell_windows[bit]:
+            a = own[w]
+            b = opp[w]
+            gain_self += gain_own[a][b]
+            gain_other += gain_opp[a][b]
+        scores = list(self.scores)
+        scores[index] += gain_self
+        scores[1 - index] += gain_other
+        return scores
+
+
+def _full_heuristic(own: int, opp: int, geometry: Geometry = STANDARD) -> int:
+    """
+    Heurística completa (recorriendo todas las ventanas, 69 en el tablero
+    estándar) para las fichas 'own' frente a 'opp'.
+    """
+    # 1. Fichas en la columna central
+    score = popcount(own & geometry.center_mask) * 3
+
+    # 2. Ventanas de N casillas (mismos pesos que score_window)
+    connect = geometry.connect
+    for mask in geometry.window_masks:
+        own_cells = own & mask
+        opp_cells = opp & mask
+        if not opp_cells:
+            count = popcount(own_cells)
+            if count == connect:
+                score += 1000
+            elif count == connect - 1:
+                score += 10
+            elif count == connect - 2:
+                score += 5
+        elif not own_cells and popcount(opp_cells) == connect - 1:
+            score -= 80
+
+    return score
+
+
+def heuristic_evaluation_bitboard(pos: BitBoard, player: str) -> int:
+    """
+    Misma heurística que heuristic_evaluation pero sobre un BitBoard:
+    cada ventana se evalúa con máscaras en lugar de construir listas.
+    Con un IncrementalBitBoard la puntuación ya está calculada.
+    """
+    index = PLAYERS.index(player)
+    if isinstance(pos, IncrementalBitBoard):
+        return pos.scores[index]
+    return _full_heuristic(pos.bits[index], pos.bits[1 - index], pos.geometry)
+
+
+def evaluate_bitboard(pos: BitBoard) -> float:
+    """
+    Equivalente de evaluate() para un BitBoard
+    (siempre desde la perspectiva de MAX_PLAYER).
+    """
+    has_line = pos.geometry.has_line
+    if has_line(pos.bits[0]):
+        return float("inf")
+    if has_line(pos.bits[1]):
+        return -float("inf")
+    if pos.is_full():
+        return 0.0  # Empate
+    return float(heuristic_evaluation_bitboard(pos, MAX_PLAYER))
+
+
+def evaluate_node(pos: BitBoard) -> Tuple[int, float]:
+    """
+    Estado (ONGOING, WIN o DRAW) y valor de un nodo de búsqueda en una sola
+    pasada. El valor es el de evaluate_bitboard (perspectiva de MAX_PLAYER).
+
+    Solo puede haber ganado el jugador que acaba de mover, y en la búsqueda
+    la posición anterior no tenía ganador (se habría cortado ahí), así que
+    cualquier N en línea de sus fichas pasa por la ficha recién colocada:
+    basta comprobar sus fichas, no las del rival.
+    """
+    geometry = pos.geometry
+    if pos.history:
+        mover = pos.current ^ 1
+        if geometry.has_line(pos.bits[mover]):
+            return WIN, (float("inf") if mover == 0 else -float("inf"))
+    else:
+        # Posición cargada sin historial: comprobar a los dos jugadores
+        if geometry.has_line(pos.bits[0]):
+            return WIN, float("inf")
+        if geometry.has_line(pos.bits[1]):
+            return WIN, -float("inf")
+    if pos.moves == geometry.size:
+        return DRAW, 0.0
+    return ONGOING, float(heuristic_evaluation_bitboard(pos, MAX_PLAYER))
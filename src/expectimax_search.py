@@ -5,72 +5,456 @@ Diferencia conceptual:
 - En minimax, el oponente (MIN) elige siempre el peor caso para MAX.
 - En expectimax, el oponente se modela como agente estocástico:
   elige sus movimientos posibles de forma aleatoria (distribución uniforme).
+
+Igual que minimax, la búsqueda trabaja sobre un IncrementalBitBoard con make/undo, y
+también tiene un modo con presupuesto de tiempo (iterative_deepening_expectimax)
+y acepta un SearchStats opcional (ver search_stats.py).
+
+Las victorias valen ±WIN_VALUE (un valor finito por encima de cualquier
+heurística; en otra geometría, win_value(pos.geometry)) en lugar de ±inf: así el promedio de un nodo "chance" con una
+victoria y una derrota entre sus hijos está definido, y todos los valores
+quedan acotados en [-WIN_VALUE, WIN_VALUE].
+
+Con esas cotas, star_expectimax poda los nodos "chance" (Star1: el
+promedio ya no puede entrar en la ventana alfa-beta aunque los hijos que
+faltan saquen el valor extremo; Star2: antes se sondea una jugada de cada
+hijo MAX para obtener cotas inferiores). Devuelve la misma jugada y el
+mismo valor que expectimax con menos nodos (la mitad a profundidad 5).
+
+La raíz solo aporta una cota inferior (alpha), así que los sondeos de
+Star2 casi nunca podan y Star1 es la opción por defecto.
+
+El análisis de amenazas (ver threats.py) resuelve sin buscar los nodos
+MAX con una victoria inmediata y los nodos "chance" en los que cualquier
+jugada del rival deja a MAX una victoria inmediata. Se aplica en todos
+los nodos que no son hoja, no solo cerca de ellas: esos nodos valen
+WIN_VALUE en lugar de la media de sus hijos, así que los valores a
+profundidad fija (y a veces la jugada) cambian a cualquier profundidad.
+
+Con un OpponentModel (ver opponent_model.py) los nodos "chance" usan su
+distribución de jugadas en lugar de la uniforme y se saltan las jugadas
+por debajo de su umbral de probabilidad.
 """
 
+import time
+from typing import Dict, List, Optional, Tuple, Union
 from .config import MAX_PLAYER, MIN_PLAYER
-from .board import Board, get_valid_moves, apply_move, is_terminal
-from .evaluation import evaluate
+from .board import Board
+from .bitboard import BitBoard, as_bitboard
+from .deadline import SearchTimeout, make_deadline, check_deadline
+from .evaluation import IncrementalBitBoard, evaluate_node, win_value, ONGOING, WIN
+from .opponent_model import OpponentModel
+from .search_stats import SearchStats
+from .threats import immediate_wins, safe_moves
+
+# En la raíz, diferencias menores que esto son ruido de redondeo y cuentan
+# como empate (con probabilidades no enteras dos jugadas equivalentes pueden
+# diferir en el último bit, y la poda no debe decidir ese empate al revés)
+_TIE_EPSILON = 1e-9
+
+
+def _node_value(pos: BitBoard, player: str) -> Tuple[int, float]:
+    """Estado del nodo y su valor desde la perspectiva de 'player' (victorias = ±WIN_VALUE)."""
+    status, val = evaluate_node(pos)
+    if status == WIN:
+        val = win_value(pos.geometry) if val > 0 else -win_value(pos.geometry)
+    if player == MIN_PLAYER:  # Si somos MIN, invertir
+        val = -val
+    return status, val
+
 
+def _forced_value(pos: BitBoard, maximizing: bool) -> Optional[float]:
+    """
+    Valor (WIN_VALUE) de un nodo que el análisis de amenazas (threats.py)
+    resuelve haga lo que haga el rival, o None: un nodo MAX con una
+    victoria inmediata, o un nodo "chance" en el que el rival no gana ya y
+    todas sus jugadas dejan a MAX una victoria inmediata. Las derrotas no
+    cuentan: el rival estocástico puede no aprovecharlas.
+    """
+    if immediate_wins(pos):
+        return win_value(pos.geometry) if maximizing else None
+    if not maximizing and not safe_moves(pos):
+        return win_value(pos.geometry)
+    return None
 
-def expectimax(board: Board, depth: int, maximizing: bool, player: str) -> float:
+
+def _chance_moves(pos: BitBoard, model: Optional[OpponentModel]) -> Tuple[List[int], List[float]]:
+    """Jugadas del rival y su peso: 1 cada una (uniforme) o la probabilidad de 'model'."""
+    if model is None:
+        moves = pos.get_valid_moves()
+        return moves, [1.0] * len(moves)
+    policy = model.policy(pos)
+    return [col for col, _ in policy], [p for _, p in policy]
+
+
+def _mean(total_value: float, total_weight: float, win: float) -> float:
+    """
+    Media ponderada de un nodo "chance". Con probabilidades que no suman
+    exactamente 1 el redondeo podría dejarla un poco fuera de
+    [-win, win]; se recorta para que las cotas sigan valiendo.
+    """
+    return min(win, max(-win, total_value / total_weight))
+
+
+def expectimax(pos: BitBoard, depth: int, maximizing: bool, player: str,
+               deadline: Optional[float] = None, stats: Optional[SearchStats] = None,
+               model: Optional[OpponentModel] = None) -> float:
     """
     Expectimax recursivo.
     - Nodos MAX: eligen el máximo de los hijos.
-    - Nodos "chance" (oponente): valor esperado (promedio) de los hijos.
+    - Nodos "chance" (oponente): valor esperado (promedio) de los hijos,
+      uniforme o ponderado con la distribución de 'model'.
     
-    Recibe 'player' para saber para quién optimizar
+    Recibe 'player' para saber para quién optimizar.
+    Si se pasa 'deadline', lanza SearchTimeout al superarlo.
+    Si se pasa 'stats', registra nodos, tiempos y variante principal (en
+    los nodos "chance" la línea sigue la respuesta más peligrosa).
     """
+    if deadline is not None:
+        check_deadline(deadline)
+    if stats is not None:
+        ply = stats.enter(pos)
+        start = time.perf_counter()
+
     # Evaluación desde perspectiva del jugador
-    val = evaluate(board)
-    if player == MIN_PLAYER:  # Si somos MIN, invertir
-        val = -val
+    status, val = _node_value(pos, player)
+    if stats is not None:
+        stats.eval_time += time.perf_counter() - start
 
-    if depth == 0 or is_terminal(board):
+    if depth == 0 or status != ONGOING:
+        if stats is not None:
+            stats.leaves += 1
         return val
+    forced = _forced_value(pos, maximizing)
+    if forced is not None:
+        if stats is not None:
+            stats.leaves += 1
+        return forced
 
-    valid_moves = get_valid_moves(board)
+    if stats is not None:
+        start = time.perf_counter()
+    if maximizing:
+        valid_moves = pos.get_valid_moves()
+    else:
+        valid_moves, weights = _chance_moves(pos, model)
+    if stats is not None:
+        stats.movegen_time += time.perf_counter() - start
     if not valid_moves:
         return val
-    
-    # Determinar quién es el oponente
-    opponent = MIN_PLAYER if player == MAX_PLAYER else MAX_PLAYER
 
     if maximizing:
         best_value = -float("inf")
         for col in valid_moves:
-            child_board = apply_move(board, col, player)  # Usar 'player'
-            value = expectimax(child_board, depth - 1, False, player)  # Pasar player
-            best_value = max(best_value, value)
+            pos.make_move(col)  # Mueve 'player'
+            value = expectimax(pos, depth - 1, False, player, deadline, stats, model)  # Pasar player
+            pos.undo_move()
+            if value > best_value:
+                best_value = value
+                if stats is not None:
+                    stats.update_pv(ply, col)
         return best_value
     else:
         # Nodo de "chance": oponente estocástico
         total_value = 0.0
-        for col in valid_moves:
-            child_board = apply_move(board, col, opponent)  # Usar 'opponent'
-            value = expectimax(child_board, depth - 1, True, player)  # Pasar player
-            total_value += value
-        return total_value / len(valid_moves)
+        worst_value = float("inf")
+        for col, weight in zip(valid_moves, weights):
+            pos.make_move(col)  # Mueve el oponente
+            value = expectimax(pos, depth - 1, True, player, deadline, stats, model)  # Pasar player
+            pos.undo_move()
+            total_value += weight * value
+            if stats is not None and value < worst_value:
+                worst_value = value
+                stats.update_pv(ply, col)
+        return _mean(total_value, sum(weights), win_value(pos.geometry))
 
 
-def find_best_move_expectimax(board: Board, depth: int, player: str = MAX_PLAYER) -> int:  
+def star_expectimax(pos: BitBoard, depth: int, alpha: float, beta: float, maximizing: bool,
+                    player: str, deadline: Optional[float] = None,
+                    stats: Optional[SearchStats] = None, probing: bool = True,
+                    model: Optional[OpponentModel] = None,
+                    probed: Optional[Tuple[int, float]] = None) -> float:
     """
-    Elige la mejor columna para 'player' usando expectimax.
-    
+    Expectimax con poda alfa-beta en los nodos MAX y Star1/Star2 en los
+    nodos "chance".
+
+    Si el valor de expectimax() está dentro de (alpha, beta) lo devuelve
+    exacto; si no, devuelve una cota que lo demuestra (<= alpha o >= beta).
+    Con 'probing' (Star2) cada nodo "chance" sondea primero una jugada de
+    cada hijo para acotar su valor por abajo; 'probed' = (columna, valor)
+    es ese sondeo, que el nodo MAX reutiliza en lugar de repetirlo.
+    'model' es el modelo del oponente, como en expectimax().
+    """
+    if deadline is not None:
+        check_deadline(deadline)
+    if stats is not None:
+        ply = stats.enter(pos)
+        start = time.perf_counter()
+
+    status, val = _node_value(pos, player)
+    if stats is not None:
+        stats.eval_time += time.perf_counter() - start
+
+    if depth == 0 or status != ONGOING:
+        if stats is not None:
+            stats.leaves += 1
+        return val
+    forced = _forced_value(pos, maximizing)
+    if forced is not None:
+        if stats is not None:
+            stats.leaves += 1
+        return forced
+
+    if stats is not None:
+        start = time.perf_counter()
+    # Los nodos MAX prueban primero el centro (el máximo no depende del orden)
+    if maximizing:
+        valid_moves = [c for c in pos.geometry.center_order if pos.can_play(c)]
+    else:
+        valid_moves, weights = _chance_moves(pos, model)
+    if stats is not None:
+        stats.movegen_time += time.perf_counter() - start
+    if not valid_moves:
+        return val
+
+    if maximizing:
+        best_value = -float("inf")
+        if probed is not None:
+            valid_moves.remove(probed[0])
+            best_value = probed[1]
+        for i, col in enumerate(valid_moves):
+            if best_value >= beta:
+                break
+            pos.make_move(col)
+            value = star_expectimax(pos, depth - 1, max(alpha, best_value), beta, False, player,
+                                    deadline, stats, probing, model)
+            pos.undo_move()
+            if value > best_value:
+                best_value = value
+                if stats is not None:
+                    stats.update_pv(ply, col)
+            if best_value >= beta:
+                if stats is not None:
+                    stats.cutoffs += 1
+                    if i == 0:
+                        stats.first_move_cutoffs += 1
+                break  # poda
+        return best_value
+
+    # Nodo "chance": el valor es la media ponderada de los hijos. Con la
+    # suma de los ya buscados y las cotas de los que faltan (WIN_VALUE por
+    # arriba; -WIN_VALUE o el sondeo por abajo) se calcula la ventana en la
+    # que debe caer el siguiente hijo para que la media pueda quedar dentro
+    # de (alpha, beta). Con pesos 1 las operaciones son las mismas que en
+    # expectimax(), así que el valor exacto coincide bit a bit.
+    win = win_value(pos.geometry)
+    n = len(valid_moves)
+    total_weight = sum(weights)
+    lower = [-win] * n
+    probes: List[Optional[Tuple[int, float]]] = [None] * n
+    if probing and depth > 1:
+        # Star2: el valor de un hijo MAX es al menos el de cualquiera de sus jugadas
+        probed_sum = 0.0
+        rest = total_weight
+        for i, col in enumerate(valid_moves):
+            rest -= weights[i]
+            probe_beta = (total_weight * beta - probed_sum - rest * -win) / weights[i]
+            pos.make_move(col)
+            probes[i] = _probe(pos, depth - 1, probe_beta, player, deadline, stats, probing, model)
+            pos.undo_move()
+            if probes[i] is not None:
+                lower[i] = probes[i][1]
+            probed_sum += weights[i] * lower[i]
+            if lower[i] >= probe_beta:
+                if stats is not None:
+                    stats.cutoffs += 1
+                return (probed_sum + rest * -win) / total_weight
+
+    # Las victorias inmediatas del rival primero: bajan más la cota superior
+    threats = pos.winning_moves(pos.current)
+    order = [i for i in range(n) if valid_moves[i] in threats]
+    order += [i for i in range(n) if valid_moves[i] not in threats]
+
+    values = [0.0] * n
+    partial = 0.0
+    rest = total_weight
+    remaining_lower = 0.0
+    for i in range(n):
+        remaining_lower += weights[i] * lower[i]
+    worst_value = float("inf")
+    for i in order:
+        weight = weights[i]
+        rest -= weight
+        remaining_lower -= weight * lower[i]
+        remaining_upper = rest * win
+        child_alpha = (total_weight * alpha - partial - remaining_upper) / weight
+        child_beta = (total_weight * beta - partial - remaining_lower) / weight
+        if child_alpha >= win or child_beta <= lower[i]:
+            # Star1: ni con el mejor/peor valor posible de este hijo cambia el resultado
+            if stats is not None:
+                stats.cutoffs += 1
+            if child_alpha >= win:
+                return (partial + weight * win + remaining_upper) / total_weight
+            return (partial + weight * lower[i] + remaining_lower) / total_weight
+
+        col = valid_moves[i]
+        pos.make_move(col)
+        value = star_expectimax(pos, depth - 1, child_alpha, child_beta, True, player,
+                                deadline, stats, probing, model, probes[i])
+        pos.undo_move()
+        values[i] = value
+        partial += weight * value
+        if stats is not None and value < worst_value:
+            worst_value = value
+            stats.update_pv(ply, col)
+        if value <= child_alpha:
+            if stats is not None:
+                stats.cutoffs += 1
+            return (partial + remaining_upper) / total_weight
+        if value >= child_beta:
+            if stats is not None:
+                stats.cutoffs += 1
+            return (partial + remaining_lower) / total_weight
+
+    # Valor exacto: se suma en el mismo orden que expectimax()
+    total_value = 0.0
+    for weight, value in zip(weights, values):
+        total_value += weight * value
+    return _mean(total_value, total_weight, win)
+
+
+def _probe(pos: BitBoard, depth: int, beta: float, player: str, deadline: Optional[float],
+           stats: Optional[SearchStats], probing: bool,
+           model: Optional[OpponentModel]) -> Optional[Tuple[int, float]]:
+    """
+    Sondeo Star2 del nodo MAX 'pos': (jugada más central, su valor), que
+    es una cota inferior del valor del nodo. Se busca con ventana
+    (-WIN_VALUE, beta), así que el valor es exacto salvo que llegue a
+    'beta'. Devuelve None si 'pos' es terminal.
+    """
+    status, _ = _node_value(pos, player)
+    if status != ONGOING:
+        return None
+    col = next(c for c in pos.geometry.center_order if pos.can_play(c))
+    pos.make_move(col)
+    value = star_expectimax(pos, depth - 1, -win_value(pos.geometry), beta, False, player, deadline, stats,
+                            probing, model)
+    pos.undo_move()
+    return col, value
+
+
+def _search_root(pos: BitBoard, depth: int, player: str, moves: List[int],
+                 deadline: Optional[float] = None,
+                 stats: Optional[SearchStats] = None,
+                 pruning: Optional[str] = "star1",
+                 model: Optional[OpponentModel] = None) -> Tuple[Optional[int], float, Dict[int, float]]:
+    """
+    Evalúa cada jugada de 'moves' (en ese orden) con expectimax.
+    Devuelve (mejor jugada, su valor, valor de cada jugada). Ante empates
+    (hasta _TIE_EPSILON) gana la primera jugada del orden dado.
+
+    Con 'pruning' ("star1" o "star2") usa star_expectimax y cada jugada se
+    busca con alpha = mejor valor hasta el momento: las que no lo superan
+    devuelven solo una cota superior, lo que no cambia la jugada elegida.
     """
     best_value = -float("inf")
     best_move = None
+    scores = {}
+    if stats is not None:
+        stats.enter(pos)
 
-    for col in get_valid_moves(board):
-        child_board = apply_move(board, col, player)  
-        move_value = expectimax(child_board, depth - 1, False, player) 
-        if move_value > best_value or best_move is None:
+    for col in moves:
+        pos.make_move(col)
+        if pruning is None:
+            move_value = expectimax(pos, depth - 1, False, player, deadline, stats, model) 
+        else:
+            move_value = star_expectimax(pos, depth - 1, best_value + _TIE_EPSILON, float("inf"),
+                                         False, player, deadline, stats, pruning == "star2", model)
+        pos.undo_move()
+        scores[col] = move_value
+        if move_value > best_value + _TIE_EPSILON or best_move is None:
             best_value = move_value
             best_move = col
+            if stats is not None:
+                stats.update_pv(0, col)
+
+    return best_move, best_value, scores
+
+
+def find_best_move_expectimax(board: Union[Board, BitBoard], depth: int, player: str = MAX_PLAYER,
+                              stats: Optional[SearchStats] = None,
+                              pruning: Optional[str] = "star1",
+                              model: Optional[OpponentModel] = None) -> int:  
+    """
+    Elige la mejor columna para 'player' usando expectimax.
+    Acepta un Board o un BitBoard (que no se modifica).
+    'stats' es un SearchStats opcional (disponible tras la búsqueda).
+    'pruning' es "star1" (por defecto), "star2" o None (expectimax sin poda);
+    la jugada elegida es la misma en los tres casos.
+    'model' es el modelo del oponente (None = uniforme).
+    """
+    pos = as_bitboard(board, player, IncrementalBitBoard)
+    if stats is not None:
+        stats.new_search(pos)
+    # En posiciones simétricas basta con buscar media raíz
+    best_move, _, _ = _search_root(pos, depth, player, pos.fold_symmetric(pos.get_valid_moves()),
+                                   None, stats, pruning, model)
+    if stats is not None:
+        stats.complete(depth)
 
     if best_move is None:
-        valid_moves = get_valid_moves(board)
+        valid_moves = pos.get_valid_moves()
         if not valid_moves:
             raise ValueError("No hay movimientos válidos")
         return valid_moves[0]
 
-    return best_move
\ No newline at end of file
+    return best_move
+
+
+def iterative_deepening_expectimax(board: Union[Board, BitBoard], time_limit_ms: float,
+                                   player: str = MAX_PLAYER,
+                                   max_depth: Optional[int] = None,
+                                   stats: Optional[SearchStats] = None,
+                                   pruning: Optional[str] = "star1",
+                                   model: Optional[OpponentModel] = None) -> Tuple[int, int]:
+    """
+    Expectimax con presupuesto de tiempo: busca a profundidad 1, 2, 3...
+    hasta agotar 'time_limit_ms' y devuelve (mejor jugada, profundidad
+    alcanzada) de la última iteración completa. Cada iteración recorre
+    primero las jugadas mejor valoradas en la anterior (con poda, las que
+    no superaron a la mejor se ordenan por su cota). Las estadísticas de
+    'stats' acumulan todas las iteraciones.
+    """
+    deadline = make_deadline(time_limit_ms)
+    pos = as_bitboard(board, player, IncrementalBitBoard)
+    moves = pos.fold_symmetric(pos.get_valid_moves())
+    if not moves:
+        raise ValueError("No hay movimientos válidos")
+    if stats is not None:
+        stats.new_search(pos)
+
+    remaining = pos.geometry.size - pos.moves
+    max_depth = remaining if max_depth is None else min(max_depth, remaining)
+    best_move, reached = moves[0], 0
+    root_ply = len(pos.history)
+
+    for depth in range(1, max_depth + 1):
+        try:
+            move, value, scores = _search_root(pos, depth, player, moves,
+                                               deadline if depth > 1 else None, stats, pruning,
+                                               model)
+        except SearchTimeout:
+            # La búsqueda se cortó a mitad: deshacer lo que quedó jugado
+            while len(pos.history) > root_ply:
+                pos.undo_move()
+            break
+        best_move, reached = move, depth
+        if stats is not None:
+            stats.complete(depth)
+        # Orden para la siguiente iteración: de mejor a peor puntuación
+        moves = sorted(moves, key=lambda c: -scores[c])
+        if value >= win_value(pos.geometry):
+            break  # Victoria segura: no hace falta profundizar más
+
+    if stats is not None:
+        stats.stop()
+    return best_move, reached
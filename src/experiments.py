@@ -1,4 +1,5 @@
-from typing import Tuple
+import time
+from typing import List
 from .board import (
     Board,
     create_board,
@@ -8,28 +9,43 @@ from .board import (
     is_terminal,
 )
 from .config import MAX_PLAYER, MIN_PLAYER
-from .agents import Agent, MinimaxAgent, ExpectimaxAgent, RandomAgent
+from .agents import Agent
+from .bitboard import as_bitboard
+from .game_records import GameRecord, MoveStats
+from .geometry import Geometry, STANDARD
 
 
-def play_game(agent_max: Agent, agent_min: Agent, verbose: bool = False) -> str:
+def record_game(agent_max: Agent, agent_min: Agent, verbose: bool = False,
+                with_stats: bool = False, geometry: Geometry = STANDARD) -> GameRecord:
     """
-    Juega una partida completa entre agent_max (MAX_PLAYER) y agent_min (MIN_PLAYER).
-    Devuelve "O", "X" o "draw".
+    Juega una partida completa entre agent_max (MAX_PLAYER) y agent_min (MIN_PLAYER)
+    y la devuelve como GameRecord, con la secuencia de jugadas.
+    Con 'with_stats' guarda por jugada los nodos buscados (si el agente
+    tiene stats), la profundidad alcanzada y el tiempo.
+    'geometry' es la variante; los agentes reciben la posición como
+    BitBoard, que ya lleva su geometría.
     """
-    board: Board = create_board()
+    board: Board = create_board(geometry.rows, geometry.cols)
     current_player = MAX_PLAYER  # Empieza MAX por defecto
+    moves: List[int] = []
+    stats: List[MoveStats] = []
 
     if verbose:
         print("Nueva partida: MAX =", type(agent_max).__name__, "| MIN =", type(agent_min).__name__)
         print_board(board)
 
-    while not is_terminal(board):
-        if current_player == MAX_PLAYER:
-            move = agent_max.get_move(board)
-        else:
-            move = agent_min.get_move(board)
+    while not is_terminal(board, geometry.connect):
+        agent = agent_max if current_player == MAX_PLAYER else agent_min
+        start = time.perf_counter()
+        move = agent.get_move(as_bitboard(board, current_player, geometry=geometry))
+        elapsed = time.perf_counter() - start
+        if with_stats:
+            search = getattr(agent, "stats", None)
+            stats.append((search.nodes if search is not None else 0,
+                          getattr(agent, "last_depth", 0), elapsed))
 
         board = apply_move(board, move, current_player)
+        moves.append(move)
 
         if verbose:
             print(f"Jugador {current_player} juega columna {move}")
@@ -37,7 +53,7 @@ def play_game(agent_max: Agent, agent_min: Agent, verbose: bool = False) -> str:
 
         current_player = MIN_PLAYER if current_player == MAX_PLAYER else MAX_PLAYER
 
-    winner = get_winner(board)
+    winner = get_winner(board, geometry.connect)
     if winner is None:
         result = "draw"
     elif winner == MAX_PLAYER:
@@ -47,78 +63,43 @@ def play_game(agent_max: Agent, agent_min: Agent, verbose: bool = False) -> str:
 
     if verbose:
         print("Resultado final:", result)
-    return result
+    return GameRecord(type(agent_max).__name__, type(agent_min).__name__, result, moves,
+                      max_depth=_configured_depth(agent_max), min_depth=_configured_depth(agent_min),
+                      stats=stats if with_stats else None)
+
+
+def play_game(agent_max: Agent, agent_min: Agent, verbose: bool = False) -> str:
+    """
+    Juega una partida completa entre agent_max (MAX_PLAYER) y agent_min (MIN_PLAYER).
+    Devuelve "O", "X" o "draw" (ver record_game para tener también las jugadas).
+    """
+    return record_game(agent_max, agent_min, verbose).result
+
+
+def _configured_depth(agent: Agent) -> int:
+    """Profundidad fija del agente (0 si juega por tiempo o no busca)."""
+    if getattr(agent, "time_limit_ms", None) is not None:
+        return 0
+    return getattr(agent, "depth", 0)
+
 
+# Agentes que se comparan en run_experiments (todos contra todos, con ambos colores)
+EXPERIMENT_AGENTS = ["minimax:4", "expectimax:4", "random"]
 
-def run_experiments(num_games: int = 20) -> None:
+
+def run_experiments(num_games: int = 20, workers: int = 1) -> None:
     """
-    Ejecuta algunos experimentos básicos:
-    - Minimax vs Random
-    - Expectimax vs Random
+    Ejecuta un torneo todos contra todos entre EXPERIMENT_AGENTS:
+    'num_games' partidas por pareja y color, repartidas en 'workers' procesos.
+    Para torneos más grandes o reanudables, ver tournament.py.
     """
-    '''
-    print("=== Experimento 1: Minimax (MAX) vs Random (MIN) ===")
-    minimax_agent = MinimaxAgent(depth=4)
-    random_agent = RandomAgent()
-
-    wins = losses = draws = 0
-    for _ in range(num_games):
-        result = play_game(minimax_agent, random_agent, verbose=False)
-        if result == MAX_PLAYER:
-            wins += 1
-        elif result == MIN_PLAYER:
-            losses += 1
-        else:
-            draws += 1
-    print(f"Minimax vs Random (MAX): {wins} victorias, {losses} derrotas, {draws} empates")
-
-    print("\n=== Experimento 2: Expectimax (MAX) vs Random (MIN) ===")
-    expectimax_agent = ExpectimaxAgent(depth=4)
-
-    wins = losses = draws = 0
-    for _ in range(num_games):
-        result = play_game(expectimax_agent, random_agent, verbose=False)
-        if result == MAX_PLAYER:
-            wins += 1
-        elif result == MIN_PLAYER:
-            losses += 1
-        else:
-            draws += 1
-    print(f"Expectimax vs Random (MAX): {wins} victorias, {losses} derrotas, {draws} empates")
-    '''
-    print("\n=== Experimento 3: Minimax (MAX) vs Expectimax (MIN) ===")
-    minimax_agent = MinimaxAgent(depth=4)
-    expectimax_agent = ExpectimaxAgent(depth=4)
-
-    wins = losses = draws = 0
-    for _ in range(num_games):
-        result = play_game(minimax_agent, expectimax_agent, verbose=False)
-        if result == MAX_PLAYER:
-            wins += 1
-        elif result == MIN_PLAYER:
-            losses += 1
-        else:
-            draws += 1
-
-    print(f"Minimax vs Expectimax (MAX vs MIN): {wins} victorias MAX, {losses} victorias MIN, {draws} empates")
-
-    print("\n=== Experimento 4: Expectimax (MAX) vs Minimax (MIN) ===")
-    expectimax_agent = ExpectimaxAgent(depth=4)
-    minimax_agent = MinimaxAgent(depth=4)
-
-    wins = losses = draws = 0
-    for _ in range(num_games):
-        result = play_game(expectimax_agent, minimax_agent, verbose=False)
-        if result == MAX_PLAYER:
-            wins += 1
-        elif result == MIN_PLAYER:
-            losses += 1
-        else:
-            draws += 1
-
-    print(f"Expectimax vs Minimax (MAX vs MIN): {wins} victorias MAX, {losses} victorias MIN, {draws} empates")
+    from .tournament import AgentSpec, run_tournament, print_summary
+
+    specs = [AgentSpec.parse(text) for text in EXPERIMENT_AGENTS]
+    print("=== Experimentos: " + " vs ".join(spec.label for spec in specs) + " ===")
+    results = list(run_tournament(specs, games_per_pair=num_games, workers=workers))
+    print_summary(results)
     
 
 if __name__ == "__main__":
     run_experiments(num_games=10)
-
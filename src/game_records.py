@@ -0,0 +1,255 @@
+"""
+Formato binario compacto para guardar partidas completas.
+
+Una partida de Connect-4 queda determinada por su secuencia de columnas,
+y cada columna cabe en 4 bits: las jugadas se empaquetan de dos en dos
+por byte (nibble bajo primero). Una partida de 42 jugadas ocupa 21 bytes
+más la cabecera.
+
+Formato del fichero (little-endian):
+- Cabecera de 10 bytes: "C4GR", versión, filas, columnas, N en línea y
+  un byte de relleno. Todas las partidas de un fichero son de la misma
+  variante (read_geometry()); las columnas caben en un nibble, así que
+  como mucho 16. Los ficheros de la versión 1 (cabecera de 8 bytes, sin
+  N en línea) son del tablero estándar y se siguen leyendo y ampliando.
+- Registros seguidos, cada uno precedido de su longitud (uint32):
+  - semilla (uint64), resultado (0 tablas, 1 MAX, 2 MIN), flags,
+    profundidad de MAX y de MIN (0 = por tiempo / no aplica),
+    número de jugadas (uint16),
+  - identificador, agente MAX y agente MIN (uint8 longitud + UTF-8),
+  - jugadas empaquetadas en nibbles,
+  - si flags tiene FLAG_STATS: por cada jugada (nodos uint32,
+    profundidad uint16, segundos float32).
+
+read_records() recorre el fichero registro a registro sin cargarlo
+entero, así que sirve para millones de partidas. Un último registro
+cortado (p. ej. por una interrupción) se ignora al leer y se descarta
+al volver a abrir el fichero para escribir.
+
+Uso desde consola (resumen de un fichero):
+    python -m src.game_records torneo.c4g
+"""
+
+import argparse
+import os
+import struct
+from dataclasses import dataclass
+from typing import Iterator, List, Optional, Sequence, Tuple
+from .config import CONNECT, MAX_PLAYER, MIN_PLAYER
+from .geometry import Geometry, STANDARD, get_geometry
+
+MAGIC = b"C4GR"
+VERSION = 2
+FILE_HEADER = struct.Struct("<4sHBB")  # Común a todas las versiones
+VARIANT = struct.Struct("<Bx")  # Versión 2: N en línea + relleno
+MAX_COLS = 16
+LENGTH = struct.Struct("<I")
+RECORD_HEADER = struct.Struct("<QBBBBH")
+MOVE_STATS = struct.Struct("<IHf")
+
+FLAG_STATS = 1
+RESULTS = ("draw", MAX_PLAYER, MIN_PLAYER)  # Código del resultado = índice
+
+# Estadísticas de una jugada: (nodos, profundidad alcanzada, segundos)
+MoveStats = Tuple[int, int, float]
+
+
+@dataclass
+class GameRecord:
+    """
+    Una partida guardada.
+
+    - max_agent / min_agent: nombre de cada agente (p. ej. "minimax:4").
+    - result: MAX_PLAYER, MIN_PLAYER o "draw".
+    - moves: columnas jugadas, empezando por MAX.
+    - max_depth / min_depth: profundidad configurada (0 si juega por tiempo o no busca).
+    - stats: una entrada MoveStats por jugada, o None si no se registraron.
+    """
+
+    max_agent: str
+    min_agent: str
+    result: str
+    moves: List[int]
+    seed: int = 0
+    max_depth: int = 0
+    min_depth: int = 0
+    game_id: str = ""
+    stats: Optional[List[MoveStats]] = None
+
+
+def pack_moves(moves: Sequence[int]) -> bytes:
+    """Empaqueta una secuencia de columnas en nibbles (dos jugadas por byte)."""
+    data = bytearray((len(moves) + 1) // 2)
+    for i, col in enumerate(moves):
+        data[i >> 1] |= col << ((i & 1) * 4)
+    return bytes(data)
+
+
+def unpack_moves(data: bytes, count: int) -> List[int]:
+    """Inverso de pack_moves: las 'count' primeras columnas de 'data'."""
+    return [(data[i >> 1] >> ((i & 1) * 4)) & 0xF for i in range(count)]
+
+
+def _pack_text(text: str) -> bytes:
+    data = text.encode("utf-8")
+    if len(data) > 255:
+        raise ValueError(f"Texto demasiado largo para el registro: {text!r}")
+    return bytes([len(data)]) + data
+
+
+def encode_record(record: GameRecord) -> bytes:
+    """Registro completo (con su longitud delante) listo para escribir."""
+    if record.stats is not None and len(record.stats) != len(record.moves):
+        raise ValueError("Se necesita una entrada de estadísticas por jugada")
+    flags = FLAG_STATS if record.stats is not None else 0
+    parts = [
+        RECORD_HEADER.pack(record.seed, RESULTS.index(record.result), flags,
+                           record.max_depth, record.min_depth, len(record.moves)),
+        _pack_text(record.game_id),
+        _pack_text(record.max_agent),
+        _pack_text(record.min_agent),
+        pack_moves(record.moves),
+    ]
+    if record.stats is not None:
+        parts.extend(MOVE_STATS.pack(min(nodes, 0xFFFFFFFF), depth, seconds)
+                     for nodes, depth, seconds in record.stats)
+    body = b"".join(parts)
+    return LENGTH.pack(len(body)) + body
+
+
+def decode_record(body: bytes) -> GameRecord:
+    """Decodifica el cuerpo de un registro (sin el prefijo de longitud)."""
+    seed, result, flags, max_depth, min_depth, count = RECORD_HEADER.unpack_from(body, 0)
+    offset = RECORD_HEADER.size
+    texts = []
+    for _ in range(3):
+        size = body[offset]
+        texts.append(body[offset + 1:offset + 1 + size].decode("utf-8"))
+        offset += 1 + size
+    game_id, max_agent, min_agent = texts
+    packed = (count + 1) // 2
+    moves = unpack_moves(body[offset:offset + packed], count)
+    offset += packed
+    stats = None
+    if flags & FLAG_STATS:
+        stats = [MOVE_STATS.unpack_from(body, offset + i * MOVE_STATS.size) for i in range(count)]
+    return GameRecord(max_agent, min_agent, RESULTS[result], moves, seed,
+                      max_depth, min_depth, game_id, stats)
+
+
+def _file_header(geometry: Geometry) -> bytes:
+    """Cabecera de un fichero nuevo con partidas de 'geometry'."""
+    if geometry.cols > MAX_COLS:
+        raise ValueError(f"Las jugadas ocupan un nibble: como mucho {MAX_COLS} columnas")
+    return (FILE_HEADER.pack(MAGIC, VERSION, geometry.rows, geometry.cols)
+            + VARIANT.pack(geometry.connect))
+
+
+def _read_header(f, path: str) -> Tuple[Geometry, int]:
+    """Variante de las partidas y tamaño de la cabecera de un fichero abierto."""
+    data = f.read(FILE_HEADER.size)
+    if len(data) < FILE_HEADER.size:
+        raise ValueError(f"{path} no es un fichero de partidas válido")
+    magic, version, rows, cols = FILE_HEADER.unpack(data)
+    if magic != MAGIC or version not in (1, VERSION):
+        raise ValueError(f"{path} no es un fichero de partidas válido")
+    if version == 1:
+        return get_geometry(rows, cols, CONNECT), FILE_HEADER.size
+    data = f.read(VARIANT.size)
+    if len(data) < VARIANT.size:
+        raise ValueError(f"{path} no es un fichero de partidas válido")
+    return get_geometry(rows, cols, VARIANT.unpack(data)[0]), FILE_HEADER.size + VARIANT.size
+
+
+def _read_bodies(f, path: str) -> Iterator[Tuple[int, bytes]]:
+    """(posición final, cuerpo) de cada registro completo de un fichero abierto."""
+    _, end = _read_header(f, path)
+    while True:
+        prefix = f.read(LENGTH.size)
+        if len(prefix) < LENGTH.size:
+            return
+        size = LENGTH.unpack(prefix)[0]
+        body = f.read(size)
+        if len(body) < size:
+            return  # Registro cortado
+        end += LENGTH.size + size
+        yield end, body
+
+
+def read_geometry(path: str) -> Geometry:
+    """Variante (filas, columnas y N en línea) de las partidas de 'path'."""
+    with open(path, "rb") as f:
+        return _read_header(f, path)[0]
+
+
+def read_records(path: str) -> Iterator[GameRecord]:
+    """Recorre las partidas de 'path' una a una (sin cargar el fichero en memoria)."""
+    with open(path, "rb") as f:
+        for _, body in _read_bodies(f, path):
+            yield decode_record(body)
+
+
+class GameRecordWriter:
+    """
+    Escritor de partidas de la variante 'geometry'. Si el fichero existe
+    se añaden registros al final (descartando un último registro cortado)
+    y tiene que ser de la misma variante; si no, se crea con su cabecera.
+    Cada write() llega al disco enseguida, así un torneo interrumpido
+    conserva todas las partidas terminadas.
+    """
+
+    def __init__(self, path: str, geometry: Geometry = STANDARD):
+        self.path = path
+        self.geometry = geometry
+        if os.path.exists(path) and os.path.getsize(path) > 0:
+            with open(path, "rb") as f:
+                stored, end = _read_header(f, path)
+                if stored is not geometry:
+                    raise ValueError(f"{path} tiene partidas de {stored}, no de {geometry}")
+                f.seek(0)
+                for end, _ in _read_bodies(f, path):
+                    pass
+            self._file = open(path, "r+b")
+            self._file.truncate(end)
+            self._file.seek(end)
+        else:
+            header = _file_header(geometry)
+            self._file = open(path, "wb")
+            self._file.write(header)
+
+    def write(self, record: GameRecord) -> None:
+        """Añade una partida al fichero."""
+        self._file.write(encode_record(record))
+        self._file.flush()
+
+    def close(self) -> None:
+        self._file.close()
+
+    def __enter__(self) -> "GameRecordWriter":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Resumen de un fichero de partidas de Connect-4")
+    parser.add_argument("path", help="Fichero de partidas (.c4g)")
+    args = parser.parse_args()
+
+    games = 0
+    moves = 0
+    results = dict.fromkeys(RESULTS, 0)
+    geometry = read_geometry(args.path)
+    for record in read_records(args.path):
+        games += 1
+        moves += len(record.moves)
+        results[record.result] += 1
+    print(f"Tablero {geometry.rows}x{geometry.cols}, {geometry.connect} en línea")
+    print(f"{games} partidas, {moves / games if games else 0:.1f} jugadas de media")
+    print(f"Victorias {MAX_PLAYER}: {results[MAX_PLAYER]}, victorias {MIN_PLAYER}: "
+          f"{results[MIN_PLAYER]}, empates: {results['draw']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,226 @@
+"""
+Geometría de una variante de Connect-4: filas, columnas y número de
+fichas en línea para ganar (N), con sus tablas precalculadas.
+
+Las variantes (7x6, 8x7, 9x7, conecta-5...) solo cambian esas tres
+cifras. get_geometry() construye una sola vez por variante:
+
+- windows: las ventanas de N casillas (todas las líneas ganadoras) como
+  coordenadas (fila, columna) de Board, en el orden horizontales,
+  verticales, diagonales \\ y diagonales /,
+- window_masks: cada ventana como máscara de BitBoard (mismo índice),
+- cell_windows: índices de las ventanas que pasan por cada bit,
+- máscaras del bitboard (fondo, tablero, columnas, columna central),
+  orden de columnas del centro a los bordes y claves Zobrist,
+- has_line / winning_cells: N en línea y casillas que lo completarían,
+  con desplazamientos para ese N y esa altura de columna.
+
+El tablero, la evaluación y la búsqueda usan estas tablas: ninguno
+vuelve a calcular las ventanas en cada llamada ni en cada nodo. Cada
+BitBoard lleva su geometría; STANDARD es la de config.py.
+"""
+
+import argparse
+import random
+from typing import Callable, Dict, List, Tuple
+from .config import ROWS, COLS, CONNECT
+
+Window = Tuple[Tuple[int, int], ...]
+
+
+def _build_windows(rows: int, cols: int, connect: int) -> List[Window]:
+    """Ventanas de 'connect' casillas (fila, columna) de un tablero rows x cols."""
+    span = connect - 1
+    windows = []
+    for row in range(rows):
+        for col in range(cols - span):
+            windows.append(tuple((row, col + i) for i in range(connect)))
+    for col in range(cols):
+        for row in range(rows - span):
+            windows.append(tuple((row + i, col) for i in range(connect)))
+    for row in range(rows - span):
+        for col in range(cols - span):
+            windows.append(tuple((row + i, col + i) for i in range(connect)))
+    for row in range(span, rows):
+        for col in range(cols - span):
+            windows.append(tuple((row - i, col + i) for i in range(connect)))
+    return windows
+
+
+def _line_detector(column_bits: int, connect: int) -> Callable[[int], bool]:
+    """
+    Función bits -> True si hay 'connect' fichas en línea. Por cada
+    dirección, la máscara de inicios de tramos de L fichas seguidas se
+    combina consigo misma desplazada para pasar a 2L (o hasta N): con
+    N = 4 son dos pasos, como en has_four.
+    """
+    # Vertical (1), horizontal (H), diagonal / (H + 1) y diagonal \ (H - 1)
+    shifts = (1, column_bits, column_bits + 1, column_bits - 1)
+
+    if connect == 4:
+        # Caso habitual desenrollado (la búsqueda lo llama en cada nodo)
+        def has_four(bits: int) -> bool:
+            for shift in shifts:
+                pairs = bits & (bits >> shift)
+                if pairs & (pairs >> (2 * shift)):
+                    return True
+            return False
+
+        return has_four
+
+    steps = []
+    length = 1
+    while length < connect:
+        step = min(length, connect - length)
+        steps.append(step)
+        length += step
+    plans = tuple(tuple(step * shift for step in steps) for shift in shifts)
+
+    def has_line(bits: int) -> bool:
+        for plan in plans:
+            run = bits
+            for offset in plan:
+                run &= run >> offset
+            if run:
+                return True
+        return False
+
+    return has_line
+
+
+def _cell_finder(column_bits: int, connect: int, board_mask: int) -> Callable[[int, int], int]:
+    """
+    Función (bits, occupied) -> máscara de casillas vacías que
+    completarían 'connect' en línea (ver bitboard.winning_cells).
+    """
+    diagonals = (column_bits, column_bits + 1, column_bits - 1)
+
+    if connect == 4:
+        # Caso habitual desenrollado: comparte los pares de fichas entre huecos
+        def winning_cells(bits: int, occupied: int) -> int:
+            cells = (bits << 1) & (bits << 2) & (bits << 3)
+            for shift in diagonals:
+                pair = (bits << shift) & (bits << (2 * shift))
+                cells |= pair & (bits << (3 * shift))
+                cells |= pair & (bits >> shift)
+                pair = (bits >> shift) & (bits >> (2 * shift))
+                cells |= pair & (bits << shift)
+                cells |= pair & (bits >> (3 * shift))
+            return cells & (board_mask ^ occupied)
+
+        return winning_cells
+
+    def winning_cells(bits: int, occupied: int) -> int:
+        # Vertical: solo puede completarse por arriba
+        cells = -1
+        for k in range(1, connect):
+            cells &= bits << k
+        for shift in diagonals:
+            # before[k] / after[k]: hay ficha en las k casillas anteriores / siguientes
+            before = [-1]
+            after = [-1]
+            for k in range(1, connect):
+                before.append(before[-1] & (bits << (k * shift)))
+                after.append(after[-1] & (bits >> (k * shift)))
+            for gap in range(connect):
+                cells |= before[gap] & after[connect - 1 - gap]
+        return cells & (board_mask ^ occupied)
+
+    return winning_cells
+
+
+class Geometry:
+    """
+    Tablas de una variante rows x cols con 'connect' en línea. No se crea
+    directamente: get_geometry() devuelve siempre la misma instancia para
+    los mismos parámetros (así se comparan con 'is').
+    """
+
+    def __init__(self, rows: int, cols: int, connect: int):
+        if rows < 1 or cols < 1:
+            raise ValueError(f"Tablero inválido: {rows}x{cols}")
+        if not 2 <= connect <= max(rows, cols):
+            raise ValueError(f"No caben {connect} en línea en un tablero {rows}x{cols}")
+        self.rows = rows
+        self.cols = cols
+        self.connect = connect
+        self.size = rows * cols
+        # Bits por columna en el BitBoard: las filas más el separador (H en bitboard.py)
+        self.column_bits = column_bits = rows + 1
+        self.center_col = cols // 2
+        # Columnas del centro hacia los bordes: [3, 2, 4, 1, 5, 0, 6] en 7 columnas
+        self.center_order = sorted(range(cols), key=lambda c: (abs(c - cols // 2), c))
+
+        column = (1 << rows) - 1
+        self.bottom_mask = sum(1 << (c * column_bits) for c in range(cols))
+        self.board_mask = self.bottom_mask * column
+        self.column_masks = [column << (c * column_bits) for c in range(cols)]
+        self.center_mask = self.column_masks[self.center_col]
+        # Con columnas pares la columna central (la de la derecha del centro)
+        # no es su propio reflejo: la heurística deja de ser simétrica y una
+        # posición y su reflejo ya no valen lo mismo en la búsqueda
+        self.symmetric = cols % 2 == 1
+        # Primer bit por encima de cada columna: la columna está llena si heights[c] llega a él
+        self.column_tops = [c * column_bits + rows for c in range(cols)]
+
+        self.windows = _build_windows(rows, cols, connect)
+        self.window_masks = [sum(1 << self.bit(row, col) for row, col in window)
+                             for window in self.windows]
+        self.cell_windows: List[List[int]] = [[] for _ in range(column_bits * cols)]
+        for w, window in enumerate(self.windows):
+            for row, col in window:
+                self.cell_windows[self.bit(row, col)].append(w)
+
+        # Claves Zobrist: un número aleatorio de 64 bits por (jugador, casilla) y uno
+        # para el turno. Semilla fija para que los hash sean reproducibles.
+        rng = random.Random(20240611)
+        bits = column_bits * cols
+        self.zobrist = [[rng.getrandbits(64) for _ in range(bits)] for _ in range(2)]
+        self.zobrist_side = rng.getrandbits(64)
+        # Bit que ocupa cada casilla en el tablero reflejado (columna c <-> cols - 1 - c)
+        self.mirror_bit = [(cols - 1 - bit // column_bits) * column_bits + bit % column_bits
+                           for bit in range(bits)]
+        # Claves Zobrist de la posición reflejada, indexadas por el bit original
+        self.zobrist_mirror = [[keys[self.mirror_bit[bit]] for bit in range(bits)]
+                               for keys in self.zobrist]
+
+        self.has_line = _line_detector(column_bits, connect)
+        self.winning_cells = _cell_finder(column_bits, connect, self.board_mask)
+
+    def bit(self, row: int, col: int) -> int:
+        """Bit del BitBoard de la casilla (fila, columna) de Board (fila 0 arriba)."""
+        return col * self.column_bits + self.rows - 1 - row
+
+    def __repr__(self) -> str:
+        return f"Geometry(rows={self.rows}, cols={self.cols}, connect={self.connect})"
+
+    def __reduce__(self):
+        # Al pasar a otro proceso se recupera la instancia compartida de ese proceso
+        return get_geometry, (self.rows, self.cols, self.connect)
+
+
+_GEOMETRIES: Dict[Tuple[int, int, int], Geometry] = {}
+
+
+def get_geometry(rows: int = ROWS, cols: int = COLS, connect: int = CONNECT) -> Geometry:
+    """Geometría (compartida) de un tablero rows x cols con 'connect' en línea."""
+    key = (rows, cols, connect)
+    geometry = _GEOMETRIES.get(key)
+    if geometry is None:
+        geometry = _GEOMETRIES.setdefault(key, Geometry(rows, cols, connect))
+    return geometry
+
+
+STANDARD = get_geometry()
+
+
+def add_geometry_arguments(parser: argparse.ArgumentParser) -> None:
+    """Añade a 'parser' las opciones --rows, --cols y --connect de la variante."""
+    parser.add_argument("--rows", type=int, default=ROWS, help="Filas del tablero")
+    parser.add_argument("--cols", type=int, default=COLS, help="Columnas del tablero")
+    parser.add_argument("--connect", type=int, default=CONNECT, help="Fichas en línea para ganar")
+
+
+def geometry_from_args(args: argparse.Namespace) -> Geometry:
+    """Geometría elegida con las opciones de add_geometry_arguments."""
+    return get_geometry(args.rows, args.cols, args.connect)
@@ -1,3 +1,4 @@
+import argparse
 from .board import (
     Board,
     create_board,
@@ -8,7 +9,9 @@ from .board import (
     get_valid_moves,
 )
 from .config import MAX_PLAYER, MIN_PLAYER
-from .agents import MinimaxAgent, ExpectimaxAgent
+from .agents import ENDGAME_CELLS, MinimaxAgent, ExpectimaxAgent
+from .background_search import Ponderer
+from .geometry import Geometry, STANDARD, add_geometry_arguments, geometry_from_args
 
 
 def human_turn(board: Board, human_symbol: str) -> Board:
@@ -36,7 +39,12 @@ def choose_ai() -> str:
     return choice or "1"
 
 
-def main():
+def main(ponder: bool = True, geometry: Geometry = STANDARD):
+    """
+    Partida humano contra IA por consola. Con 'ponder' la IA piensa sus
+    respuestas mientras el humano elige jugada (ver Ponderer).
+    'geometry' es la variante (medidas del tablero y fichas en línea).
+    """
     ai_choice = choose_ai()
     symbol = input("Elige [O/X]: ").strip().upper()
     
@@ -49,31 +57,39 @@ def main():
     
     # Crear agente con el símbolo correcto
     if ai_choice == "2":
-        ai_agent = ExpectimaxAgent(depth=4, player_symbol=ai_symbol) 
+        ai_agent = ExpectimaxAgent(depth=4, player_symbol=ai_symbol, stats=ponder, geometry=geometry)
         print("Has elegido jugar contra Expectimax (profundidad 4).")
     else:
-        ai_agent = MinimaxAgent(depth=4, player_symbol=ai_symbol) 
+        ai_agent = MinimaxAgent(depth=4, player_symbol=ai_symbol, stats=ponder,
+                                endgame_cells=ENDGAME_CELLS, geometry=geometry)
         print("Has elegido jugar contra Minimax (profundidad 4).")
     
-    board = create_board()
+    ponderer = Ponderer(ai_agent) if ponder else None
+    board = create_board(geometry.rows, geometry.cols)
     current_player = MAX_PLAYER
 
     print_board(board)
 
-    while not is_terminal(board):
+    while not is_terminal(board, geometry.connect):
         if current_player == human_symbol:
+            if ponderer is not None:
+                ponderer.start(board)
             board = human_turn(board, human_symbol)
         else:
             # Turno de la IA    
             print(f"Turno de la IA ({ai_symbol})...")
-            col = ai_agent.get_move(board)
+            col = ponderer.take(board) if ponderer is not None else None
+            if col is None:
+                col = ai_agent.get_move(board)
             board = apply_move(board, col, ai_symbol)
             print(f"La IA jugó en la columna {col}.")
 
         print_board(board)
         current_player = MIN_PLAYER if current_player == MAX_PLAYER else MAX_PLAYER
 
-    winner = get_winner(board)
+    if ponderer is not None:
+        ponderer.stop()
+    winner = get_winner(board, geometry.connect)
     if winner is None:
         print("La partida terminó en empate.")
     elif winner == human_symbol:
@@ -83,5 +99,9 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="Connect-4 por consola contra la IA")
+    add_geometry_arguments(parser)
+    parser.add_argument("--no-ponder", action="store_true", help="La IA no piensa en el turno del humano")
+    args = parser.parse_args()
+    main(ponder=not args.no_ponder, geometry=geometry_from_args(args))
 
@@ -1,3 +1,4 @@
+import argparse
 import tkinter as tk
 from tkinter import messagebox, ttk
 from .board import (
@@ -8,13 +9,16 @@ from .board import (
     is_terminal,
     get_valid_moves,
 )
-from .config import MAX_PLAYER, MIN_PLAYER, EMPTY, ROWS, COLS
-from .agents import MinimaxAgent, ExpectimaxAgent
+from .config import MAX_PLAYER, MIN_PLAYER, EMPTY
+from .agents import ENDGAME_CELLS, MinimaxAgent, ExpectimaxAgent
+from .background_search import BackgroundSearch, Ponderer
+from .geometry import Geometry, STANDARD, add_geometry_arguments, geometry_from_args
 
 
 class Connect4GUI:
-    def __init__(self, root):
+    def __init__(self, root, geometry: Geometry = STANDARD):
         self.root = root
+        self.geometry = geometry  # Variante: medidas del tablero y fichas en línea
         self.root.title("Connect-4 vs IA")
         self.root.resizable(False, False)
         
@@ -27,6 +31,7 @@ class Connect4GUI:
         
         self.CELL_SIZE = 80
         self.CIRCLE_RADIUS = 30
+        self.POLL_MS = 100  # Cada cuánto se mira el progreso de la IA
         
         # Variables del juego
         self.board = None
@@ -35,12 +40,18 @@ class Connect4GUI:
         self.ai_symbol = None
         self.ai_agent = None
         self.game_over = False
+        self.search = None  # Búsqueda de la IA en curso (BackgroundSearch)
+        self.ponderer = None  # Pondering durante el turno del humano (Ponderer)
         
         # Crear interfaz
+        self.root.protocol("WM_DELETE_WINDOW", self.quit)
         self.setup_menu()
         
     def setup_menu(self):
         """Pantalla inicial para configurar el juego."""
+        # Una búsqueda de la partida anterior ya no sirve
+        self.cancel_search()
+
         # Limpiar ventana
         for widget in self.root.winfo_children():
             widget.destroy()
@@ -77,6 +88,19 @@ class Connect4GUI:
                 variable=self.depth_var, length=200).pack(side="left", padx=10)
         tk.Label(depth_frame, text="Difícil", font=("Arial", 10)).pack(side="left")
         
+        # Tiempo por jugada (0 = usar la profundidad fija de arriba)
+        tk.Label(frame, text="Tiempo por jugada (s, 0 = profundidad fija):", 
+                font=("Arial", 12)).pack(pady=5)
+        
+        self.time_var = tk.DoubleVar(value=0)
+        tk.Scale(frame, from_=0, to=10, resolution=0.5, orient="horizontal",
+                variable=self.time_var, length=200).pack(pady=5)
+        
+        # Pondering: la IA piensa sus respuestas mientras juegas
+        self.ponder_var = tk.BooleanVar(value=True)
+        tk.Checkbutton(frame, text="La IA piensa durante tu turno",
+                      variable=self.ponder_var, font=("Arial", 12)).pack(pady=5)
+        
         # Selección de símbolo
         tk.Label(frame, text="Elige tu símbolo:", 
                 font=("Arial", 14)).pack(pady=5)
@@ -100,6 +124,8 @@ class Connect4GUI:
     def start_game(self):
         # Configurar IA
         depth = self.depth_var.get()
+        time_limit = self.time_var.get()
+        time_limit_ms = time_limit * 1000 if time_limit > 0 else None
         
         # Configurar símbolos primero
         self.human_symbol = self.symbol_choice.get()
@@ -110,14 +136,18 @@ class Connect4GUI:
         
         # Crear agente con el símbolo correcto
         if self.ai_choice.get() == "expectimax":
-            self.ai_agent = ExpectimaxAgent(depth=depth, player_symbol=self.ai_symbol)  
+            self.ai_agent = ExpectimaxAgent(depth=depth, player_symbol=self.ai_symbol,
+                                            time_limit_ms=time_limit_ms, geometry=self.geometry)  
             ai_name = "Expectimax"
         else:
-            self.ai_agent = MinimaxAgent(depth=depth, player_symbol=self.ai_symbol)  
+            self.ai_agent = MinimaxAgent(depth=depth, player_symbol=self.ai_symbol,
+                                         time_limit_ms=time_limit_ms, endgame_cells=ENDGAME_CELLS,
+                                         geometry=self.geometry)
             ai_name = "Minimax"
+        self.ponderer = Ponderer(self.ai_agent) if self.ponder_var.get() else None
 
          # Inicializar estado de la partida
-        self.board = create_board()
+        self.board = create_board(self.geometry.rows, self.geometry.cols)
         self.current_player = MAX_PLAYER  # O siempre empieza
         self.game_over = False
 
@@ -125,8 +155,12 @@ class Connect4GUI:
         self.setup_game_board()
 
         # Mostrar texto informativo
+        if time_limit_ms is None:
+            level = f"profundidad {depth}"
+        else:
+            level = f"{time_limit:g} s por jugada"
         info_text = (
-            f"Jugando contra {ai_name} (profundidad {depth})\n"
+            f"Jugando contra {ai_name} ({level})\n"
             f"Tú: {self.human_symbol} | IA: {self.ai_symbol}\n"
             f"Empieza: {self.current_player}"
         )
@@ -160,13 +194,13 @@ class Connect4GUI:
                  font=("Arial", 10), bg="#2196F3", fg="white",
                  padx=10, pady=5).pack(side="left", padx=5)
         
-        tk.Button(button_frame, text="Salir", command=self.root.quit,
+        tk.Button(button_frame, text="Salir", command=self.quit,
                  font=("Arial", 10), bg="#f44336", fg="white",
                  padx=10, pady=5).pack(side="left", padx=5)
         
         # Canvas para el tablero
-        canvas_width = COLS * self.CELL_SIZE
-        canvas_height = ROWS * self.CELL_SIZE
+        canvas_width = self.geometry.cols * self.CELL_SIZE
+        canvas_height = self.geometry.rows * self.CELL_SIZE
         
         self.canvas = tk.Canvas(main_frame, width=canvas_width, 
                                height=canvas_height, bg=self.COLOR_BOARD)
@@ -190,8 +224,8 @@ class Connect4GUI:
         self.canvas.delete("all")
         
         # Dibujar casillas
-        for row in range(ROWS):
-            for col in range(COLS):
+        for row in range(self.geometry.rows):
+            for col in range(self.geometry.cols):
                 x0 = col * self.CELL_SIZE
                 y0 = row * self.CELL_SIZE
                 x1 = x0 + self.CELL_SIZE
@@ -227,7 +261,7 @@ class Connect4GUI:
             return
         
         col = event.x // self.CELL_SIZE
-        if col < 0 or col >= COLS:
+        if col < 0 or col >= self.geometry.cols:
             return
         
         if col not in get_valid_moves(self.board):
@@ -237,7 +271,7 @@ class Connect4GUI:
         x0 = col * self.CELL_SIZE
         y0 = 0
         x1 = x0 + self.CELL_SIZE
-        y1 = ROWS * self.CELL_SIZE
+        y1 = self.geometry.rows * self.CELL_SIZE
         
         self.canvas.delete("highlight")
         self.canvas.create_rectangle(x0, y0, x1, y1, 
@@ -254,7 +288,7 @@ class Connect4GUI:
         
         # Determinar columna
         col = event.x // self.CELL_SIZE
-        if col < 0 or col >= COLS:
+        if col < 0 or col >= self.geometry.cols:
             return
         
         # Verificar si es movimiento válido
@@ -280,6 +314,10 @@ class Connect4GUI:
             self.current_player = MIN_PLAYER if self.current_player == MAX_PLAYER else MAX_PLAYER
             self.update_status()
             
+            # Mientras el humano piensa, la IA prepara sus respuestas
+            if self.current_player == self.human_symbol and self.ponderer is not None:
+                self.ponderer.start(self.board)
+            
             # Si es turno de la IA, esperar un momento y mover
             if self.current_player == self.ai_symbol and not self.game_over:
                 self.status_label.config(text="La IA está pensando...")
@@ -290,23 +328,64 @@ class Connect4GUI:
             messagebox.showerror("Error", str(e))
     
     def ai_move(self):
-        """La IA hace su movimiento."""
-        if self.game_over:
+        """Lanza la búsqueda de la IA en segundo plano (la ventana sigue respondiendo)."""
+        if self.game_over or self.current_player != self.ai_symbol or self.search is not None:
             return
         
-        try:
-            col = self.ai_agent.get_move(self.board)
-            self.make_move(col)
-        except Exception as e:
-            messagebox.showerror("Error de IA", f"Error en el movimiento de la IA: {e}")
+        # Si la jugada del humano ya se pensó, se responde al instante
+        if self.ponderer is not None:
+            col = self.ponderer.take(self.board)
+            if col is not None:
+                self.make_move(col)
+                return
+        
+        self.search = BackgroundSearch(self.ai_agent, self.board).start()
+        self.root.after(self.POLL_MS, self.poll_ai, self.search)
+    
+    def poll_ai(self, search):
+        """Muestra el progreso de la búsqueda y, cuando termina, juega su jugada."""
+        # Búsqueda cancelada o de una partida anterior: se descarta
+        if search is not self.search or search.cancelled:
+            return
+        
+        if not search.done():
+            progress = search.progress()
+            text = f"La IA está pensando... {progress['nodes']} nodos"
+            if progress["depth"]:
+                text += f", profundidad {progress['depth']}"
+            if progress["move"] is not None:
+                text += f", mejor columna {progress['move']}"
+            self.status_label.config(text=text, fg="purple")
+            self.root.after(self.POLL_MS, self.poll_ai, search)
+            return
+        
+        self.search = None
+        if search.error is not None:
+            messagebox.showerror("Error de IA", f"Error en el movimiento de la IA: {search.error}")
+            return
+        self.make_move(search.move)
+    
+    def cancel_search(self):
+        """Cancela la búsqueda de la IA en curso (su resultado se descartará) y el pondering."""
+        if self.search is not None:
+            self.search.cancel()
+            self.search = None
+        if self.ponderer is not None:
+            self.ponderer.stop()
+            self.ponderer = None
+    
+    def quit(self):
+        """Cancela la búsqueda en curso y cierra la ventana."""
+        self.cancel_search()
+        self.root.quit()
     
     def check_game_over(self):
         """Verifica si el juego terminó y muestra mensaje."""
-        if not is_terminal(self.board):
+        if not is_terminal(self.board, self.geometry.connect):
             return False
         
         self.game_over = True
-        winner = get_winner(self.board)
+        winner = get_winner(self.board, self.geometry.connect)
         
         if winner is None:
             title = "Empate"
@@ -340,13 +419,15 @@ class Connect4GUI:
         self.status_label.config(text=text, fg=color)
 
 
-def main():
-    """Función principal para iniciar la GUI."""
+def main(geometry: Geometry = STANDARD):
+    """Función principal para iniciar la GUI ('geometry' es la variante)."""
     root = tk.Tk()
-    app = Connect4GUI(root)
+    app = Connect4GUI(root, geometry)
     root.mainloop()
 
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="Connect-4 contra la IA (interfaz gráfica)")
+    add_geometry_arguments(parser)
+    main(geometry_from_args(parser.parse_args()))
 
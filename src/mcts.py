@@ -0,0 +1,497 @@
+"""
+Monte Carlo Tree Search (UCT) para Connect-4.
+
+En lugar de evaluar con la heurística hasta una profundidad fija, MCTS
+juega muchas partidas simuladas (playouts) desde la posición y hace
+crecer un árbol hacia las jugadas que mejor resultado dan:
+
+1. Selección: desde la raíz se baja eligiendo en cada nodo el hijo con
+   mayor UCT = recompensa media + C * sqrt(ln N / n).
+2. Expansión: al volver a un nodo sin hijos se crean todos a la vez;
+   solo los que no pierden en el acto (ver threats.py) y, si hay una
+   victoria inmediata, solo esa.
+3. Simulación: desde el nodo nuevo se juega hasta el final sobre los
+   enteros del bitboard, con la política "random" (jugadas al azar) o
+   "tactical" (gana si puede, tapa la victoria inmediata del rival, no
+   juega debajo de una amenaza suya y, si no, al azar).
+4. Retropropagación: el resultado (1 gana, 0 tablas, -1 pierde) se suma
+   a cada nodo del camino desde el punto de vista de quien movió.
+
+El árbol vive en un NodePool: arrays preasignados (jugada, estado,
+visitas, recompensa, primer hijo y número de hijos) indexados por nodo,
+con los hijos de cada nodo en posiciones consecutivas; no se crea
+ningún objeto por nodo. Entre jugadas se reutiliza: la nueva raíz es el
+nodo de la posición actual (normalmente un nieto de la anterior) y, si
+el pool pasa de la mitad, se compacta copiando solo ese subárbol.
+
+El presupuesto es un número de playouts o un tiempo límite. Con un pool
+de procesos las simulaciones se reparten de dos formas:
+- "root": cada proceso construye su propio árbol con su parte del
+  presupuesto y se suman las visitas de cada jugada de la raíz,
+- "leaf": un solo árbol; en cada ronda se eligen varias hojas (con
+  pérdida virtual para no repetir la misma) y sus simulaciones se
+  reparten entre los procesos.
+
+Se juega la jugada de la raíz con más visitas.
+"""
+
+import math
+import random
+import time
+from array import array
+from concurrent.futures import Executor
+from typing import Dict, List, Optional, Tuple
+from .bitboard import BitBoard, popcount
+from .deadline import make_deadline
+from .geometry import Geometry
+from .search_stats import SearchStats
+from .threats import safe_cells
+
+POLICIES = ("tactical", "random")
+PARALLEL_MODES = ("root", "leaf")
+
+# Estado de un nodo: partida en curso, ganada por quien movió o en tablas
+_ONGOING = 0
+_WIN = 1
+_DRAW = 2
+
+# Estado de la simulación: (fichas del que mueve, todas las fichas, número de fichas)
+State = Tuple[int, int, int]
+
+
+def rollout(geometry: Geometry, current: int, mask: int, moves: int,
+            rng: random.Random, policy: str = "tactical") -> int:
+    """
+    Juega al azar hasta el final desde la posición ('current' = fichas del
+    jugador que mueve, 'mask' = todas, 'moves' = número de fichas).
+    Devuelve 1 si gana el que mueve, -1 si pierde y 0 si son tablas.
+    """
+    size = geometry.size
+    bottom = geometry.bottom_mask
+    board_mask = geometry.board_mask
+    column_masks = geometry.column_masks
+    winning_cells = geometry.winning_cells
+    has_line = geometry.has_line
+    tactical = policy == "tactical"
+    sign = 1
+    threats = winning_cells(current, mask) if tactical else 0
+    while moves < size:
+        possible = (mask + bottom) & board_mask
+        if tactical:
+            # Las mismas reglas que threats.safe_cells, reutilizando las amenazas
+            # del que mueve (eran las del rival en la jugada anterior)
+            if threats & possible:
+                return sign
+            opponent_threats = winning_cells(mask ^ current, mask)
+            forced = possible & opponent_threats
+            if forced:
+                if forced & (forced - 1):
+                    return -sign
+                possible = forced
+            possible &= ~(opponent_threats >> 1)
+            if not possible:
+                return -sign  # Todas sus jugadas dejan ganar al rival
+        options = [possible & column for column in column_masks if possible & column]
+        move = options[int(rng.random() * len(options))]
+        # Con "tactical" una jugada ganadora ya se habría visto arriba
+        if not tactical and has_line(current | move):
+            return sign
+        current = mask ^ current
+        mask |= move
+        moves += 1
+        sign = -sign
+        if tactical:
+            threats = opponent_threats & ~move
+    return 0
+
+
+def _rollout_batch(geometry: Geometry, states: List[State], policy: str, seed: int) -> List[int]:
+    """Tarea de un proceso (paralelismo "leaf"): resultado de una simulación por estado."""
+    rng = random.Random(seed)
+    return [rollout(geometry, current, mask, moves, rng, policy) for current, mask, moves in states]
+
+
+class NodePool:
+    """
+    Nodos del árbol en arrays paralelos de tamaño fijo 'capacity'. Un
+    nodo es un índice; sus hijos son first_child[i] ... first_child[i] +
+    child_count[i] - 1 (first_child = -1 si no se ha expandido).
+    """
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.move = array("b", bytes(capacity))
+        self.status = array("b", bytes(capacity))
+        self.child_count = array("b", bytes(capacity))
+        self.visits = array("l", [0]) * capacity
+        self.reward = array("d", [0.0]) * capacity
+        self.first_child = array("l", [-1]) * capacity
+        self.size = 0
+
+    def clear(self) -> None:
+        """Libera todos los nodos."""
+        self.size = 0
+
+    def allocate(self, count: int) -> int:
+        """Reserva 'count' nodos consecutivos vacíos y devuelve el primero (-1 si no caben)."""
+        first = self.size
+        if first + count > self.capacity:
+            return -1
+        self.size = first + count
+        for node in range(first, first + count):
+            self.visits[node] = 0
+            self.reward[node] = 0.0
+            self.first_child[node] = -1
+            self.child_count[node] = 0
+        return first
+
+
+class MCTS:
+    """
+    Árbol de MCTS que se conserva entre búsquedas.
+
+    - exploration: constante C de UCT.
+    - policy: política de las simulaciones ("tactical" o "random").
+    - capacity: número máximo de nodos; con el pool lleno el árbol deja
+      de crecer y se simula desde las hojas.
+    - Tras cada búsqueda: playouts (simulaciones hechas), reused (visitas
+      heredadas de la búsqueda anterior) y elapsed (segundos).
+    """
+
+    def __init__(self, exploration: float = 1.4, policy: str = "tactical",
+                 capacity: int = 500_000, seed: Optional[int] = None):
+        if policy not in POLICIES:
+            raise ValueError(f"Política de simulación desconocida: {policy}")
+        self.exploration = exploration
+        self.policy = policy
+        self.pool = NodePool(capacity)
+        self.rng = random.Random(seed)
+        self.root = -1
+        # Raíz actual: (geometría, fichas de MAX, fichas de MIN, jugador al turno)
+        self._root_position: Optional[Tuple[Geometry, int, int, int]] = None
+        self.playouts = 0
+        self.reused = 0
+        self.elapsed = 0.0
+
+    def reset(self) -> None:
+        """Descarta el árbol."""
+        self.pool.clear()
+        self.root = -1
+        self._root_position = None
+
+    # --- Raíz y reutilización del árbol ---
+
+    def _set_root(self, pos: BitBoard) -> None:
+        """Pone la raíz en 'pos', reutilizando su subárbol si ya estaba en el árbol."""
+        node = self._find(pos)
+        if node < 0:
+            self.pool.clear()
+            node = self.pool.allocate(1)
+            self.pool.status[node] = _ONGOING
+            self.reused = 0
+        else:
+            self.reused = self.pool.visits[node]
+            if self.pool.size > self.pool.capacity // 2:
+                node = self._compact(node)
+        self.root = node
+        self._root_position = (pos.geometry, pos.bits[0], pos.bits[1], pos.current)
+
+    def _find(self, pos: BitBoard) -> int:
+        """Nodo del árbol actual con la posición 'pos' (-1 si no está)."""
+        if self._root_position is None:
+            return -1
+        geometry, bits0, bits1, current = self._root_position
+        if geometry is not pos.geometry:
+            return -1
+        target = pos.bits
+        if bits0 & ~target[0] or bits1 & ~target[1]:
+            return -1
+        plies = pos.moves - popcount(bits0 | bits1)
+        if (current + plies) % 2 != pos.current:
+            return -1
+
+        pool = self.pool
+        bottom = geometry.bottom_mask
+        column_masks = geometry.column_masks
+        # Se baja por los hijos cuya ficha está en 'pos' y es del jugador que la puso
+        stack = [(self.root, bits0, bits1, current, 0)]
+        while stack:
+            node, own0, own1, player, depth = stack.pop()
+            if depth == plies:
+                if own0 == target[0] and own1 == target[1]:
+                    return node
+                continue
+            first = pool.first_child[node]
+            if first < 0:
+                continue
+            mask = own0 | own1
+            for child in range(first, first + pool.child_count[node]):
+                cell = (mask + bottom) & column_masks[pool.move[child]]
+                if cell & target[player]:
+                    if player == 0:
+                        stack.append((child, own0 | cell, own1, 1, depth + 1))
+                    else:
+                        stack.append((child, own0, own1 | cell, 0, depth + 1))
+        return -1
+
+    def _compact(self, root: int) -> int:
+        """Copia el subárbol de 'root' al principio de un pool nuevo y devuelve la nueva raíz."""
+        old = self.pool
+        new = NodePool(old.capacity)
+        queue = [(root, new.allocate(1))]
+        for old_node, new_node in queue:
+            new.move[new_node] = old.move[old_node]
+            new.status[new_node] = old.status[old_node]
+            new.visits[new_node] = old.visits[old_node]
+            new.reward[new_node] = old.reward[old_node]
+            first = old.first_child[old_node]
+            if first >= 0:
+                count = old.child_count[old_node]
+                new_first = new.allocate(count)
+                new.first_child[new_node] = new_first
+                new.child_count[new_node] = count
+                queue.extend((first + i, new_first + i) for i in range(count))
+        self.pool = new
+        return 0
+
+    # --- Una simulación ---
+
+    def _expand(self, node: int, geometry: Geometry, current: int, mask: int, moves: int) -> int:
+        """Crea los hijos de 'node' (del centro a los bordes) y devuelve el primero (-1 si no caben)."""
+        possible = (mask + geometry.bottom_mask) & geometry.board_mask
+        cells = geometry.winning_cells(current, mask) & possible
+        if cells:
+            status = _WIN
+        else:
+            # Sin jugadas seguras la posición está perdida: se dejan todas
+            cells = safe_cells(geometry, current, mask) or possible
+            status = _DRAW if moves + 1 == geometry.size else _ONGOING
+        columns = [col for col in geometry.center_order if cells & geometry.column_masks[col]]
+        if status == _WIN:
+            columns = columns[:1]
+
+        pool = self.pool
+        first = pool.allocate(len(columns))
+        if first < 0:
+            return -1
+        for i, col in enumerate(columns):
+            pool.move[first + i] = col
+            pool.status[first + i] = status
+        pool.first_child[node] = first
+        pool.child_count[node] = len(columns)
+        return first
+
+    def _descend(self, geometry: Geometry, current: int, mask: int,
+                 moves: int) -> Tuple[List[int], Optional[float], State]:
+        """
+        Selección y expansión desde la raíz. Devuelve (camino, recompensa,
+        estado de la hoja): la recompensa (para quien movió a la hoja) si
+        la hoja es terminal, o None si hay que simular desde su estado.
+        """
+        pool = self.pool
+        visits = pool.visits
+        reward = pool.reward
+        first_child = pool.first_child
+        exploration = self.exploration
+        bottom = geometry.bottom_mask
+        column_masks = geometry.column_masks
+        node = self.root
+        path = [node]
+        while True:
+            status = pool.status[node]
+            if status == _WIN:
+                return path, 1.0, (current, mask, moves)
+            if status == _DRAW:
+                return path, 0.0, (current, mask, moves)
+            first = first_child[node]
+            if first < 0:
+                # Un nodo nuevo se simula; se expande la siguiente vez que se llega a él
+                if visits[node] == 0 and node != self.root:
+                    return path, None, (current, mask, moves)
+                first = self._expand(node, geometry, current, mask, moves)
+                if first < 0:
+                    return path, None, (current, mask, moves)
+
+            # UCT; los hijos sin visitar van primero, en orden
+            chosen = first
+            best = -math.inf
+            log_visits = math.log(visits[node]) if visits[node] else 0.0
+            for child in range(first, first + pool.child_count[node]):
+                n = visits[child]
+                if n == 0:
+                    chosen = child
+                    break
+                value = reward[child] / n + exploration * math.sqrt(log_visits / n)
+                if value > best:
+                    best = value
+                    chosen = child
+
+            cell = (mask + bottom) & column_masks[pool.move[chosen]]
+            current = mask ^ current
+            mask |= cell
+            moves += 1
+            node = chosen
+            path.append(node)
+
+    def _backpropagate(self, path: List[int], result: float) -> None:
+        """Suma 'result' (para quien movió al último nodo) a todo el camino, alternando el signo."""
+        visits = self.pool.visits
+        reward = self.pool.reward
+        for node in reversed(path):
+            visits[node] += 1
+            reward[node] += result
+            result = -result
+
+    # --- Búsqueda ---
+
+    def search(self, pos: BitBoard, playouts: Optional[int] = None,
+               deadline: Optional[float] = None, stats: Optional[SearchStats] = None,
+               executor: Optional[Executor] = None, workers: int = 0) -> int:
+        """
+        Simula desde 'pos' hasta agotar 'playouts' o 'deadline' (instante
+        de perf_counter, ver deadline.py) y devuelve la jugada con más
+        visitas. Con 'executor' y 'workers' las simulaciones se reparten
+        entre procesos (paralelismo "leaf"). 'stats' cuenta un nodo por
+        simulación (y permite cancelar la búsqueda, ver background_search.py).
+        """
+        if playouts is None and deadline is None:
+            raise ValueError("Se necesita un número de playouts o un tiempo límite")
+        if pos.is_terminal():
+            raise ValueError("No hay movimientos válidos")
+        start = time.perf_counter()
+        self._set_root(pos)
+        if self.pool.first_child[self.root] < 0:
+            self._expand(self.root, pos.geometry, pos.bits[pos.current],
+                         pos.bits[0] | pos.bits[1], pos.moves)
+        self.playouts = 0
+        # Una sola jugada (gana ya o es la única que no pierde): no hace falta simular
+        if self.pool.child_count[self.root] > 1:
+            if executor is not None and workers > 0:
+                self._search_leaves(pos, playouts, deadline, stats, executor, workers)
+            else:
+                self._search_serial(pos, playouts, deadline, stats)
+        self.elapsed = time.perf_counter() - start
+        return self.best_move()
+
+    def _search_serial(self, pos: BitBoard, playouts: Optional[int], deadline: Optional[float],
+                       stats: Optional[SearchStats]) -> None:
+        geometry = pos.geometry
+        root_state = (pos.bits[pos.current], pos.bits[0] | pos.bits[1], pos.moves)
+        rng = self.rng
+        policy = self.policy
+        while ((playouts is None or self.playouts < playouts)
+               and (deadline is None or time.perf_counter() < deadline)):
+            if stats is not None:
+                stats.enter(pos)
+            path, result, leaf = self._descend(geometry, *root_state)
+            if result is None:
+                # La simulación da el resultado para el que mueve en la hoja
+                result = -rollout(geometry, *leaf, rng, policy)
+            self._backpropagate(path, result)
+            self.playouts += 1
+
+    def _search_leaves(self, pos: BitBoard, playouts: Optional[int], deadline: Optional[float],
+                       stats: Optional[SearchStats], executor: Executor, workers: int) -> None:
+        geometry = pos.geometry
+        root_state = (pos.bits[pos.current], pos.bits[0] | pos.bits[1], pos.moves)
+        visits = self.pool.visits
+        reward = self.pool.reward
+        batch = workers * 8
+        try:
+            while ((playouts is None or self.playouts < playouts)
+                   and (deadline is None or time.perf_counter() < deadline)):
+                count = batch if playouts is None else min(batch, playouts - self.playouts)
+                leaves = []
+                for _ in range(count):
+                    if stats is not None:
+                        stats.enter(pos)
+                    path, result, leaf = self._descend(geometry, *root_state)
+                    # Pérdida virtual: el camino parece peor hasta tener su resultado
+                    for node in path:
+                        visits[node] += 1
+                        reward[node] -= 1.0
+                    leaves.append((path, result, leaf))
+
+                states = [leaf for _, result, leaf in leaves if result is None]
+                futures = [executor.submit(_rollout_batch, geometry, states[i::workers], self.policy,
+                                           self.rng.getrandbits(32))
+                           for i in range(min(workers, len(states)))]
+                outcomes = [future.result() for future in futures]
+                k = 0
+                for path, result, _ in leaves:
+                    for node in path:
+                        visits[node] -= 1
+                        reward[node] += 1.0
+                    if result is None:
+                        # El estado k fue a la tarea k % workers, en la posición k // workers
+                        result = -outcomes[k % workers][k // workers]
+                        k += 1
+                    self._backpropagate(path, result)
+                self.playouts += count
+        except BaseException:
+            # Una cancelación a mitad de ronda deja pérdidas virtuales: el árbol no sirve
+            self.reset()
+            raise
+
+    # --- Resultados ---
+
+    def root_visits(self) -> Dict[int, int]:
+        """Visitas de cada jugada de la raíz."""
+        pool = self.pool
+        first = pool.first_child[self.root]
+        if first < 0:
+            return {}
+        return {pool.move[child]: pool.visits[child]
+                for child in range(first, first + pool.child_count[self.root])}
+
+    def best_move(self) -> int:
+        """Jugada de la raíz con más visitas (ante empate, la más central)."""
+        visits = self.root_visits()
+        return max(visits, key=visits.get)
+
+    def principal_variation(self) -> List[int]:
+        """Línea que sigue desde la raíz el hijo más visitado de cada nodo."""
+        pool = self.pool
+        line = []
+        node = self.root
+        while node >= 0 and pool.first_child[node] >= 0:
+            first = pool.first_child[node]
+            node = max(range(first, first + pool.child_count[node]), key=pool.visits.__getitem__)
+            if pool.visits[node] == 0:
+                break
+            line.append(pool.move[node])
+        return line
+
+
+def _root_search(pos: BitBoard, playouts: Optional[int], time_limit_ms: Optional[float],
+                 exploration: float, policy: str, capacity: int, seed: int) -> Tuple[Dict[int, int], int]:
+    """Tarea de un proceso (paralelismo "root"): visitas de la raíz de un árbol propio y playouts."""
+    tree = MCTS(exploration, policy, capacity, seed)
+    deadline = make_deadline(time_limit_ms) if time_limit_ms is not None else None
+    tree.search(pos, playouts, deadline)
+    return tree.root_visits(), tree.playouts
+
+
+def root_parallel_search(executor: Executor, workers: int, pos: BitBoard,
+                         playouts: Optional[int] = None, time_limit_ms: Optional[float] = None,
+                         exploration: float = 1.4, policy: str = "tactical",
+                         capacity: int = 500_000, seed: int = 0) -> Tuple[int, Dict[int, int], int]:
+    """
+    Paralelismo "root": 'workers' árboles independientes (semillas seed,
+    seed + 1...) se reparten 'playouts' o usan cada uno 'time_limit_ms'.
+    Devuelve (jugada con más visitas sumadas, visitas de cada jugada, playouts totales).
+    """
+    share = None if playouts is None else -(-playouts // workers)
+    futures = [executor.submit(_root_search, pos, share, time_limit_ms, exploration, policy,
+                               capacity, seed + i)
+               for i in range(workers)]
+    visits: Dict[int, int] = {}
+    total = 0
+    for future in futures:
+        tree_visits, count = future.result()
+        for col, n in tree_visits.items():
+            visits[col] = visits.get(col, 0) + n
+        total += count
+    # Las jugadas vienen del centro a los bordes: ante empate gana la más central
+    best = max(visits, key=visits.get)
+    return best, visits, total
@@ -1,76 +1,444 @@
 """
 Implementación de Minimax con poda Alfa-Beta para Connect-4.
+
+El núcleo es un negamax: negamax() devuelve la puntuación de la posición
+para el jugador que mueve y el valor de un hijo es el del nieto cambiado
+de signo, así que no hay nodos MAX y MIN por separado ni se cambia la
+perspectiva de la evaluación en cada nodo. Las puntuaciones son enteras:
+- la heurística (entera) de MAX con el signo del jugador que mueve,
+- 0 en tablas,
+- una victoria con la ficha número N vale mate_value - N (ver
+  evaluation.mate_value) y una derrota, lo mismo con signo contrario: se
+  prefiere ganar antes y perder más tarde, y mate_distance() da las
+  jugadas hasta la ficha ganadora.
+Como N es el número absoluto de fichas, la puntuación de una posición no
+depende del camino ni de la raíz: la tabla de transposiciones la guarda
+tal cual y sirve para los dos jugadores.
+
+La búsqueda trabaja sobre un IncrementalBitBoard: cada nodo hace y deshace
+el movimiento en la misma posición en lugar de copiar el tablero, y la
+heurística se actualiza con cada jugada en lugar de recalcularse.
+Opcionalmente usa una tabla de transposiciones (ver transposition.py) y
+un MoveOrderer para probar primero las jugadas más prometedoras
+(ver move_ordering.py) y un SearchStats para instrumentar la búsqueda
+(ver search_stats.py).
+
+En cada nodo que no es hoja (profundidad restante >= 1), el análisis de
+amenazas (ver threats.py) resuelve sin buscar las victorias inmediatas y
+las derrotas forzadas, y descarta las jugadas que pierden en el acto.
+Esto no se limita a los nodos cercanos a las hojas, así que cambia los
+valores a profundidad fija a cualquier profundidad: un nodo a
+profundidad 1 sin jugadas seguras vale una derrota en lugar de la
+heurística de sus hijos, y sin las jugadas que pierden en el acto los
+valores heurísticos que suben por el árbol son otros. Las victorias y
+derrotas que resultan son exactas (nunca más lentas que las del
+EndgameSolver), pero la jugada elegida puede cambiar.
+
+La raíz se puede buscar con tres "drivers" (DRIVERS), que devuelven el
+mismo valor y la misma jugada:
+- "alphabeta": cada jugada con ventana (mejor valor hasta el momento, INFINITY).
+- "pvs" (Principal Variation Search / NegaScout): en cada nodo la
+  primera jugada con ventana completa y el resto con ventana nula
+  (alpha, alpha + 1), que solo comprueba si la mejoran; si la mejoran se
+  repite con la ventana completa.
+- "mtdf": MTD(f), una sucesión de búsquedas de ventana nula alrededor de
+  una estimación (el valor de la iteración anterior) que acotan el valor
+  por arriba y por abajo hasta que coinciden. Las pasadas repiten nodos,
+  así que se apoya en la tabla de transposiciones (si no se pasa una, usa
+  una propia).
+Las ventanas nulas son exactas porque todas las puntuaciones son enteras.
+
+También ofrece un modo con presupuesto de tiempo (profundización iterativa)
+en iterative_deepening_minimax.
 """
 
-from .config import MAX_PLAYER, MIN_PLAYER
-from .board import Board, get_valid_moves, apply_move, is_terminal
-from .evaluation import evaluate
+import time
+from typing import Dict, List, Optional, Tuple, Union
+from .config import MAX_PLAYER
+from .board import Board
+from .bitboard import BitBoard, as_bitboard
+from .deadline import SearchTimeout, make_deadline, check_deadline
+from .evaluation import IncrementalBitBoard, mate_value, mate_distance
+from .transposition import TranspositionTable, EXACT, LOWER, UPPER, tt_key
+from .move_ordering import MoveOrderer
+from .search_stats import SearchStats
+from .threats import columns, immediate_wins, safe_moves
+
+DRIVERS = ("alphabeta", "pvs", "mtdf")
 
+# Mayor que cualquier puntuación: ventana completa (-INFINITY, INFINITY)
+INFINITY = 1 << 30
 
-def minimax(board: Board, depth: int, alpha: float, beta: float, maximizing: bool, player: str) -> float:
+# Signo de la heurística de MAX para el jugador que mueve (índice 0 = MAX)
+_SIGN = (1, -1)
+
+
+def negamax(pos: IncrementalBitBoard, depth: int, alpha: int, beta: int,
+            tt: Optional[TranspositionTable] = None, deadline: Optional[float] = None,
+            ordering: Optional[MoveOrderer] = None, stats: Optional[SearchStats] = None,
+            pvs: bool = False) -> int:
     """
-    Minimax con poda alfa-beta.
-    Devuelve la puntuación estimada del tablero desde la perspectiva de 'player'.
-    
+    Negamax con poda alfa-beta.
+    Devuelve la puntuación entera de 'pos' para el jugador que mueve (fail-soft:
+    <= alpha es una cota superior y >= beta una inferior).
+    Si se pasa 'tt', consulta y actualiza la tabla de transposiciones.
+    Si se pasa 'deadline', lanza SearchTimeout al superarlo.
+    Si se pasa 'ordering', ordena las jugadas y registra las podas.
+    Si se pasa 'stats', registra nodos, podas, tiempos y variante principal.
+    Con 'pvs', las jugadas después de la primera se prueban con ventana nula (ver DRIVERS).
     """
-    # Evaluación del estado actual (desde perspectiva del jugador)
-    val = evaluate(board)
-    if player == MIN_PLAYER:  
-        val = -val
-    
-    # Criterios de parada
-    if depth == 0 or is_terminal(board):
-        return val
-
-    valid_moves = get_valid_moves(board)
-    if not valid_moves:
-        return val
-    
-    # Determinar quién es el oponente
-    opponent = MIN_PLAYER if player == MAX_PLAYER else MAX_PLAYER  
-
-    if maximizing:
-        best_value = -float("inf")
-        for col in valid_moves:
-            child_board = apply_move(board, col, player)  #  Usar 'player' no MAX_PLAYER
-            value = minimax(child_board, depth - 1, alpha, beta, False, player)  
-            best_value = max(best_value, value)
-            alpha = max(alpha, best_value)
-            if alpha >= beta:
-                break  # poda
-        return best_value
+    if deadline is not None:
+        check_deadline(deadline)
+    if ordering is not None:
+        ordering.nodes += 1
+    if stats is not None:
+        ply = stats.enter(pos)
+        start = time.perf_counter()
+
+    # Hojas: solo puede haber ganado quien acaba de mover (su ficha N = moves)
+    geometry = pos.geometry
+    moves = pos.moves
+    if pos.history and geometry.has_line(pos.bits[pos.current ^ 1]):
+        value = moves - mate_value(geometry)
+    elif moves == geometry.size:
+        value = 0
+    elif depth == 0:
+        value = pos.scores[0] * _SIGN[pos.current]
     else:
-        best_value = float("inf")
-        for col in valid_moves:
-            child_board = apply_move(board, col, opponent)  # Usar 'opponent' no MIN_PLAYER
-            value = minimax(child_board, depth - 1, alpha, beta, True, player)  
-            best_value = min(best_value, value)
-            beta = min(beta, best_value)
-            if alpha >= beta:
-                break  # poda
-        return best_value
-
-
-def find_best_move_minimax(board: Board, depth: int, player: str = MAX_PLAYER) -> int:
+        value = None
+    if stats is not None:
+        stats.eval_time += time.perf_counter() - start
+    if value is not None:
+        if stats is not None:
+            stats.leaves += 1
+        return value
+
+    # Amenazas (ver threats.py): una victoria inmediata resuelve el nodo, y
+    # también que todas las jugadas pierdan en el acto; si no, las jugadas
+    # que pierden en el acto (valen una derrota) no se buscan.
+    if stats is not None:
+        start = time.perf_counter()
+    wins = immediate_wins(pos)
+    safe = 0 if wins else safe_moves(pos)
+    if stats is not None:
+        stats.movegen_time += time.perf_counter() - start
+    if wins or not safe:
+        if stats is not None:
+            stats.leaves += 1
+            if wins:
+                stats.set_pv(ply, columns(pos, wins)[:1])
+        # Gana con la ficha moves + 1 o pierde con la del rival, moves + 2
+        mate = mate_value(geometry)
+        return mate - moves - 1 if wins else moves + 2 - mate
+    valid_moves = columns(pos, safe)
+
+    # Cotas de victoria: sin victoria inmediata, lo mejor es ganar con la
+    # ficha moves + 3 y, sin jugadas que pierden en el acto, lo peor es
+    # perder con la moves + 4. Fuera de ellas no hay nada que buscar (como
+    # con ±inf, una victoria ya encontrada corta aunque beta sea INFINITY).
+    mate = mate_value(geometry)
+    if beta > mate - moves - 3:
+        beta = mate - moves - 3
+        if alpha >= beta:
+            return beta
+    if alpha < moves + 4 - mate:
+        alpha = moves + 4 - mate
+        if alpha >= beta:
+            return alpha
+
+    # Consulta a la tabla de transposiciones
+    alpha_orig, beta_orig = alpha, beta
+    key = 0
+    mirrored = False
+    tt_move = None
+    if tt is not None:
+        key, mirrored = tt_key(pos)
+        entry = tt.probe(key)
+        if entry is not None:
+            _, entry_depth, flag, value, tt_move = entry
+            if mirrored and tt_move is not None:
+                tt_move = geometry.cols - 1 - tt_move
+            if entry_depth >= depth:
+                if flag == EXACT:
+                    return value
+                if flag == LOWER:
+                    alpha = max(alpha, value)
+                else:
+                    beta = min(beta, value)
+                if alpha >= beta:
+                    return value
+
+    # La mejor jugada guardada en la tabla se prueba primero
+    if stats is not None:
+        start = time.perf_counter()
+    if ordering is not None:
+        valid_moves = ordering.order(pos, valid_moves, tt_move)
+    elif tt_move is not None and tt_move != valid_moves[0] and tt_move in valid_moves:
+        valid_moves.remove(tt_move)
+        valid_moves.insert(0, tt_move)
+    if stats is not None:
+        stats.movegen_time += time.perf_counter() - start
+
+    best_move = valid_moves[0]
+    best_value = -INFINITY
+    for i, col in enumerate(valid_moves):
+        pos.make_move(col)
+        if pvs and i > 0:
+            value = -negamax(pos, depth - 1, -alpha - 1, -alpha, tt, deadline, ordering, stats, pvs)
+            if alpha < value < beta:
+                value = -negamax(pos, depth - 1, -beta, -alpha, tt, deadline, ordering, stats, pvs)
+        else:
+            value = -negamax(pos, depth - 1, -beta, -alpha, tt, deadline, ordering, stats, pvs)
+        pos.undo_move()
+        if value > best_value:
+            best_value = value
+            best_move = col
+            if stats is not None:
+                stats.update_pv(ply, col)
+            if value > alpha:
+                alpha = value
+                if alpha >= beta:
+                    if ordering is not None:
+                        ordering.record_cutoff(pos, col, depth, i)
+                    if stats is not None:
+                        stats.cutoffs += 1
+                        if i == 0:
+                            stats.first_move_cutoffs += 1
+                    break  # poda
+
+    if tt is not None:
+        if best_value <= alpha_orig:
+            flag = UPPER
+        elif best_value >= beta_orig:
+            flag = LOWER
+        else:
+            flag = EXACT
+        tt.store(key, depth, flag, best_value,
+                 geometry.cols - 1 - best_move if mirrored else best_move)
+    return best_value
+
+
+def _root_pass(pos: IncrementalBitBoard, depth: int, moves: List[int], alpha: int, beta: int,
+               tt: Optional[TranspositionTable], deadline: Optional[float],
+               ordering: Optional[MoveOrderer], stats: Optional[SearchStats],
+               pvs: bool) -> Tuple[Optional[int], int, Dict[int, int]]:
     """
-    Elige la mejor columna para 'player' usando minimax.
-    
+    Busca las jugadas de 'moves' (en ese orden) con ventana (alpha, beta)
+    y devuelve (mejor jugada, su valor, valor o cota de cada jugada
+    buscada). Ante empates gana la primera jugada del orden dado.
+
+    Cada hijo se busca con alpha = mejor valor hasta el momento: las jugadas
+    que no lo superan devuelven solo una cota superior (<= alpha), lo que
+    no cambia la jugada elegida pero ahorra nodos. Con 'pvs' esa
+    comprobación se hace con ventana nula. Al llegar a beta se corta.
     """
-    best_value = -float("inf")
+    best_value = -INFINITY
     best_move = None
+    scores = {}
+    if ordering is not None:
+        ordering.nodes += 1
+    if stats is not None:
+        stats.enter(pos)
 
-    for col in get_valid_moves(board):
-        child_board = apply_move(board, col, player)  # Usar 'player' no MAX_PLAYER
-        move_value = minimax(child_board, depth - 1, -float("inf"), float("inf"), False, player) 
+    for i, col in enumerate(moves):
+        floor = max(alpha, best_value)
+        pos.make_move(col)
+        if pvs and i > 0:
+            move_value = -negamax(pos, depth - 1, -floor - 1, -floor, tt, deadline, ordering, stats, pvs)
+            if floor < move_value < beta:
+                move_value = -negamax(pos, depth - 1, -beta, -floor, tt, deadline, ordering, stats, pvs)
+        else:
+            move_value = -negamax(pos, depth - 1, -beta, -floor, tt, deadline, ordering, stats, pvs)
+        pos.undo_move()
+        scores[col] = move_value
         if move_value > best_value or best_move is None:
             best_value = move_value
             best_move = col
+            if stats is not None:
+                stats.update_pv(0, col)
+            if best_value >= beta:
+                break
+
+    if tt is not None and best_move is not None:
+        if best_value >= beta:
+            flag = LOWER
+        elif best_value <= alpha:
+            flag = UPPER
+        else:
+            flag = EXACT
+        key, mirrored = tt_key(pos)
+        tt.store(key, depth, flag, best_value,
+                 pos.geometry.cols - 1 - best_move if mirrored else best_move)
+    return best_move, best_value, scores
+
+
+def _mtdf(pos: IncrementalBitBoard, depth: int, moves: List[int], guess: int,
+          tt: Optional[TranspositionTable], deadline: Optional[float],
+          ordering: Optional[MoveOrderer],
+          stats: Optional[SearchStats]) -> Tuple[Optional[int], int, Dict[int, int]]:
+    """
+    MTD(f): pasadas de ventana nula (beta - 1, beta) por la raíz empezando
+    en 'guess'. Una pasada que llega a beta da una cota inferior (y su
+    jugada es la mejor hasta el momento); una que no, una superior. Para
+    cuando las cotas coinciden. Mismo resultado que _root_pass con la
+    ventana completa.
+    """
+    lower, upper = -INFINITY, INFINITY
+    value = guess
+    best_move = None
+    scores: Dict[int, int] = {}
+    line: List[int] = []
+    failed_low = False
+    while lower < upper:
+        beta = value + 1 if value == lower else value
+        move, value, pass_scores = _root_pass(pos, depth, moves, beta - 1, beta, tt, deadline,
+                                              ordering, stats, False)
+        scores.update(pass_scores)
+        failed_low = value < beta
+        if failed_low:
+            upper = value
+        else:
+            lower = value
+            best_move = move
+            if stats is not None:
+                line = stats.line(0)
+    if best_move is None:
+        # Todas pierden lo antes posible: como alfa-beta, la primera
+        best_move = moves[0]
+    if stats is not None and failed_low:
+        # La variante es la de la última pasada que llegó a beta
+        stats.set_pv(0, line or [best_move])
+    return best_move, value, scores
+
+
+def _search_root(pos: IncrementalBitBoard, depth: int, moves: List[int],
+                 tt: Optional[TranspositionTable] = None,
+                 deadline: Optional[float] = None,
+                 ordering: Optional[MoveOrderer] = None,
+                 stats: Optional[SearchStats] = None, driver: str = "alphabeta",
+                 guess: int = 0) -> Tuple[Optional[int], int, Dict[int, int]]:
+    """
+    Busca la raíz con el driver indicado (ver DRIVERS) y devuelve (mejor
+    jugada, su valor, valor o cota de cada jugada). 'guess' es la
+    estimación inicial de MTD(f).
+    """
+    if driver == "mtdf":
+        return _mtdf(pos, depth, moves, guess, tt, deadline, ordering, stats)
+    return _root_pass(pos, depth, moves, -INFINITY, INFINITY, tt, deadline,
+                      ordering, stats, driver == "pvs")
+
+
+def _check_driver(driver: str, tt: Optional[TranspositionTable]) -> Optional[TranspositionTable]:
+    """Valida 'driver' y devuelve la tabla a usar (MTD(f) siempre necesita una)."""
+    if driver not in DRIVERS:
+        raise ValueError(f"Driver de búsqueda desconocido: {driver}")
+    if driver == "mtdf" and tt is None:
+        return TranspositionTable()
+    return tt
+
+
+def find_best_move_minimax(board: Union[Board, BitBoard], depth: int, player: str = MAX_PLAYER,
+                           tt: Optional[TranspositionTable] = None,
+                           ordering: Optional[MoveOrderer] = None,
+                           stats: Optional[SearchStats] = None, driver: str = "alphabeta") -> int:
+    """
+    Elige la mejor columna para 'player' usando minimax.
+    Acepta un Board o un BitBoard (que no se modifica).
+    'tt' es una tabla de transposiciones opcional que puede reutilizarse
+    entre llamadas de la misma partida; 'ordering' un MoveOrderer opcional
+    y 'stats' un SearchStats opcional (sus estadísticas quedan disponibles
+    tras la búsqueda). 'driver' elige cómo se busca (ver DRIVERS).
+    """
+    tt = _check_driver(driver, tt)
+    pos = as_bitboard(board, player, IncrementalBitBoard)
+    # En posiciones simétricas basta con buscar media raíz
+    moves = pos.fold_symmetric(pos.get_valid_moves())
+    if ordering is not None:
+        ordering.new_search(depth, pos.geometry)
+        moves = ordering.order(pos, moves)
+    if stats is not None:
+        stats.new_search(pos)
+    guess = 0
+    if driver == "mtdf":
+        # La tabla que se conserva entre jugadas suele tener ya un valor de la raíz
+        entry = tt.probe(tt_key(pos)[0])
+        if entry is not None:
+            guess = entry[3]
+    best_move, _, _ = _search_root(pos, depth, moves, tt, None, ordering, stats, driver, guess)
+    if stats is not None:
+        stats.complete(depth)
 
     # Por seguridad, si todo falla, devolvemos cualquier movimiento válido
     if best_move is None:
-        valid_moves = get_valid_moves(board)
+        valid_moves = pos.get_valid_moves()
         if not valid_moves:
             raise ValueError("No hay movimientos válidos")
         return valid_moves[0]
 
-    return best_move
\ No newline at end of file
+    return best_move
+
+
+def iterative_deepening_minimax(board: Union[Board, BitBoard], time_limit_ms: float,
+                                player: str = MAX_PLAYER,
+                                tt: Optional[TranspositionTable] = None,
+                                max_depth: Optional[int] = None,
+                                ordering: Optional[MoveOrderer] = None,
+                                stats: Optional[SearchStats] = None,
+                                driver: str = "alphabeta") -> Tuple[int, int]:
+    """
+    Minimax con presupuesto de tiempo: busca a profundidad 1, 2, 3...
+    hasta agotar 'time_limit_ms' y devuelve (mejor jugada, profundidad
+    alcanzada) de la última iteración completa.
+
+    Cada iteración prueba primero las jugadas que mejor puntuaron en la
+    anterior (la variante principal va delante); con 'tt' el orden interno
+    también se reutiliza. La profundidad 1 se completa siempre, y se para
+    al encontrar una victoria o una derrota forzada (la más rápida o la
+    más lenta aparece en la primera profundidad que la alcanza).
+    Las estadísticas de 'ordering' y 'stats' acumulan todas las iteraciones.
+    Con driver="mtdf", cada iteración empieza en el valor de la anterior
+    (ventana de aspiración).
+    """
+    tt = _check_driver(driver, tt)
+    deadline = make_deadline(time_limit_ms)
+    pos = as_bitboard(board, player, IncrementalBitBoard)
+    moves = pos.fold_symmetric(pos.get_valid_moves())
+    if not moves:
+        raise ValueError("No hay movimientos válidos")
+    if ordering is not None:
+        ordering.new_search(0, pos.geometry)
+        moves = ordering.order(pos, moves)
+    if stats is not None:
+        stats.new_search(pos)
+
+    remaining = pos.geometry.size - pos.moves
+    max_depth = remaining if max_depth is None else min(max_depth, remaining)
+    best_move, reached = moves[0], 0
+    guess = 0
+    root_ply = len(pos.history)
+
+    for depth in range(1, max_depth + 1):
+        try:
+            move, value, scores = _search_root(pos, depth, moves, tt,
+                                               deadline if depth > 1 else None, ordering, stats,
+                                               driver, guess)
+        except SearchTimeout:
+            # La búsqueda se cortó a mitad: deshacer lo que quedó jugado
+            while len(pos.history) > root_ply:
+                pos.undo_move()
+            break
+        best_move, reached = move, depth
+        if stats is not None:
+            stats.complete(depth)
+        # Orden para la siguiente iteración: la mejor jugada y después de
+        # mejor a peor puntuación (las que no se buscaron, al final)
+        moves = sorted(moves, key=lambda c: (c != move, -scores.get(c, -INFINITY)))
+        guess = value
+        if mate_distance(value, pos.moves, pos.geometry) is not None:
+            break  # Resultado forzado: no hace falta profundizar más
+
+    if ordering is not None:
+        ordering.depth = reached
+    if stats is not None:
+        stats.stop()
+    return best_move, reached
@@ -0,0 +1,190 @@
+"""
+Libro de aperturas para Connect-4.
+
+Todas las partidas empiezan igual, así que las búsquedas de las primeras
+jugadas se pueden calcular una vez y guardar. build_book recorre todas las
+posiciones hasta N plies, busca cada una con Minimax a una profundidad
+alta y guarda la mejor jugada en un fichero binario ordenado.
+
+Formato del fichero (little-endian):
+- Cabecera de 16 bytes: "C4BK", versión, filas, columnas, plies,
+  profundidad, número de entradas y N en línea (la versión 1 no lo
+  guardaba: sus libros son del tablero estándar).
+- Entradas de 8 bytes ordenadas: (clave de la posición << 8) | jugada.
+
+Cada libro es de una variante (build_book(geometry=...); --rows, --cols
+y --connect desde consola) y solo responde en posiciones de esa
+variante. La clave ocupa (filas + 1) * columnas bits y tiene que caber
+en los 56 bits altos de la entrada (el tablero estándar usa 49).
+
+Las posiciones simétricas (reflejo izquierda/derecha) comparten entrada:
+se guarda la clave menor de las dos y la jugada en esa orientación.
+
+OpeningBook abre el fichero con mmap y busca por bisección directamente
+sobre los bytes, sin leerlo ni parsearlo entero.
+
+Uso desde consola:
+    python -m src.opening_book --plies 6 --depth 10 --out book.bin
+    python -m src.opening_book --plies 4 --depth 8 --rows 5 --cols 6 --out book56.bin
+"""
+
+import argparse
+import mmap
+import struct
+import time
+from typing import Callable, Dict, Optional, Union
+from .config import CONNECT
+from .board import Board
+from .bitboard import BitBoard, as_bitboard, canonical_key
+from .geometry import Geometry, STANDARD, add_geometry_arguments, geometry_from_args, get_geometry
+from .minimax_search import find_best_move_minimax
+from .move_ordering import MoveOrderer
+from .transposition import TranspositionTable
+
+MAGIC = b"C4BK"
+VERSION = 2
+HEADER = struct.Struct("<4sHBBBBIBx")
+ENTRY = struct.Struct("<Q")
+KEY_BITS = 56
+
+
+def build_book(path: str, plies: int = 4, depth: int = 8,
+               progress: Optional[Callable[[int, int], None]] = None,
+               geometry: Geometry = STANDARD) -> int:
+    """
+    Calcula el libro de 'geometry' con todas las posiciones no terminales
+    de hasta 'plies' fichas (salvo simetría) y lo escribe en 'path'.
+    Devuelve el número de entradas. 'progress(hechas, total)' se llama
+    tras cada búsqueda.
+    """
+    if (geometry.rows + 1) * geometry.cols > KEY_BITS:
+        raise ValueError(f"Las claves de un tablero {geometry.rows}x{geometry.cols} "
+                         f"no caben en {KEY_BITS} bits")
+    # 1. Posiciones canónicas por ply (recorrido en anchura)
+    positions: Dict[int, BitBoard] = {}
+    frontier = [BitBoard(geometry)]
+    for ply in range(plies + 1):
+        next_frontier = []
+        for pos in frontier:
+            key, _ = canonical_key(pos)
+            if key in positions or pos.is_terminal():
+                continue
+            positions[key] = pos
+            if ply < plies:
+                for col in pos.get_valid_moves():
+                    child = pos.copy()
+                    child.make_move(col)
+                    next_frontier.append(child)
+        frontier = next_frontier
+
+    # 2. Búsqueda profunda de cada posición; la jugada se guarda en la
+    #    orientación canónica
+    tt = TranspositionTable(max_mb=64)
+    ordering = MoveOrderer()
+    entries = []
+    for done, (key, pos) in enumerate(sorted(positions.items()), start=1):
+        move = find_best_move_minimax(pos, depth, pos.player, tt, ordering)
+        if canonical_key(pos)[1]:
+            move = geometry.cols - 1 - move
+        entries.append((key << 8) | move)
+        if progress is not None:
+            progress(done, len(positions))
+
+    # 3. Escritura
+    entries.sort()
+    with open(path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, geometry.rows, geometry.cols, plies, depth,
+                            len(entries), geometry.connect))
+        for entry in entries:
+            f.write(ENTRY.pack(entry))
+    return len(entries)
+
+
+class OpeningBook:
+    """
+    Libro de aperturas abierto con mmap. lookup() hace una búsqueda binaria
+    sobre el fichero (unos pocos microsegundos). 'geometry' es la variante
+    del libro, según su cabecera.
+    """
+
+    def __init__(self, path: str):
+        self._file = open(path, "rb")
+        self._data = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        (magic, version, rows, cols, self.plies, self.depth, self.size,
+         connect) = HEADER.unpack_from(self._data, 0)
+        if magic != MAGIC or version not in (1, VERSION):
+            self.close()
+            raise ValueError(f"{path} no es un libro de aperturas válido")
+        self.geometry = get_geometry(rows, cols, connect if version > 1 else CONNECT)
+
+    def close(self) -> None:
+        """Cierra el mmap y el fichero."""
+        self._data.close()
+        self._file.close()
+
+    def __enter__(self) -> "OpeningBook":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return self.size
+
+    def lookup(self, board: Union[Board, BitBoard]) -> Optional[int]:
+        """
+        Devuelve la jugada del libro para 'board' (jugando quien tiene el
+        turno en una partida normal) o None si la posición no está. En
+        variantes distintas de la del libro no hay jugadas.
+        """
+        pos = board if isinstance(board, BitBoard) else as_bitboard(board)
+        if pos.geometry is not self.geometry:
+            return None
+        if pos.moves > self.plies or pos.current != pos.moves & 1:
+            return None
+        key, mirrored = canonical_key(pos)
+
+        data = self._data
+        unpack = ENTRY.unpack_from
+        lo, hi = 0, self.size
+        while lo < hi:
+            mid = (lo + hi) // 2
+            entry = unpack(data, HEADER.size + mid * ENTRY.size)[0]
+            entry_key = entry >> 8
+            if entry_key < key:
+                lo = mid + 1
+            elif entry_key > key:
+                hi = mid
+            else:
+                move = entry & 0xFF
+                return self.geometry.cols - 1 - move if mirrored else move
+        return None
+
+
+def book_move(book: Optional[OpeningBook], board: Union[Board, BitBoard], player: str) -> Optional[int]:
+    """Jugada del libro para 'player' en 'board', o None si no hay libro o la posición no está."""
+    if book is None:
+        return None
+    return book.lookup(as_bitboard(board, player))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Genera el libro de aperturas de Connect-4")
+    parser.add_argument("--plies", type=int, default=4, help="Número máximo de fichas en el tablero")
+    parser.add_argument("--depth", type=int, default=8, help="Profundidad de búsqueda de cada posición")
+    parser.add_argument("--out", default="book.bin", help="Fichero de salida")
+    add_geometry_arguments(parser)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+
+    def progress(done: int, total: int) -> None:
+        if done % 100 == 0 or done == total:
+            print(f"{done}/{total} posiciones ({time.perf_counter() - start:.1f} s)")
+
+    count = build_book(args.out, args.plies, args.depth, progress, geometry_from_args(args))
+    print(f"Libro guardado en {args.out}: {count} posiciones")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+"""
+Modelos del oponente para los nodos "chance" de Expectimax.
+
+Expectimax supone por defecto un rival uniforme (todas sus jugadas con la
+misma probabilidad). Un OpponentModel da en su lugar una distribución de
+jugadas para cada posición:
+
+- UniformModel: la de siempre, útil como referencia.
+- SoftmaxModel: softmax sobre la puntuación de cada jugada para el rival
+  (la heurística tras jugarla o, con depth > 0, una búsqueda Minimax
+  corta). Un rival así casi siempre gana cuando puede y bloquea nuestras
+  amenazas.
+
+Las distribuciones se guardan en una caché acotada (LRU) por hash Zobrist
+de la posición, y las jugadas con probabilidad menor que 'threshold' se
+descartan (el resto se renormaliza): la búsqueda no gasta nodos en
+jugadas que el rival casi nunca haría.
+"""
+
+import math
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Dict, List, Tuple
+from .bitboard import BitBoard, as_bitboard
+from .evaluation import IncrementalBitBoard, evaluate_node, win_value, WIN
+from .minimax_search import INFINITY, negamax
+
+# Distribución de jugadas del rival: [(columna, probabilidad), ...]
+Policy = List[Tuple[int, float]]
+
+
+class OpponentModel(ABC):
+    """
+    Distribución de jugadas del jugador que mueve en una posición.
+    Las subclases implementan distribution(); policy() añade la caché y
+    el umbral de probabilidad.
+    """
+
+    def __init__(self, threshold: float = 0.0, cache_size: int = 100_000):
+        self.threshold = threshold
+        self.cache_size = cache_size
+        self._cache: "OrderedDict[int, Policy]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    @abstractmethod
+    def distribution(self, pos: BitBoard, moves: List[int]) -> List[float]:
+        """Probabilidad (sin normalizar) de cada jugada de 'moves' para el jugador que mueve."""
+        pass
+
+    def policy(self, pos: BitBoard) -> Policy:
+        """
+        Jugadas del rival con su probabilidad, sin las que no llegan a
+        'threshold' (se conserva siempre la más probable) y normalizada
+        para sumar 1.
+        """
+        key = pos.hash
+        cached = self._cache.get(key)
+        if cached is not None:
+            self.hits += 1
+            self._cache.move_to_end(key)
+            return cached
+        self.misses += 1
+
+        moves = pos.get_valid_moves()
+        weights = self.distribution(pos, moves)
+        total = sum(weights)
+        probs = [w / total for w in weights]
+        best = max(probs)
+        kept = [(col, p) for col, p in zip(moves, probs) if p >= self.threshold or p == best]
+        kept_total = sum(p for _, p in kept)
+        result = [(col, p / kept_total) for col, p in kept]
+
+        self._cache[key] = result
+        if len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+        return result
+
+    def clear(self) -> None:
+        """Vacía la caché y sus estadísticas."""
+        self._cache.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def stats(self) -> Dict[str, float]:
+        """Tamaño de la caché y porcentaje de aciertos."""
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._cache),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+
+class UniformModel(OpponentModel):
+    """Rival aleatorio uniforme (el supuesto clásico de Expectimax)."""
+
+    def distribution(self, pos: BitBoard, moves: List[int]) -> List[float]:
+        return [1.0] * len(moves)
+
+
+class SoftmaxModel(OpponentModel):
+    """
+    Rival que elige con probabilidad proporcional a exp(puntuación / temperature).
+
+    - depth=0: la puntuación es la heurística tras la jugada, vista por el
+      rival (una victoria vale más que cualquier heurística).
+    - depth>0: la puntuación es el valor Minimax a esa profundidad tras la
+      jugada (más caro, pero ve las respuestas inmediatas).
+    Con temperature baja el rival es casi determinista; con alta, casi uniforme.
+    """
+
+    def __init__(self, temperature: float = 10.0, depth: int = 0,
+                 threshold: float = 0.02, cache_size: int = 100_000):
+        super().__init__(threshold, cache_size)
+        if temperature <= 0:
+            raise ValueError("La temperatura debe ser positiva")
+        self.temperature = temperature
+        self.depth = depth
+
+    def distribution(self, pos: BitBoard, moves: List[int]) -> List[float]:
+        if self.depth == 0 and isinstance(pos, IncrementalBitBoard):
+            scores = self._static_scores(pos, moves)
+        else:
+            scores = [self._score(pos, col) for col in moves]
+        top = max(scores)
+        return [math.exp((s - top) / self.temperature) for s in scores]
+
+    def _static_scores(self, pos: IncrementalBitBoard, moves: List[int]) -> List[float]:
+        """Puntuaciones con depth=0 leyendo la heurística incremental sin hacer/deshacer jugadas."""
+        wins = pos.winning_moves(pos.current)
+        sign = 1.0 if pos.current == 0 else -1.0
+        win = win_value(pos.geometry)
+        if pos.moves + 1 == pos.geometry.size:
+            return [win if col in wins else 0.0 for col in moves]
+        return [win if col in wins else sign * pos.peek_scores(col)[0] for col in moves]
+
+    def _score(self, pos: BitBoard, col: int) -> float:
+        """Puntuación de 'col' para el jugador que mueve en 'pos'."""
+        if self.depth > 0 and not isinstance(pos, IncrementalBitBoard):
+            pos = as_bitboard(pos, None, IncrementalBitBoard)  # negamax lee su heurística
+        sign = 1.0 if pos.current == 0 else -1.0
+        pos.make_move(col)
+        status, value = evaluate_node(pos)
+        win = win_value(pos.geometry)
+        if status == WIN:
+            score = win
+        elif self.depth > 0:
+            # Negamax puntúa para el rival (que mueve ahora); las victorias se recortan a ±win
+            value = -negamax(pos, self.depth, -INFINITY, INFINITY)
+            score = max(-win, min(win, value))
+        else:
+            score = sign * value
+        pos.undo_move()
+        return score
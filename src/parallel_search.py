@@ -0,0 +1,245 @@
+"""
+Búsqueda Minimax en paralelo repartiendo la raíz entre procesos.
+
+Estrategia "Young Brothers Wait" en la raíz:
+1. El primer hijo (el más prometedor según el orden de la raíz) se busca
+   solo, con ventana completa, y da el primer valor de alpha.
+2. El resto de hijos se buscan a la vez en un ProcessPoolExecutor con esa
+   alpha como cota inferior: los que no la superan terminan antes.
+
+Los hijos se buscan con el driver de la raíz (ver
+minimax_search.DRIVERS): "pvs" y "mtdf" comprueban primero con ventana
+nula si los hermanos menores superan esa alpha.
+
+Cada proceso del pool crea una vez su tabla de transposiciones y su
+MoveOrderer y los conserva entre tareas y entre búsquedas, como el
+agente conserva su tabla entre jugadas; clear() los vacía. Los valores
+que superan alpha son exactos, así que con las tablas vacías se elige
+la misma jugada que find_best_move_minimax a igual profundidad y con el
+mismo orden de la raíz (ante empates gana la primera jugada del orden).
+Con entradas más profundas de búsquedas anteriores algún valor puede
+cambiar, y con él la jugada: igual que la búsqueda en serie con la
+tabla del agente, pero no necesariamente en las mismas posiciones.
+
+El pool se crea una vez y se reutiliza entre jugadas.
+"""
+
+import itertools
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+from .config import MAX_PLAYER
+from .board import Board
+from .bitboard import BitBoard, as_bitboard
+from .evaluation import IncrementalBitBoard
+from .minimax_search import DRIVERS, INFINITY, negamax, find_best_move_minimax
+from .move_ordering import MoveOrderer
+from .transposition import TranspositionTable
+
+# Estado de cada proceso del pool: (generación, tabla, MoveOrderer, búsqueda en curso)
+_worker: Dict[str, object] = {"generation": None, "tt": None, "ordering": None, "search": None}
+
+# Generaciones de tablas, únicas entre todos los ParallelSearcher del proceso
+_generations = itertools.count()
+
+
+def _worker_tables(session: Tuple[int, int], depth: int, pos: BitBoard, ordering: bool,
+                   tt_mb: float, driver: str) -> Tuple[Optional[TranspositionTable],
+                                                        Optional[MoveOrderer]]:
+    """
+    Tabla y MoveOrderer del proceso para la búsqueda 'session' = (generación,
+    búsqueda). Se crean en la primera tarea de una generación (ver
+    ParallelSearcher.clear) y, al empezar otra búsqueda, el MoveOrderer
+    se prepara con new_search como en la búsqueda en serie.
+    """
+    generation, search = session
+    if _worker["generation"] != generation:
+        # MTD(f) necesita siempre una tabla (como en minimax_search._check_driver)
+        if tt_mb:
+            _worker["tt"] = TranspositionTable(max_mb=tt_mb)
+        else:
+            _worker["tt"] = TranspositionTable() if driver == "mtdf" else None
+        _worker["ordering"] = MoveOrderer(geometry=pos.geometry) if ordering else None
+        _worker["generation"] = generation
+        _worker["search"] = None
+    orderer = _worker["ordering"]
+    if _worker["search"] != search:
+        if orderer is not None:
+            orderer.new_search(depth, pos.geometry)
+        _worker["search"] = search
+    return _worker["tt"], orderer
+
+
+def _child_value(child: IncrementalBitBoard, depth: int, alpha: int,
+                 tt: Optional[TranspositionTable], orderer: Optional[MoveOrderer],
+                 driver: str) -> int:
+    """
+    Valor para quien mueve en la raíz de la jugada que lleva a 'child'
+    buscada a 'depth' desde la raíz. Por debajo de 'alpha' solo es una
+    cota superior (fail-soft); por encima es exacto.
+    """
+    if driver == "alphabeta":
+        return -negamax(child, depth - 1, -INFINITY, -alpha, tt, None, orderer)
+    pvs = driver == "pvs"
+    if pvs:
+        if alpha > -INFINITY:
+            # ¿Supera alpha? Ventana nula; si no, basta la cota
+            value = -negamax(child, depth - 1, -alpha - 1, -alpha, tt, None, orderer, None, True)
+            if value <= alpha:
+                return value
+        return -negamax(child, depth - 1, -INFINITY, -alpha, tt, None, orderer, None, True)
+
+    # MTD(f) sobre el hijo: ventanas nulas hasta que las cotas coinciden. La
+    # cota inferior empieza en alpha, así que la primera pasada comprueba si
+    # la supera (como en "pvs") y, si no, devuelve esa cota superior.
+    lower, upper = alpha, INFINITY
+    value = max(alpha, 0)
+    while lower < upper:
+        beta = value + 1 if value == lower else value
+        value = -negamax(child, depth - 1, -beta, -beta + 1, tt, None, orderer)
+        if value < beta:
+            upper = value
+        else:
+            lower = value
+    return value
+
+
+def _search_child(pos: BitBoard, col: int, depth: int, alpha: int, session: Tuple[int, int],
+                  ordering: bool, tt_mb: float, driver: str) -> int:
+    """Tarea de un proceso: valor de jugar 'col' en 'pos' para quien mueve (con cota inferior 'alpha')."""
+    child = as_bitboard(pos, None, IncrementalBitBoard)
+    child.make_move(col)
+    tt, orderer = _worker_tables(session, depth, child, ordering, tt_mb, driver)
+    return _child_value(child, depth, alpha, tt, orderer, driver)
+
+
+def root_order(pos: BitBoard, depth: int, ordering: Optional[MoveOrderer]) -> List[int]:
+    """
+    Orden de la raíz, el mismo que usa find_best_move_minimax con
+    'ordering' (que se prepara para una búsqueda nueva a 'depth'), o el
+    de las columnas si es None.
+    """
+    moves = pos.fold_symmetric(pos.get_valid_moves())
+    if ordering is not None:
+        ordering.new_search(depth, pos.geometry)
+        moves = ordering.order(pos, moves)
+    return moves
+
+
+class ParallelSearcher:
+    """
+    Minimax con la raíz repartida entre 'workers' procesos.
+
+    - ordering / tt_mb / driver: configuración de la búsqueda de cada
+      hijo, igual que en MinimaxAgent. tt_mb es el tamaño de la tabla de
+      cada proceso, no del total (workers * tt_mb en memoria); con 0 no
+      hay tabla salvo con "mtdf", que la necesita.
+    - El pool se arranca en la primera búsqueda y se conserva hasta close().
+    """
+
+    def __init__(self, workers: int = 4, ordering: bool = True, tt_mb: float = 4,
+                 driver: str = "alphabeta"):
+        if workers < 1:
+            raise ValueError("Se necesita al menos un proceso")
+        if driver not in DRIVERS:
+            raise ValueError(f"Driver de búsqueda desconocido: {driver}")
+        self.workers = workers
+        self.ordering = ordering
+        self.tt_mb = tt_mb
+        self.driver = driver
+        self._pool: Optional[ProcessPoolExecutor] = None
+        # Generación de las tablas de los procesos (clear) y número de búsqueda
+        self._generation = next(_generations)
+        self._searches = 0
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.workers)
+        return self._pool
+
+    def clear(self) -> None:
+        """Vacía las tablas de los procesos (se rehacen en su siguiente tarea)."""
+        self._generation = next(_generations)
+
+    def close(self) -> None:
+        """Detiene los procesos del pool."""
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+    def __enter__(self) -> "ParallelSearcher":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def find_best_move(self, board: Union[Board, BitBoard], depth: int,
+                       player: str = MAX_PLAYER, ordering: Optional[MoveOrderer] = None) -> int:
+        """
+        Elige la mejor columna para 'player'. 'ordering' (p. ej. el
+        MoveOrderer del agente, ya con killers e historia de jugadas
+        anteriores) ordena la raíz como en la búsqueda en serie; si es
+        None y el buscador ordena, se usa uno nuevo.
+        """
+        pos = BitBoard.from_bitboard(as_bitboard(board, player))
+        if ordering is None and self.ordering:
+            ordering = MoveOrderer(geometry=pos.geometry)
+        moves = root_order(pos, depth, ordering)
+        if not moves:
+            raise ValueError("No hay movimientos válidos")
+        if len(moves) == 1:
+            return moves[0]
+
+        pool = self._get_pool()
+        self._searches += 1
+        config = ((self._generation, self._searches), self.ordering, self.tt_mb, self.driver)
+
+        # 1. Hermano mayor: ventana completa
+        best_move = moves[0]
+        best_value = pool.submit(_search_child, pos, best_move, depth, -INFINITY, *config).result()
+
+        # 2. Hermanos menores en paralelo con alpha = valor del primero
+        futures = [pool.submit(_search_child, pos, col, depth, best_value, *config)
+                   for col in moves[1:]]
+        for col, future in zip(moves[1:], futures):
+            value = future.result()
+            if value > best_value:
+                best_value = value
+                best_move = col
+        return best_move
+
+
+def speedup_curve(board: Union[Board, BitBoard], depth: int, player: str = MAX_PLAYER,
+                  worker_counts: Sequence[int] = (1, 2, 4, 8)) -> Dict[int, Dict[str, float]]:
+    """
+    Mide el tiempo de ParallelSearcher.find_best_move con distintos números
+    de procesos (sin contar el arranque del pool) y lo compara con la
+    búsqueda en serie (con tablas vacías en ambos casos). Comprueba además
+    que todos devuelven la misma jugada.
+    """
+    start = time.perf_counter()
+    serial_move = find_best_move_minimax(board, depth, player, TranspositionTable(max_mb=4),
+                                         MoveOrderer())
+    serial_time = time.perf_counter() - start
+
+    results = {0: {"seconds": serial_time, "speedup": 1.0, "move": serial_move}}
+    for workers in worker_counts:
+        with ParallelSearcher(workers=workers) as searcher:
+            # Calentar el pool para no medir el arranque de los procesos
+            list(searcher._get_pool().map(abs, range(workers)))
+            start = time.perf_counter()
+            move = searcher.find_best_move(board, depth, player)
+            elapsed = time.perf_counter() - start
+        if move != serial_move:
+            raise RuntimeError(f"La búsqueda paralela eligió {move} y la serie {serial_move}")
+        results[workers] = {"seconds": elapsed, "speedup": serial_time / elapsed, "move": move}
+    return results
+
+
+if __name__ == "__main__":
+    from .board import create_board
+
+    print("=== Speedup de la búsqueda paralela (tablero vacío, profundidad 10) ===")
+    for workers, row in speedup_curve(create_board(), depth=10).items():
+        label = "serie" if workers == 0 else f"{workers} procesos"
+        print(f"{label:>12}: {row['seconds']:.3f} s  (x{row['speedup']:.2f})")
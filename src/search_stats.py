@@ -0,0 +1,110 @@
+"""
+Estadísticas de búsqueda para Minimax y Expectimax.
+
+Un SearchStats se pasa opcionalmente a negamax()/expectimax() (y a las
+funciones find_best_move_* e iterative_deepening_*). Sin él la búsqueda
+solo paga una comparación con None por nodo; con él se registran:
+
+- nodos totales, nodos por ply (distancia a la raíz) y hojas,
+- podas y podas con la primera jugada (solo Minimax),
+- tiempo dentro de la evaluación y dentro de la generación/ordenación
+  de jugadas,
+- factor de ramificación efectivo y variante principal.
+
+Los contadores se reinician en cada búsqueda (new_search) y, con
+profundización iterativa, acumulan todas las iteraciones; la variante
+principal es la de la última iteración completa.
+"""
+
+import time
+from typing import Dict, List
+from .bitboard import BitBoard
+from .geometry import STANDARD
+
+
+class SearchStats:
+    """Contadores de una búsqueda. summary() los devuelve como diccionario."""
+
+    def __init__(self):
+        # Plies posibles desde la raíz: casillas del tablero + 1 (new_search lo ajusta)
+        self._max_ply = STANDARD.size + 1
+        self.reset()
+
+    def reset(self) -> None:
+        """Pone todos los contadores a cero y vacía la variante principal."""
+        self.nodes = 0
+        self.nodes_by_ply = [0] * self._max_ply
+        self.leaves = 0
+        self.cutoffs = 0
+        self.first_move_cutoffs = 0
+        self.eval_time = 0.0
+        self.movegen_time = 0.0
+        self.depth = 0
+        self.pv: List[int] = []
+        self.elapsed = 0.0
+        self._root_moves = 0
+        self._start = time.perf_counter()
+        # Variante principal triangular: _lines[ply] es la mejor línea desde ese ply
+        self._lines: List[List[int]] = [[] for _ in range(self._max_ply + 1)]
+
+    def new_search(self, pos: BitBoard) -> None:
+        """Prepara una búsqueda nueva con raíz en 'pos'."""
+        self._max_ply = pos.geometry.size + 1
+        self.reset()
+        self._root_moves = pos.moves
+
+    def enter(self, pos: BitBoard) -> int:
+        """Cuenta un nodo y devuelve su ply respecto a la raíz."""
+        return self.enter_moves(pos.moves)
+
+    def enter_moves(self, moves: int) -> int:
+        """Como enter(), para un nodo con 'moves' fichas (búsquedas sin BitBoard, como EndgameSolver)."""
+        ply = moves - self._root_moves
+        self.nodes += 1
+        self.nodes_by_ply[ply] += 1
+        self._lines[ply] = []
+        return ply
+
+    def update_pv(self, ply: int, col: int) -> None:
+        """'col' es la nueva mejor jugada en 'ply': su línea es col + la del hijo."""
+        self._lines[ply] = [col] + self._lines[ply + 1]
+
+    def set_pv(self, ply: int, line: List[int]) -> None:
+        """La línea desde 'ply' es 'line' (nodo resuelto sin buscar sus hijos)."""
+        self._lines[ply] = list(line)
+
+    def line(self, ply: int = 0) -> List[int]:
+        """Copia de la mejor línea actual desde 'ply'."""
+        return list(self._lines[ply])
+
+    def complete(self, depth: int) -> None:
+        """Marca como terminada la iteración a 'depth' y guarda su variante principal."""
+        self.depth = depth
+        self.pv = list(self._lines[0])
+        self.stop()
+
+    def stop(self) -> None:
+        """Fija el tiempo total de la búsqueda (incluida una iteración cortada)."""
+        self.elapsed = time.perf_counter() - self._start
+
+    def summary(self) -> Dict[str, object]:
+        """
+        Estadísticas de la última búsqueda. El factor de ramificación
+        efectivo es nodos ^ (1 / profundidad), como en MoveOrderer.stats().
+        """
+        last_ply = max((ply for ply, n in enumerate(self.nodes_by_ply) if n), default=-1)
+        return {
+            "nodes": self.nodes,
+            "nodes_by_ply": self.nodes_by_ply[:last_ply + 1],
+            "leaves": self.leaves,
+            "cutoffs": self.cutoffs,
+            "first_move_cutoffs": self.first_move_cutoffs,
+            "first_move_cutoff_rate": self.first_move_cutoffs / self.cutoffs if self.cutoffs else 0.0,
+            "eval_seconds": self.eval_time,
+            "movegen_seconds": self.movegen_time,
+            "elapsed_seconds": self.elapsed,
+            "nodes_per_sec": self.nodes / self.elapsed if self.elapsed else 0.0,
+            "effective_branching_factor": self.nodes ** (1.0 / self.depth) if self.depth else 0.0,
+            "depth": self.depth,
+            "pv": list(self.pv),
+        }
@@ -0,0 +1,218 @@
+"""
+Análisis de amenazas de Connect-4 a partir de las máscaras del bitboard.
+
+Una amenaza es una casilla vacía que completaría N en línea para un
+jugador (Geometry.winning_cells). Con ellas, sin buscar:
+
+- victorias inmediatas: amenazas propias jugables ya,
+- jugadas que pierden en el acto: no tapar la única victoria inmediata
+  del rival, o jugar justo debajo de una amenaza suya (se la deja jugable),
+- amenazas dobles: dos victorias inmediatas a la vez no se pueden tapar,
+  así que quien mueve pierde si el rival las tiene, y una jugada que las
+  crea (sin perder en el acto) gana en tres jugadas,
+- paridad par/impar: al llenarse el tablero, el primer jugador acaba
+  ocupando las filas impares (contando desde abajo) y el segundo las
+  pares, así que suelen decidir las amenazas impares del primero y las
+  pares del segundo (zugzwang).
+
+Minimax y Expectimax usan victorias inmediatas y jugadas seguras en cada
+nodo que no es hoja, a cualquier profundidad (ver forced_result y
+safe_moves); los resultados forzados son exactos, pero cambian los
+valores de las búsquedas a profundidad fija. analyze() resume todo para
+una posición.
+"""
+
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import List, Optional, Tuple, Union
+from .config import MAX_PLAYER
+from .board import Board
+from .bitboard import BitBoard, PLAYERS, as_bitboard, popcount
+from .geometry import Geometry
+
+# Resultado forzado para el jugador que mueve (forced_result)
+UNKNOWN = 0
+WIN = 1    # Tiene una victoria inmediata
+LOSS = -1  # Pierde en la siguiente jugada del rival haga lo que haga
+
+
+def threat_cells(pos: BitBoard, index: int) -> int:
+    """Amenazas del jugador 'index': casillas vacías que le darían N en línea (jugables o no)."""
+    return pos.geometry.winning_cells(pos.bits[index], pos.bits[0] | pos.bits[1])
+
+
+def immediate_wins(pos: BitBoard) -> int:
+    """Máscara de las casillas jugables en las que gana ya el jugador que mueve."""
+    return threat_cells(pos, pos.current) & pos.possible_mask()
+
+
+def safe_moves(pos: BitBoard) -> int:
+    """
+    Máscara de las casillas jugables que no pierden en el acto para el
+    jugador que mueve: si el rival tiene una victoria inmediata solo sirve
+    taparla (con dos o más no hay ninguna), y nunca se juega debajo de una
+    amenaza del rival. No tiene en cuenta las victorias propias.
+    """
+    return safe_cells(pos.geometry, pos.bits[pos.current], pos.bits[0] | pos.bits[1])
+
+
+def safe_cells(geometry: Geometry, current: int, mask: int) -> int:
+    """
+    safe_moves sobre los enteros del bitboard ('current' = fichas del
+    jugador que mueve, 'mask' = todas), para quien no usa un BitBoard.
+    """
+    possible = (mask + geometry.bottom_mask) & geometry.board_mask
+    threats = geometry.winning_cells(current ^ mask, mask)
+    forced = possible & threats
+    if forced:
+        if forced & (forced - 1):
+            return 0
+        possible = forced
+    # La casilla de debajo de una amenaza (el bit separador nunca es jugable)
+    return possible & ~(threats >> 1)
+
+
+def double_threat_moves(pos: BitBoard, safe: Optional[int] = None) -> int:
+    """
+    Casillas de 'safe' (por defecto, las de safe_moves que no ganan ya)
+    tras las cuales el jugador que mueve tiene dos o más victorias
+    inmediatas: el rival no puede taparlas todas ni ganar antes, así que
+    gana en tres jugadas.
+    """
+    if safe is None:
+        safe = safe_moves(pos) & ~immediate_wins(pos)
+    geometry = pos.geometry
+    own = pos.bits[pos.current]
+    occupied = pos.bits[0] | pos.bits[1]
+    moves = 0
+    while safe:
+        move = safe & -safe
+        safe ^= move
+        after = occupied | move
+        wins = geometry.winning_cells(own | move, after)
+        wins &= (after + geometry.bottom_mask) & geometry.board_mask
+        if wins & (wins - 1):
+            moves |= move
+    return moves
+
+
+def forced_result(pos: BitBoard) -> int:
+    """
+    WIN si el jugador que mueve tiene una victoria inmediata, LOSS si
+    todas sus jugadas pierden en el acto (p. ej. el rival tiene una
+    amenaza doble) y UNKNOWN en otro caso. No busca: solo mira las
+    máscaras de la posición actual.
+    """
+    if immediate_wins(pos):
+        return WIN
+    if not safe_moves(pos):
+        return LOSS
+    return UNKNOWN
+
+
+def columns(pos: BitBoard, mask: int) -> List[int]:
+    """Columnas cuya casilla jugable está en 'mask', de izquierda a derecha."""
+    heights = pos.heights
+    return [c for c, top in enumerate(pos.geometry.column_tops)
+            if heights[c] < top and mask >> heights[c] & 1]
+
+
+@lru_cache(maxsize=None)
+def odd_rows_mask(geometry: Geometry) -> int:
+    """Casillas de las filas impares contando desde abajo (1, 3, 5...)."""
+    column = sum(1 << row for row in range(0, geometry.rows, 2))
+    return geometry.bottom_mask * column
+
+
+def odd_even_threats(pos: BitBoard, index: int) -> Tuple[int, int]:
+    """Amenazas del jugador 'index' en filas impares y en filas pares."""
+    threats = threat_cells(pos, index)
+    odd = odd_rows_mask(pos.geometry)
+    return threats & odd, threats & ~odd
+
+
+def _lowest_per_column(geometry: Geometry, cells: int) -> int:
+    """La casilla más baja de 'cells' en cada columna."""
+    lowest = 0
+    for column in geometry.column_masks:
+        in_column = cells & column
+        lowest |= in_column & -in_column
+    return lowest
+
+
+def parity_favours(pos: BitBoard) -> Optional[str]:
+    """
+    Jugador al que favorece la regla de paridad (heurística, no es una
+    demostración), o None si ninguno:
+
+    - solo cuenta la amenaza más baja de cada columna (se llega a ella
+      antes que a las de encima),
+    - el primer jugador (MAX) aprovecha sus amenazas impares y el segundo
+      (MIN) las pares; gana la regla quien tiene alguna y el rival ninguna.
+
+    Solo se aplica con un número par de filas: con filas impares el
+    reparto de casillas al llenarse el tablero cambia.
+    """
+    geometry = pos.geometry
+    if geometry.rows % 2:
+        return None
+    first = threat_cells(pos, 0)
+    second = threat_cells(pos, 1)
+    lowest = _lowest_per_column(geometry, first | second)
+    odd = odd_rows_mask(geometry)
+    first_good = lowest & first & odd
+    second_good = lowest & second & ~odd
+    if first_good and not second_good:
+        return PLAYERS[0]
+    if second_good and not first_good:
+        return PLAYERS[1]
+    return None
+
+
+@dataclass
+class ThreatAnalysis:
+    """
+    Resumen de amenazas de una posición para el jugador que mueve.
+
+    - wins: columnas que ganan ya.
+    - blocks: columnas en las que el rival ganaría ya (hay que taparlas).
+    - losing: columnas que pierden en el acto (sin contar las que ganan ya).
+    - double_threats: columnas que crean dos victorias inmediatas sin perder (ganan en tres).
+    - threats / odd_threats / even_threats: número de amenazas de cada jugador
+      (índice 0 = MAX, 1 = MIN), en total y en filas impares / pares.
+    - parity: jugador al que favorece la regla de paridad (ver parity_favours).
+    - result: WIN, LOSS o UNKNOWN (ver forced_result).
+    """
+
+    player: str
+    wins: List[int]
+    blocks: List[int]
+    losing: List[int]
+    double_threats: List[int]
+    threats: Tuple[int, int] = (0, 0)
+    odd_threats: Tuple[int, int] = (0, 0)
+    even_threats: Tuple[int, int] = (0, 0)
+    parity: Optional[str] = None
+    result: int = UNKNOWN
+
+
+def analyze(board: Union[Board, BitBoard], player: str = MAX_PLAYER) -> ThreatAnalysis:
+    """Análisis de amenazas de 'board' con 'player' al turno."""
+    pos = as_bitboard(board, player)
+    possible = pos.possible_mask()
+    wins = immediate_wins(pos)
+    opponent_wins = threat_cells(pos, pos.current ^ 1) & possible
+    safe = safe_moves(pos)
+    counts = [odd_even_threats(pos, index) for index in (0, 1)]
+    return ThreatAnalysis(
+        player=pos.player,
+        wins=columns(pos, wins),
+        blocks=columns(pos, opponent_wins),
+        losing=columns(pos, possible & ~safe & ~wins),
+        double_threats=columns(pos, double_threat_moves(pos, safe & ~wins)),
+        threats=tuple(popcount(odd | even) for odd, even in counts),
+        odd_threats=tuple(popcount(odd) for odd, _ in counts),
+        even_threats=tuple(popcount(even) for _, even in counts),
+        parity=parity_favours(pos),
+        result=forced_result(pos),
+    )
@@ -0,0 +1,264 @@
+"""
+Torneos IA vs IA en paralelo.
+
+Se describe cada agente con un AgentSpec (tipo, profundidad, simulaciones
+o tiempo por jugada y, opcionalmente, el lado con el que juega) y se genera un
+calendario de partidas:
+- "round_robin": todos contra todos, con ambos colores.
+- "gauntlet": el primer agente contra cada uno de los demás, con ambos colores.
+
+Las partidas se juegan en un ProcessPoolExecutor. Cada una tiene su propia
+semilla (derivada de la semilla base y de su identificador), así que el
+resultado no depende del proceso que la juegue. Los resultados se
+devuelven según van terminando como GameRecord (con todas las jugadas)
+y, si se indica un fichero, se añaden en el formato binario de
+game_records.py: al relanzar el torneo con el mismo fichero se saltan
+las partidas ya jugadas. Todas las partidas se juegan en la misma
+variante ('geometry'; --rows, --cols y --connect desde consola), que se
+guarda en la cabecera del fichero.
+
+Uso desde consola:
+    python -m src.tournament minimax:4 expectimax:4 random --games 100 --workers 8 --out torneo.c4g
+    python -m src.tournament mcts:100ms minimax:100ms --games 20
+    python -m src.tournament minimax:4 mcts:500 --rows 7 --cols 9 --connect 5
+"""
+
+import argparse
+import os
+import random
+import zlib
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+from .config import MAX_PLAYER, MIN_PLAYER
+from .agents import ENDGAME_CELLS, Agent, MinimaxAgent, ExpectimaxAgent, RandomAgent, MCTSAgent
+from .experiments import record_game
+from .game_records import GameRecord, GameRecordWriter, read_records
+from .geometry import Geometry, STANDARD, add_geometry_arguments, geometry_from_args
+
+AGENT_KINDS = ("minimax", "expectimax", "random", "mcts")
+MODES = ("round_robin", "gauntlet")
+
+
+@dataclass(frozen=True)
+class AgentSpec:
+    """
+    Descripción de un agente del torneo.
+
+    - kind: "minimax", "expectimax", "random" o "mcts".
+    - depth: profundidad fija (se ignora si hay time_limit_ms).
+    - playouts: simulaciones por jugada de "mcts" (se ignora si hay time_limit_ms).
+    - time_limit_ms: presupuesto de tiempo por jugada (profundización
+      iterativa o, en "mcts", simulaciones hasta agotarlo).
+    - side: MAX_PLAYER o MIN_PLAYER para jugar solo con ese color (None = ambos).
+
+    Los agentes "minimax" resuelven los finales de forma exacta con
+    ENDGAME_CELLS casillas vacías o menos (ver agents.MinimaxAgent).
+    """
+
+    kind: str
+    depth: int = 4
+    playouts: int = 1000
+    time_limit_ms: Optional[float] = None
+    side: Optional[str] = None
+
+    def __post_init__(self):
+        if self.kind not in AGENT_KINDS:
+            raise ValueError(f"Tipo de agente desconocido: {self.kind}")
+        if self.side not in (None, MAX_PLAYER, MIN_PLAYER):
+            raise ValueError(f"Lado desconocido: {self.side}")
+
+    @property
+    def label(self) -> str:
+        """Nombre corto y estable, p. ej. "minimax:4", "expectimax:500ms" o "mcts:2000"."""
+        if self.kind == "random":
+            return "random"
+        if self.time_limit_ms is not None:
+            return f"{self.kind}:{self.time_limit_ms:g}ms"
+        if self.kind == "mcts":
+            return f"{self.kind}:{self.playouts}"
+        return f"{self.kind}:{self.depth}"
+
+    @classmethod
+    def parse(cls, text: str) -> "AgentSpec":
+        """
+        Construye un AgentSpec desde texto: "tipo[:profundidad|:<n>ms][@O|@X]"
+        (en "mcts" el número son simulaciones, no profundidad).
+        Ejemplos: "minimax:6", "expectimax:250ms@X", "random", "mcts:2000".
+        """
+        side = None
+        if "@" in text:
+            text, side = text.split("@", 1)
+        kind, _, level = text.partition(":")
+        if level.endswith("ms"):
+            return cls(kind, time_limit_ms=float(level[:-2]), side=side)
+        if level and kind == "mcts":
+            return cls(kind, playouts=int(level), side=side)
+        if level:
+            return cls(kind, depth=int(level), side=side)
+        return cls(kind, side=side)
+
+    def build(self, player_symbol: str, stats: bool = False) -> Agent:
+        """Crea el agente para jugar con 'player_symbol' (con 'stats', instrumentado)."""
+        if self.kind == "minimax":
+            return MinimaxAgent(depth=self.depth, player_symbol=player_symbol,
+                                time_limit_ms=self.time_limit_ms, stats=stats,
+                                endgame_cells=ENDGAME_CELLS)
+        if self.kind == "expectimax":
+            return ExpectimaxAgent(depth=self.depth, player_symbol=player_symbol,
+                                   time_limit_ms=self.time_limit_ms, stats=stats)
+        if self.kind == "mcts":
+            return MCTSAgent(playouts=self.playouts, player_symbol=player_symbol,
+                             time_limit_ms=self.time_limit_ms, stats=stats)
+        return RandomAgent()
+
+
+# Partida del calendario: (identificador, agente MAX, agente MIN, semilla)
+Game = Tuple[str, AgentSpec, AgentSpec, int]
+
+
+def _pairings(specs: Sequence[AgentSpec], mode: str) -> List[Tuple[AgentSpec, AgentSpec]]:
+    """Parejas (MAX, MIN) del torneo respetando el lado fijado en cada spec."""
+    if mode not in MODES:
+        raise ValueError(f"Modo de torneo desconocido: {mode}")
+    if mode == "gauntlet":
+        pairs = [(specs[0], other) for other in specs[1:]]
+    else:
+        pairs = [(specs[i], specs[j]) for i in range(len(specs)) for j in range(i + 1, len(specs))]
+
+    pairings = []
+    for a, b in pairs:
+        for first, second in ((a, b), (b, a)):
+            if first.side in (None, MAX_PLAYER) and second.side in (None, MIN_PLAYER):
+                pairings.append((first, second))
+    return pairings
+
+
+def schedule(specs: Sequence[AgentSpec], games_per_pair: int, mode: str = "round_robin",
+             base_seed: int = 0) -> List[Game]:
+    """
+    Calendario completo: 'games_per_pair' partidas por cada pareja (MAX, MIN).
+    Los identificadores y semillas solo dependen de las parejas, así que
+    son estables entre ejecuciones.
+    """
+    games = []
+    for agent_max, agent_min in _pairings(specs, mode):
+        for k in range(games_per_pair):
+            game_id = f"{agent_max.label}|{agent_min.label}|{k}"
+            seed = zlib.crc32(f"{base_seed}:{game_id}".encode())
+            games.append((game_id, agent_max, agent_min, seed))
+    return games
+
+
+def play_scheduled_game(game: Game, with_stats: bool = False,
+                        geometry: Geometry = STANDARD) -> GameRecord:
+    """Juega una partida del calendario en 'geometry' (se ejecuta en los procesos del pool)."""
+    game_id, spec_max, spec_min, seed = game
+    random.seed(seed)
+    record = record_game(spec_max.build(MAX_PLAYER, with_stats), spec_min.build(MIN_PLAYER, with_stats),
+                         with_stats=with_stats, geometry=geometry)
+    record.game_id = game_id
+    record.max_agent = spec_max.label
+    record.min_agent = spec_min.label
+    record.seed = seed
+    return record
+
+
+def load_results(path: str) -> List[GameRecord]:
+    """Lee las partidas ya guardadas en 'path'; ignora un último registro incompleto."""
+    if not os.path.exists(path) or os.path.getsize(path) == 0:
+        return []
+    return list(read_records(path))
+
+
+def run_tournament(specs: Sequence[AgentSpec], games_per_pair: int = 10,
+                   mode: str = "round_robin", workers: int = 1,
+                   results_path: Optional[str] = None,
+                   base_seed: int = 0, with_stats: bool = False,
+                   geometry: Geometry = STANDARD) -> Iterator[GameRecord]:
+    """
+    Juega el torneo en la variante 'geometry' y devuelve las partidas
+    según van terminando.
+
+    Con 'results_path' cada partida se añade al fichero en cuanto llega
+    y las que ya estaban en él no se repiten (reanudación); el fichero
+    tiene que ser de la misma variante.
+    Con 'with_stats' se guardan también nodos, profundidad y tiempo de cada jugada.
+    Con workers=1 se juega en el propio proceso, sin pool.
+    """
+    games = schedule(specs, games_per_pair, mode, base_seed)
+    # El escritor comprueba la variante del fichero antes de saltar partidas
+    out = GameRecordWriter(results_path, geometry) if results_path is not None else None
+    try:
+        if out is not None:
+            done = {r.game_id for r in load_results(results_path)}
+            games = [g for g in games if g[0] not in done]
+        if workers <= 1:
+            finished = (play_scheduled_game(game, with_stats, geometry) for game in games)
+            for record in finished:
+                _write(out, record)
+                yield record
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                futures = [pool.submit(play_scheduled_game, game, with_stats, geometry) for game in games]
+                for future in as_completed(futures):
+                    record = future.result()
+                    _write(out, record)
+                    yield record
+    finally:
+        if out is not None:
+            out.close()
+
+
+def _write(out: Optional[GameRecordWriter], record: GameRecord) -> None:
+    if out is not None:
+        out.write(record)
+
+
+def summarize(results: Sequence[GameRecord]) -> Dict[Tuple[str, str], Dict[str, int]]:
+    """Victorias de MAX, victorias de MIN y empates por pareja (MAX, MIN)."""
+    table: Dict[Tuple[str, str], Dict[str, int]] = {}
+    for r in results:
+        row = table.setdefault((r.max_agent, r.min_agent), {"max_wins": 0, "min_wins": 0, "draws": 0})
+        if r.result == MAX_PLAYER:
+            row["max_wins"] += 1
+        elif r.result == MIN_PLAYER:
+            row["min_wins"] += 1
+        else:
+            row["draws"] += 1
+    return table
+
+
+def print_summary(results: Sequence[GameRecord]) -> None:
+    """Imprime el resumen del torneo en el formato de experiments.py."""
+    for (name_max, name_min), row in sorted(summarize(results).items()):
+        print(f"{name_max} (MAX) vs {name_min} (MIN): {row['max_wins']} victorias MAX, "
+              f"{row['min_wins']} victorias MIN, {row['draws']} empates")
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Torneo IA vs IA de Connect-4")
+    parser.add_argument("agents", nargs="+",
+                        help='Agentes: "minimax:4", "expectimax:250ms", "random", "mcts:2000", "minimax:6@O"...')
+    parser.add_argument("--games", type=int, default=10, help="Partidas por pareja y color")
+    parser.add_argument("--mode", choices=MODES, default="round_robin")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--out", default=None, help="Fichero de partidas .c4g (permite reanudar)")
+    parser.add_argument("--seed", type=int, default=0, help="Semilla base")
+    parser.add_argument("--stats", action="store_true",
+                        help="Guardar nodos, profundidad y tiempo de cada jugada")
+    add_geometry_arguments(parser)
+    args = parser.parse_args(argv)
+
+    specs = [AgentSpec.parse(text) for text in args.agents]
+    results = load_results(args.out) if args.out else []
+    for record in run_tournament(specs, args.games, args.mode, args.workers, args.out, args.seed,
+                                 args.stats, geometry_from_args(args)):
+        results.append(record)
+        print(f"[{len(results)}] {record.max_agent} vs {record.min_agent}: {record.result}")
+    print()
+    print_summary(results)
+
+
+if __name__ == "__main__":
+    main()
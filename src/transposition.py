@@ -0,0 +1,150 @@
+"""
+Tabla de transposiciones para la búsqueda Minimax.
+
+En Connect-4 la misma posición se alcanza por muchos órdenes de jugadas.
+La tabla guarda, indexado por la clave Zobrist de la posición, el valor
+encontrado, la profundidad buscada, el tipo de cota (exacta, inferior o
+superior) y la mejor jugada, para no repetir el trabajo.
+
+La tabla tiene un número fijo de casillas calculado a partir de un límite
+de memoria, y dos políticas de reemplazo:
+- "depth": se conserva la entrada de mayor profundidad.
+- "two_tier": cada casilla tiene dos entradas, una que prefiere
+  profundidad y otra que se reemplaza siempre.
+"""
+
+from typing import Dict, Optional, Tuple
+from .bitboard import BitBoard
+
+# Tipos de cota
+EXACT = 0
+LOWER = 1  # El valor real es >= value (hubo poda beta)
+UPPER = 2  # El valor real es <= value (ningún hijo superó alpha)
+
+# Entrada: (clave, profundidad, tipo de cota, valor, mejor jugada)
+Entry = Tuple[int, int, int, int, Optional[int]]
+
+# Estimación aproximada de lo que ocupa una entrada en CPython
+# (tupla de 5 elementos + enteros + puntero en la lista).
+ENTRY_BYTES = 120
+
+REPLACEMENT_POLICIES = ("depth", "two_tier")
+
+
+def tt_key(pos: BitBoard) -> Tuple[int, bool]:
+    """
+    Clave de la tabla para 'pos'. Los valores de negamax son del jugador
+    que mueve y no dependen de la raíz, así que MAX y MIN comparten entradas.
+
+    Una posición y su reflejo izquierda/derecha valen lo mismo, así que
+    comparten entrada: se usa el menor de los dos hash Zobrist. Devuelve
+    (clave, reflejada); si 'reflejada' es True la jugada guardada en la
+    entrada está en la orientación reflejada (columna COLS - 1 - c).
+    Con columnas pares no se comparte (ver Geometry.symmetric).
+    """
+    mirrored = pos.geometry.symmetric and pos.mirror_hash < pos.hash
+    return (pos.mirror_hash if mirrored else pos.hash), mirrored
+
+
+class TranspositionTable:
+    """
+    Tabla de transposiciones acotada en memoria.
+
+    - max_mb: memoria máxima aproximada en megabytes.
+    - policy: política de reemplazo ("depth" o "two_tier").
+
+    Se pensó para durar toda una partida: el agente la conserva entre
+    jugadas y así aprovecha lo calculado en el turno anterior.
+    """
+
+    def __init__(self, max_mb: float = 16, policy: str = "two_tier"):
+        if policy not in REPLACEMENT_POLICIES:
+            raise ValueError(f"Política de reemplazo desconocida: {policy}")
+        self.policy = policy
+        self.max_mb = max_mb
+
+        # Número de casillas: mayor potencia de 2 que cabe en la memoria
+        entries = max(2, int(max_mb * 1024 * 1024) // ENTRY_BYTES)
+        ways = 2 if policy == "two_tier" else 1
+        slots = 1
+        while slots * 2 * ways <= entries:
+            slots *= 2
+        self.slots = slots
+        self._mask = slots - 1
+        self._ways = ways
+        self._table = [None] * (slots * ways)
+
+        self.reset_stats()
+
+    def reset_stats(self) -> None:
+        """Pone a cero los contadores de uso."""
+        self.hits = 0
+        self.misses = 0
+        # Fallos en los que la casilla guardaba otra posición (ocupación o
+        # reemplazo, no colisiones de clave: la clave se guarda entera)
+        self.slot_misses = 0
+        self.stores = 0
+        self.overwrites = 0
+
+    def clear(self) -> None:
+        """Vacía la tabla (por ejemplo al empezar una partida nueva)."""
+        self._table = [None] * len(self._table)
+        self.reset_stats()
+
+    def probe(self, key: int) -> Optional[Entry]:
+        """
+        Busca la entrada de 'key'. Devuelve la tupla guardada o None.
+        Si falla y la casilla está ocupada por otra posición se cuenta en
+        slot_misses.
+        """
+        base = (key & self._mask) * self._ways
+        occupied = False
+        for i in range(base, base + self._ways):
+            entry = self._table[i]
+            if entry is not None:
+                if entry[0] == key:
+                    self.hits += 1
+                    return entry
+                occupied = True
+        self.misses += 1
+        if occupied:
+            self.slot_misses += 1
+        return None
+
+    def store(self, key: int, depth: int, flag: int, value: int, move: Optional[int]) -> None:
+        """Guarda el resultado de buscar 'key' según la política de reemplazo."""
+        table = self._table
+        base = (key & self._mask) * self._ways
+        entry = (key, depth, flag, value, move)
+        self.stores += 1
+
+        current = table[base]
+        if current is None or current[0] == key or depth >= current[1]:
+            # Casilla que prefiere profundidad. En two_tier, la entrada
+            # desplazada baja a la casilla de reemplazo siempre.
+            if current is not None and current[0] != key:
+                self.overwrites += 1
+                if self._ways == 2:
+                    table[base + 1] = current
+            table[base] = entry
+        elif self._ways == 2:
+            if table[base + 1] is not None and table[base + 1][0] != key:
+                self.overwrites += 1
+            table[base + 1] = entry
+
+    def __len__(self) -> int:
+        return sum(1 for entry in self._table if entry is not None)
+
+    def stats(self) -> Dict[str, float]:
+        """Devuelve los contadores de uso y la ocupación de la tabla."""
+        probes = self.hits + self.misses
+        return {
+            "slots": len(self._table),
+            "used": len(self),
+            "hits": self.hits,
+            "misses": self.misses,
+            "slot_misses": self.slot_misses,
+            "stores": self.stores,
+            "overwrites": self.overwrites,
+            "hit_rate": self.hits / probes if probes else 0.0,
+        }
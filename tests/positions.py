@@ -0,0 +1,35 @@
+"""
+Posiciones aleatorias reproducibles para los tests.
+"""
+
+import random
+from typing import Iterator, Sequence
+from src.bitboard import BitBoard
+from src.geometry import Geometry, get_geometry
+
+# Variantes con las que se prueba todo: la estándar, una de columnas pares,
+# una de conecta-3 pequeña y una de conecta-5
+GEOMETRIES = (get_geometry(), get_geometry(5, 6, 4), get_geometry(4, 5, 3), get_geometry(7, 9, 5))
+
+
+def random_position(rng: random.Random, geometry: Geometry, min_moves: int = 0,
+                    max_moves: int = 30) -> BitBoard:
+    """
+    Partida aleatoria de entre 'min_moves' y 'max_moves' fichas (menos si
+    termina antes) que no ha terminado.
+    """
+    while True:
+        pos = BitBoard(geometry)
+        target = rng.randint(min_moves, max_moves)
+        while pos.moves < target and not pos.is_terminal():
+            pos.make_move(rng.choice(pos.get_valid_moves()))
+        if not pos.is_terminal() and pos.moves >= min_moves:
+            return pos
+
+
+def random_positions(seed: int, count: int, geometries: Sequence[Geometry] = GEOMETRIES,
+                     min_moves: int = 0, max_moves: int = 30) -> Iterator[BitBoard]:
+    """'count' posiciones de random_position repartidas entre 'geometries'."""
+    rng = random.Random(seed)
+    for i in range(count):
+        yield random_position(rng, geometries[i % len(geometries)], min_moves, max_moves)
@@ -0,0 +1,77 @@
+"""
+Servicio de análisis contra localhost: peticiones iguales simultáneas
+comparten una búsqueda, las repetidas salen de la caché (también las
+reflejadas) y las peticiones inválidas reciben un error sin cerrar la
+conexión.
+"""
+
+import asyncio
+import json
+import pytest
+from src.analysis_service import AnalysisClient, AnalysisError, AnalysisServer
+
+DEPTH = 4
+
+
+def _run(scenario):
+    """Arranca un servidor en un puerto libre de 127.0.0.1 y ejecuta 'scenario(server)'."""
+    async def main():
+        async with AnalysisServer("127.0.0.1", port=0, workers=1) as server:
+            return await scenario(server)
+    return asyncio.run(main())
+
+
+def test_concurrent_identical_requests_share_one_search():
+    async def scenario(server):
+        async with AnalysisClient(port=server.port) as client:
+            first, second = await asyncio.gather(client.analyze("3342", depth=DEPTH),
+                                                 client.analyze("3342", depth=DEPTH))
+        return server.stats(), first, second
+
+    stats, first, second = _run(scenario)
+    assert stats["misses"] == 1 and stats["coalesced"] == 1
+    assert first["move"] == second["move"]
+    assert sorted((first["cached"], second["cached"])) == [False, True]
+
+
+def test_repeated_and_mirrored_requests_come_from_the_cache():
+    async def scenario(server):
+        async with AnalysisClient(port=server.port) as client:
+            first = await client.analyze("01", depth=DEPTH)
+            repeated = await client.analyze("01", depth=DEPTH)
+            mirrored = await client.analyze("65", depth=DEPTH)
+        return server.stats(), first, repeated, mirrored
+
+    stats, first, repeated, mirrored = _run(scenario)
+    assert stats["misses"] == 1 and stats["hits"] == 2
+    assert not first["cached"] and repeated["cached"] and mirrored["cached"]
+    assert repeated["move"] == first["move"] and repeated["pv"] == first["pv"]
+    assert mirrored["move"] == 6 - first["move"]
+    assert mirrored["pv"] == [6 - col for col in first["pv"]]
+
+
+def test_invalid_requests_get_an_error_and_keep_the_connection():
+    async def scenario(server):
+        reader, writer = await asyncio.open_connection("127.0.0.1", server.port)
+        writer.write(b"{not json\n")
+        malformed = json.loads(await reader.readline())
+        writer.write(b'{"id": 7, "position": "3", "algorithm": "alphazero"}\n')
+        unknown = json.loads(await reader.readline())
+        writer.write(b'{"id": 8, "position": "3", "depth": 2}\n')
+        valid = json.loads(await reader.readline())
+        writer.close()
+        await writer.wait_closed()
+
+        async with AnalysisClient(port=server.port) as client:
+            with pytest.raises(AnalysisError):
+                await client.analyze("3333333", depth=2)  # Columna llena
+            with pytest.raises(AnalysisError):
+                await client.analyze("0101010", depth=2)  # Ya terminada
+            after = await client.analyze("3", depth=2)
+        return malformed, unknown, valid, after
+
+    malformed, unknown, valid, after = _run(scenario)
+    assert malformed["id"] is None and "error" in malformed
+    assert unknown["id"] == 7 and "error" in unknown
+    assert valid["id"] == 8 and 0 <= valid["move"] < 7
+    assert 0 <= after["move"] < 7
@@ -0,0 +1,45 @@
+"""
+Ponderer: tras un acierto, la siguiente predicción sale de la variante
+principal pensada para esa respuesta y no de la búsqueda anterior.
+"""
+
+from src.agents import MinimaxAgent
+from src.background_search import Ponderer
+from src.bitboard import BitBoard
+
+
+def _position(history):
+    pos = BitBoard()
+    for col in history:
+        pos.make_move(col)
+    return pos
+
+
+def _pv(pos, depth):
+    """Variante principal de una búsqueda normal del agente en 'pos'."""
+    agent = MinimaxAgent(depth=depth, player_symbol=pos.player, tt_mb=0, ordering=False, stats=True)
+    agent.get_move(pos)
+    return agent.stats.pv
+
+
+def test_ponder_hit_refreshes_the_prediction():
+    pos = _position([3, 3, 2])
+    agent = MinimaxAgent(depth=4, player_symbol=pos.player, tt_mb=0, ordering=False, stats=True)
+    move = agent.get_move(pos)
+    stale = list(agent.stats.pv)
+    pos.make_move(move)
+
+    ponderer = Ponderer(agent)
+    ponderer.start(pos)
+    ponderer._thread.join()  # Que termine de pensar todas las respuestas
+    reply = stale[1]
+    pos.make_move(reply)
+    assert ponderer.take(pos) is not None
+    expected = _pv(pos, 4)
+    assert agent.stats.pv == expected
+
+    pos.make_move(expected[0])
+    ponderer.start(pos)
+    ponderer.stop()
+    assert ponderer._replies(pos)[0] == expected[1]
+    assert ponderer.hits == 1
@@ -0,0 +1,57 @@
+"""
+Evaluación por lotes frente a la de referencia (heuristic_evaluation,
+evaluate y get_winner), posición a posición, con los dos formatos de
+entrada. Necesita NumPy (opcional); sin él se salta.
+"""
+
+import random
+import pytest
+from src.bitboard import BitBoard, PLAYERS
+from src.board import get_winner
+from src.config import MAX_PLAYER
+from src.evaluation import evaluate, heuristic_evaluation
+from .positions import GEOMETRIES, random_positions
+
+np = pytest.importorskip("numpy")
+from src.batch_evaluation import (CELL_EMPTY, CELL_MAX, CELL_MIN, batch_evaluate,  # noqa: E402
+                                  batch_heuristic, batch_winner, pack_bitboards, to_array)
+
+WINNER_CELLS = {None: CELL_EMPTY, MAX_PLAYER: CELL_MAX}
+
+
+def _finished_games(seed, count, geometry):
+    """'count' partidas aleatorias jugadas hasta el final (victoria o tablero lleno)."""
+    rng = random.Random(seed)
+    for _ in range(count):
+        pos = BitBoard(geometry)
+        while not pos.is_terminal():
+            pos.make_move(rng.choice(pos.get_valid_moves()))
+        yield pos
+
+
+def _formats(positions, geometry):
+    """El lote en los formatos que admite 'geometry' (el empaquetado necesita 64 bits)."""
+    formats = [to_array(positions)]
+    if (geometry.rows + 1) * geometry.cols <= 64:
+        formats.append(pack_bitboards(positions, geometry))
+    else:
+        with pytest.raises(ValueError):
+            pack_bitboards(positions, geometry)
+    return formats
+
+
+@pytest.mark.parametrize("geometry", GEOMETRIES, ids=repr)
+def test_batch_matches_scalar(geometry):
+    positions = list(random_positions(31, 60, [geometry], 0, geometry.size - 1))
+    positions += list(_finished_games(32, 60, geometry))
+    boards = [pos.to_board() for pos in positions]
+    connect = geometry.connect
+    assert any(get_winner(board, connect) for board in boards)
+
+    for batch in _formats(positions, geometry):
+        for player in PLAYERS:
+            expected = [heuristic_evaluation(board, player, connect) for board in boards]
+            assert batch_heuristic(batch, player, geometry).tolist() == expected
+        winners = [WINNER_CELLS.get(get_winner(board, connect), CELL_MIN) for board in boards]
+        assert batch_winner(batch, geometry).tolist() == winners
+        assert batch_evaluate(batch, geometry).tolist() == [evaluate(board, connect) for board in boards]
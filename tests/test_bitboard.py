@@ -0,0 +1,55 @@
+"""
+BitBoard frente a la lógica de board.py: mismas jugadas válidas, mismo
+ganador y mismo estado terminal en partidas aleatorias completas.
+"""
+
+import random
+import pytest
+from src.board import apply_move, create_board, get_valid_moves, get_winner, is_terminal
+from src.bitboard import BitBoard, as_bitboard
+from src.config import MAX_PLAYER, MIN_PLAYER
+from .positions import GEOMETRIES
+
+
+@pytest.mark.parametrize("geometry", GEOMETRIES, ids=repr)
+def test_random_games_match_board(geometry):
+    rng = random.Random(1)
+    for _ in range(30):
+        board = create_board(geometry.rows, geometry.cols)
+        pos = BitBoard(geometry)
+        player = MAX_PLAYER
+        while True:
+            assert pos.get_valid_moves() == get_valid_moves(board)
+            assert pos.get_winner() == get_winner(board, geometry.connect)
+            assert pos.is_terminal() == is_terminal(board, geometry.connect)
+            assert pos.to_board() == board
+            if pos.is_terminal():
+                break
+            col = rng.choice(pos.get_valid_moves())
+            board = apply_move(board, col, player)
+            pos.make_move(col)
+            player = MIN_PLAYER if player == MAX_PLAYER else MAX_PLAYER
+
+
+@pytest.mark.parametrize("geometry", GEOMETRIES, ids=repr)
+def test_from_board_and_undo_restore_the_position(geometry):
+    rng = random.Random(2)
+    for _ in range(30):
+        pos = BitBoard(geometry)
+        snapshots = []
+        while not pos.is_terminal():
+            snapshots.append((pos.bits[:], pos.heights[:], pos.hash, pos.mirror_hash))
+            pos.make_move(rng.choice(pos.get_valid_moves()))
+            loaded = as_bitboard(pos.to_board(), pos.player, geometry=geometry)
+            assert loaded.bits == pos.bits
+            assert (loaded.hash, loaded.mirror_hash) == (pos.hash, pos.mirror_hash)
+        while pos.history:
+            pos.undo_move()
+            assert (pos.bits, pos.heights, pos.hash, pos.mirror_hash) == snapshots.pop()
+
+
+def test_from_moves_rejects_invalid_sequences():
+    with pytest.raises(ValueError):
+        BitBoard.from_moves("0000000")  # Columna llena
+    with pytest.raises(ValueError):
+        BitBoard.from_moves("01010101")  # La partida terminó en la séptima jugada
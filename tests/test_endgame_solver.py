@@ -0,0 +1,109 @@
+"""
+EndgameSolver frente a una búsqueda exhaustiva sin poda en finales con
+pocas casillas libres: misma puntuación y jugadas que la consiguen. Y que
+se puede cortar como las demás búsquedas.
+"""
+
+import time
+import pytest
+from src.endgame_solver import EndgameSolver, win_distance
+from src.agents import MinimaxAgent
+from src.background_search import ProgressStats, SearchCancelled
+from src.bitboard import BitBoard
+from src.deadline import SearchTimeout
+from src.geometry import get_geometry
+from .positions import random_positions
+
+GEOMETRIES = (get_geometry(), get_geometry(4, 5, 3), get_geometry(4, 4, 3))
+
+
+def _brute_force(pos):
+    """Puntuación de solve() recorriendo el árbol entero (sin poda ni tabla)."""
+    size = pos.geometry.size
+    best = None
+    for col in pos.get_valid_moves():
+        pos.make_move(col)
+        if pos.geometry.has_line(pos.bits[pos.current ^ 1]):
+            value = (size + 2 - pos.moves) // 2
+        elif pos.moves == size:
+            value = 0
+        else:
+            value = -_brute_force(pos)
+        pos.undo_move()
+        if best is None or value > best:
+            best = value
+    return best
+
+
+def _endgames(seed, count, empty):
+    """'count' finales por variante con entre 1 y 'empty' casillas libres."""
+    for geometry in GEOMETRIES:
+        yield from random_positions(seed, count, [geometry], geometry.size - empty, geometry.size - 1)
+
+
+@pytest.mark.parametrize("empty", [6, 9])
+def test_solver_matches_brute_force(empty):
+    solver = EndgameSolver()
+    for pos in _endgames(7 + empty, 30, empty):
+        expected = _brute_force(pos)
+        assert solver.solve(pos, pos.player) == expected, pos.history
+        move, score = solver.best_move(pos, pos.player)
+        assert score == expected
+        # La jugada elegida consigue esa puntuación
+        pos.make_move(move)
+        if pos.geometry.has_line(pos.bits[pos.current ^ 1]):
+            reached = (pos.geometry.size + 2 - pos.moves) // 2
+        elif pos.moves == pos.geometry.size:
+            reached = 0
+        else:
+            reached = -_brute_force(pos)
+        pos.undo_move()
+        assert reached == expected, pos.history
+
+
+def test_win_distance_parity():
+    solver = EndgameSolver()
+    for pos in _endgames(8, 30, 8):
+        score = solver.solve(pos, pos.player)
+        distance = win_distance(pos.moves, score, pos.geometry.size)
+        if score == 0:
+            assert distance is None
+        else:
+            assert distance % 2 == (1 if score > 0 else 0)
+            assert pos.moves + distance <= pos.geometry.size
+
+
+def test_cancelled_stats_stop_the_solver():
+    stats = ProgressStats()
+    stats.cancel_event.set()
+    with pytest.raises(SearchCancelled):
+        EndgameSolver().best_move(BitBoard(), stats=stats)
+
+
+def test_deadline_stops_the_solver():
+    with pytest.raises(SearchTimeout):
+        EndgameSolver().solve(BitBoard(), deadline=time.perf_counter())
+
+
+def test_stats_count_solver_nodes():
+    solver = EndgameSolver()
+    stats = ProgressStats()
+    pos = next(_endgames(3, 1, 12))
+    move, _ = solver.best_move(pos, pos.player, stats)
+    assert stats.nodes == solver.nodes
+    assert stats.pv == [move]
+
+
+def test_agent_solver_is_opt_in():
+    assert MinimaxAgent().solver is None
+    pos = next(_endgames(4, 1, 8))
+    agent = MinimaxAgent(depth=2, player_symbol=pos.player, endgame_cells=8)
+    agent.get_move(pos)
+    assert agent.last_score == EndgameSolver().solve(pos, pos.player)
+
+
+def test_agent_falls_back_when_the_solver_runs_out_of_time():
+    # Tablero vacío: el solver no termina en 50 ms y la búsqueda heurística juega
+    agent = MinimaxAgent(time_limit_ms=50, endgame_cells=42)
+    assert agent.get_move(BitBoard()) in range(7)
+    assert agent.last_score is None and agent.last_depth >= 1
@@ -0,0 +1,82 @@
+"""
+Heurística incremental (IncrementalBitBoard) frente a la completa de
+evaluation.py, al hacer y deshacer jugadas, y evaluate_node frente a
+is_terminal + evaluate.
+"""
+
+import random
+import pytest
+from src.bitboard import PLAYERS, as_bitboard
+from src.board import get_winner, is_terminal
+from src.geometry import get_geometry
+from src.evaluation import (DRAW, ONGOING, WIN, IncrementalBitBoard, evaluate, evaluate_bitboard,
+                            evaluate_node, heuristic_evaluation, heuristic_evaluation_bitboard)
+from .positions import GEOMETRIES
+
+
+def _full_scores(pos):
+    board = pos.to_board()
+    return [heuristic_evaluation(board, player, pos.geometry.connect) for player in PLAYERS]
+
+
+@pytest.mark.parametrize("geometry", GEOMETRIES + (get_geometry(6, 7, 2),), ids=repr)
+def test_incremental_scores_match_full_heuristic(geometry):
+    rng = random.Random(3)
+    for _ in range(20):
+        pos = IncrementalBitBoard(geometry)
+        assert pos.scores == _full_scores(pos)
+        while not pos.is_terminal():
+            col = rng.choice(pos.get_valid_moves())
+            peeked = pos.peek_scores(col)
+            pos.make_move(col)
+            assert pos.scores == peeked == _full_scores(pos)
+            if rng.random() < 0.2:
+                pos.undo_move()
+                assert pos.scores == _full_scores(pos)
+                pos.make_move(col)
+        while pos.history:
+            pos.undo_move()
+            assert pos.scores == _full_scores(pos)
+
+
+@pytest.mark.parametrize("geometry", GEOMETRIES, ids=repr)
+def test_bitboard_evaluation_matches_board(geometry):
+    rng = random.Random(4)
+    for _ in range(20):
+        pos = IncrementalBitBoard(geometry)
+        while True:
+            board = pos.to_board()
+            assert evaluate_bitboard(pos) == evaluate(board, geometry.connect)
+            for player in PLAYERS:
+                assert heuristic_evaluation_bitboard(pos, player) == \
+                    heuristic_evaluation(board, player, geometry.connect)
+            if pos.is_terminal():
+                break
+            pos.make_move(rng.choice(pos.get_valid_moves()))
+
+
+def _old_node(board, connect):
+    """Estado y valor de un nodo como antes de evaluate_node: is_terminal + evaluate."""
+    if not is_terminal(board, connect):
+        return ONGOING, evaluate(board, connect)
+    return (DRAW if get_winner(board, connect) is None else WIN), evaluate(board, connect)
+
+
+@pytest.mark.parametrize("geometry", GEOMETRIES, ids=repr)
+def test_evaluate_node_matches_is_terminal_and_evaluate(geometry):
+    rng = random.Random(5)
+    terminal = 0
+    for _ in range(30):
+        pos = IncrementalBitBoard(geometry)
+        while True:
+            board = pos.to_board()
+            expected = _old_node(board, geometry.connect)
+            # Con historial solo se mira al que acaba de mover (una línea nueva pasa por su ficha)
+            assert evaluate_node(pos) == expected, pos.history
+            # Sin historial (posición cargada) se mira a los dos
+            assert evaluate_node(as_bitboard(board, pos.player, geometry=geometry)) == expected
+            if pos.is_terminal():
+                terminal += 1
+                break
+            pos.make_move(rng.choice(pos.get_valid_moves()))
+    assert terminal == 30
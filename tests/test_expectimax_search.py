@@ -0,0 +1,39 @@
+"""
+Poda Star1/Star2 de Expectimax: misma jugada y mismo valor que la
+búsqueda sin poda, con rival uniforme y con un modelo del oponente.
+"""
+
+import pytest
+from src.bitboard import as_bitboard
+from src.evaluation import IncrementalBitBoard
+from src.expectimax_search import _search_root
+from src.opponent_model import SoftmaxModel
+from .positions import random_positions
+
+
+def _root(pos, depth, pruning, model=None):
+    search = as_bitboard(pos, pos.player, IncrementalBitBoard)
+    moves = search.fold_symmetric(search.get_valid_moves())
+    move, value, _ = _search_root(search, depth, pos.player, moves, None, None, pruning, model)
+    return move, value
+
+
+@pytest.mark.parametrize("pruning", ["star1", "star2"])
+def test_pruning_keeps_move_and_value(pruning):
+    for i, pos in enumerate(random_positions(9, 40, max_moves=25)):
+        depth = 1 + i % 4
+        move, value = _root(pos, depth, None)
+        pruned_move, pruned_value = _root(pos, depth, pruning)
+        assert pruned_move == move, (pos.history, depth)
+        assert pruned_value == pytest.approx(value, abs=1e-9), (pos.history, depth)
+
+
+def test_pruning_with_opponent_model():
+    model = SoftmaxModel()
+    for i, pos in enumerate(random_positions(10, 16, max_moves=25)):
+        depth = 1 + i % 3
+        move, value = _root(pos, depth, None, model)
+        for pruning in ("star1", "star2"):
+            pruned_move, pruned_value = _root(pos, depth, pruning, model)
+            assert pruned_move == move, (pos.history, depth, pruning)
+            assert pruned_value == pytest.approx(value, abs=1e-9), (pos.history, depth, pruning)
@@ -0,0 +1,122 @@
+"""
+Formato binario de partidas: ida y vuelta de encode_record/decode_record
+y del fichero, incluido un último registro cortado, con la variante en
+la cabecera.
+"""
+
+import os
+import random
+import pytest
+from src.config import MAX_PLAYER, MIN_PLAYER
+from src.game_records import (FILE_HEADER, GameRecord, GameRecordWriter, LENGTH, MAGIC,
+                              decode_record, encode_record, pack_moves, read_geometry,
+                              read_records, unpack_moves)
+from src.geometry import STANDARD, get_geometry
+
+
+def _random_record(rng, with_stats):
+    moves = [rng.randrange(7) for _ in range(rng.randint(0, 42))]
+    stats = None
+    if with_stats:
+        stats = [(rng.randrange(1 << 32), rng.randrange(1 << 16), rng.random()) for _ in moves]
+    return GameRecord(max_agent=rng.choice(["minimax:4", "mcts:250ms", "ñandú"]),
+                      min_agent=rng.choice(["expectimax:3", "random"]),
+                      result=rng.choice(["draw", MAX_PLAYER, MIN_PLAYER]),
+                      moves=moves, seed=rng.randrange(1 << 64),
+                      max_depth=rng.randrange(256), min_depth=rng.randrange(256),
+                      game_id=f"game|{rng.randrange(1000)}", stats=stats)
+
+
+def _same(decoded, record):
+    assert decoded.moves == record.moves
+    assert (decoded.max_agent, decoded.min_agent, decoded.result, decoded.seed, decoded.game_id) == \
+        (record.max_agent, record.min_agent, record.result, record.seed, record.game_id)
+    assert (decoded.max_depth, decoded.min_depth) == (record.max_depth, record.min_depth)
+    if record.stats is None:
+        assert decoded.stats is None
+    else:
+        for (nodes, depth, seconds), expected in zip(decoded.stats, record.stats):
+            assert (nodes, depth) == expected[:2]
+            assert seconds == pytest.approx(expected[2], rel=1e-6)  # float32
+
+
+def test_pack_moves_round_trip():
+    rng = random.Random(11)
+    for count in range(44):
+        moves = [rng.randrange(16) for _ in range(count)]
+        assert unpack_moves(pack_moves(moves), count) == moves
+
+
+@pytest.mark.parametrize("with_stats", [False, True])
+def test_encode_decode_round_trip(with_stats):
+    rng = random.Random(12)
+    for _ in range(50):
+        record = _random_record(rng, with_stats)
+        data = encode_record(record)
+        assert LENGTH.unpack_from(data)[0] == len(data) - LENGTH.size
+        _same(decode_record(data[LENGTH.size:]), record)
+
+
+def test_encode_rejects_mismatched_stats():
+    record = GameRecord("a", "b", "draw", [3, 3], stats=[(1, 1, 0.1)])
+    with pytest.raises(ValueError):
+        encode_record(record)
+
+
+def test_file_round_trip_and_truncated_record(tmp_path):
+    rng = random.Random(13)
+    path = str(tmp_path / "games.c4g")
+    records = [_random_record(rng, i % 2 == 0) for i in range(20)]
+    with GameRecordWriter(path) as out:
+        for record in records[:10]:
+            out.write(record)
+    # Un último registro a medio escribir se ignora al leer...
+    with open(path, "ab") as f:
+        f.write(encode_record(records[10])[:-3])
+    assert len(list(read_records(path))) == 10
+    # ...y se descarta al reabrir para añadir
+    with GameRecordWriter(path) as out:
+        for record in records[10:]:
+            out.write(record)
+    decoded = list(read_records(path))
+    assert len(decoded) == len(records)
+    for got, expected in zip(decoded, records):
+        _same(got, expected)
+
+
+def test_rejects_other_files(tmp_path):
+    path = tmp_path / "other.bin"
+    path.write_bytes(b"not a game file")
+    with pytest.raises(ValueError):
+        list(read_records(str(path)))
+    assert os.path.getsize(path) == 15
+
+
+def test_file_keeps_its_variant(tmp_path):
+    rng = random.Random(14)
+    path = str(tmp_path / "variant.c4g")
+    geometry = get_geometry(7, 9, 5)
+    record = _random_record(rng, True)
+    with GameRecordWriter(path, geometry) as out:
+        out.write(record)
+    assert read_geometry(path) is geometry
+    with GameRecordWriter(path, geometry) as out:
+        out.write(record)
+    assert len(list(read_records(path))) == 2
+    with pytest.raises(ValueError):
+        GameRecordWriter(path)  # Otra variante
+    with pytest.raises(ValueError):
+        GameRecordWriter(str(tmp_path / "wide.c4g"), get_geometry(6, 17, 4))
+
+
+def test_reads_and_extends_version_1_files(tmp_path):
+    rng = random.Random(15)
+    path = tmp_path / "v1.c4g"
+    records = [_random_record(rng, False) for _ in range(3)]
+    path.write_bytes(FILE_HEADER.pack(MAGIC, 1, 6, 7) + encode_record(records[0]))
+    assert read_geometry(str(path)) is STANDARD
+    with GameRecordWriter(str(path)) as out:
+        for record in records[1:]:
+            out.write(record)
+    for got, expected in zip(read_records(str(path)), records):
+        _same(got, expected)
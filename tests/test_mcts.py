@@ -0,0 +1,128 @@
+"""
+MCTS: jugadas tácticas (también con la suma de resultados, que depende
+del punto de vista en la retropropagación y en el paralelismo "leaf"),
+reutilización del árbol entre búsquedas y compactación del NodePool.
+"""
+
+import pytest
+from src.agents import MCTSAgent
+from src.bitboard import BitBoard
+from src.mcts import MCTS, POLICIES
+
+# MAX tiene dos fichas abajo en el centro: jugar en 1 o en 4 deja dos
+# amenazas a la vez y gana en tres jugadas
+DOUBLE_THREAT = "3322"
+# MIN tiene tres en línea en las columnas 0 y 6: MAX pierde juegue lo que juegue
+LOST = "101020265656"
+
+
+def _subtree(pool, node):
+    """(jugada, estado, visitas, recompensa, hijos) de 'node' y de todo su subárbol."""
+    first = pool.first_child[node]
+    children = []
+    if first >= 0:
+        assert 0 <= first and first + pool.child_count[node] <= pool.size
+        children = [_subtree(pool, child) for child in range(first, first + pool.child_count[node])]
+    return pool.move[node], pool.status[node], pool.visits[node], pool.reward[node], children
+
+
+def _count(tree):
+    return 1 + sum(_count(child) for child in tree[4])
+
+
+@pytest.mark.parametrize("policy", POLICIES)
+def test_immediate_win_and_block(policy):
+    tree = MCTS(policy=policy, seed=1)
+    assert tree.search(BitBoard.from_moves("303030"), 200) == 3  # Gana ya
+    assert tree.search(BitBoard.from_moves("30303"), 200) == 3   # Tapa la victoria de MAX
+
+
+@pytest.mark.parametrize("policy", POLICIES)
+def test_finds_the_double_threat(policy):
+    tree = MCTS(policy=policy, seed=2)
+    move = tree.search(BitBoard.from_moves(DOUBLE_THREAT), 800)
+    assert move in (1, 4)
+    # Visto desde quien mueve a ese hijo, la jugada gana casi siempre
+    visits = tree.pool.visits
+    reward = tree.pool.reward
+    first = tree.pool.first_child[tree.root]
+    child = next(c for c in range(first, first + tree.pool.child_count[tree.root])
+                 if tree.pool.move[c] == move)
+    assert reward[child] / visits[child] > 0.5
+
+
+def _root_children(tree):
+    pool = tree.pool
+    first = pool.first_child[tree.root]
+    return [(pool.visits[child], pool.reward[child])
+            for child in range(first, first + pool.child_count[tree.root])]
+
+
+def test_lost_position_scores_every_move_as_a_loss():
+    # Con "tactical" cada simulación la gana MIN: las jugadas de MAX suman -1 por visita
+    tree = MCTS(policy="tactical", seed=6)
+    tree.search(BitBoard.from_moves(LOST), 300)
+    children = _root_children(tree)
+    assert len(children) == 7
+    assert all(reward == -visits and visits > 0 for visits, reward in children)
+
+
+def test_reuse_keeps_the_child_subtree():
+    tree = MCTS(seed=3)
+    pos = BitBoard.from_moves("33")
+    move = tree.search(pos, 500)
+    pool = tree.pool
+    first = pool.first_child[tree.root]
+    child = next(c for c in range(first, first + pool.child_count[tree.root]) if pool.move[c] == move)
+    before = _subtree(pool, child)
+
+    pos.make_move(move)
+    tree.search(pos, 300)
+    assert tree.root == child  # Sin compactar: el mismo nodo
+    assert tree.reused == before[2]
+    assert tree.pool.visits[tree.root] == before[2] + 300
+
+
+def test_compact_keeps_the_subtree():
+    tree = MCTS(seed=4, capacity=4000)
+    pos = BitBoard.from_moves("3")
+    move = tree.search(pos, 1500)
+    pool = tree.pool
+    first = pool.first_child[tree.root]
+    child = next(c for c in range(first, first + pool.child_count[tree.root]) if pool.move[c] == move)
+    before = _subtree(pool, child)
+
+    root = tree._compact(child)
+    assert tree.pool is not pool and root == 0
+    after = _subtree(tree.pool, root)
+    assert after == before
+    assert tree.pool.size == _count(after)
+
+    # Reutilizar con el pool a más de la mitad también compacta
+    tree = MCTS(seed=4, capacity=4000)
+    tree.search(pos, 1500)
+    assert tree.pool.size > tree.pool.capacity // 2
+    reused = BitBoard.from_moves("3")
+    reused.make_move(move)
+    tree.search(reused, 100)
+    assert tree.root == 0 and tree.reused == before[2]
+    _subtree(tree.pool, tree.root)
+
+
+def test_leaf_parallel_agent():
+    agent = MCTSAgent(playouts=400, workers=2, parallel="leaf", seed=5)
+    try:
+        pos = BitBoard.from_moves(DOUBLE_THREAT)
+        move = agent.get_move(pos)
+        assert pos.can_play(move) and move in (1, 4)
+        assert agent.last_playouts == 400
+        assert agent.tree.pool.visits[agent.tree.root] == agent.tree.reused + 400
+
+        # Los resultados de los procesos se suman desde el punto de vista correcto
+        agent.tree.reset()
+        lost = BitBoard.from_moves(LOST)
+        assert lost.can_play(agent.get_move(lost))
+        assert agent.last_playouts == 400
+        assert all(reward == -visits for visits, reward in _root_children(agent.tree))
+    finally:
+        agent.close()
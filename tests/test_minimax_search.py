@@ -0,0 +1,36 @@
+"""
+Búsqueda Minimax: los tres drivers de la raíz (DRIVERS) dan el mismo
+valor, con y sin tabla de transposiciones, y la misma jugada con la
+misma configuración.
+"""
+
+import pytest
+from src.bitboard import as_bitboard
+from src.evaluation import IncrementalBitBoard
+from src.minimax_search import DRIVERS, _search_root
+from src.move_ordering import MoveOrderer
+from src.transposition import TranspositionTable
+from .positions import random_positions
+
+
+def _root(pos, depth, driver, tt, ordered):
+    search = as_bitboard(pos, pos.player, IncrementalBitBoard)
+    moves = search.fold_symmetric(search.get_valid_moves())
+    ordering = None
+    if ordered:
+        ordering = MoveOrderer()
+        ordering.new_search(depth, search.geometry)
+        moves = ordering.order(search, moves)
+    move, value, _ = _search_root(search, depth, moves, tt, None, ordering, None, driver)
+    return move, value
+
+
+@pytest.mark.parametrize("ordered", [False, True], ids=["plain", "ordered"])
+def test_drivers_agree(ordered):
+    for i, pos in enumerate(random_positions(5, 60, max_moves=25)):
+        depth = 1 + i % 5
+        reference = _root(pos, depth, "alphabeta", None, ordered)
+        for driver in DRIVERS:
+            move, value = _root(pos, depth, driver, TranspositionTable(1), ordered)
+            assert value == reference[1], (pos.history, depth, driver)
+            assert move == reference[0], (pos.history, depth, driver)
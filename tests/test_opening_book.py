@@ -0,0 +1,88 @@
+"""
+Libro de aperturas: cada posición del libro devuelve la jugada de
+Minimax a la profundidad del libro (también la reflejada), y las que no
+están devuelven None. Los libros de otras variantes guardan la suya.
+"""
+
+import pytest
+from src.bitboard import BitBoard
+from src.config import MAX_PLAYER
+from src.geometry import get_geometry
+from src.evaluation import IncrementalBitBoard
+from src.minimax_search import INFINITY, negamax
+from src.opening_book import KEY_BITS, OpeningBook, book_move, build_book
+
+PLIES = 2
+DEPTH = 4
+
+
+@pytest.fixture(scope="module")
+def book(tmp_path_factory):
+    path = str(tmp_path_factory.mktemp("book") / "book.bin")
+    build_book(path, plies=PLIES, depth=DEPTH)
+    with OpeningBook(path) as opened:
+        yield opened
+
+
+def _positions(plies):
+    frontier = [""]
+    for _ in range(plies + 1):
+        yield from frontier
+        frontier = [moves + str(col) for moves in frontier for col in range(7)]
+
+
+def _move_values(pos):
+    """Valor de cada jugada a la profundidad del libro."""
+    search = IncrementalBitBoard.from_bitboard(pos)
+    values = {}
+    for col in search.get_valid_moves():
+        search.make_move(col)
+        values[col] = -negamax(search, DEPTH - 1, -INFINITY, INFINITY)
+        search.undo_move()
+    return values
+
+
+def test_book_matches_search(book):
+    for moves in _positions(PLIES):
+        pos = BitBoard.from_moves(moves)
+        move = book.lookup(pos)
+        assert move is not None, moves
+        if not pos.is_symmetric():
+            mirror = BitBoard.from_moves("".join(str(6 - int(c)) for c in moves))
+            assert book.lookup(mirror) == 6 - move, moves
+        # Ante empates el libro puede elegir otra jugada del mismo valor
+        values = _move_values(pos)
+        assert values[move] == max(values.values()), moves
+    assert len(book) <= sum(7 ** ply for ply in range(PLIES + 1))
+
+
+def test_positions_outside_the_book(book):
+    assert book.lookup(BitBoard.from_moves("3333")) is None  # Más plies
+    assert book.lookup(BitBoard(get_geometry(5, 6, 4))) is None  # Otra variante
+    assert book_move(None, BitBoard(), MAX_PLAYER) is None
+    # Con el turno cambiado no es una posición de partida normal
+    assert book_move(book, BitBoard.from_moves("3"), MAX_PLAYER) is None
+
+
+def test_variant_book(tmp_path):
+    path = str(tmp_path / "book43.bin")
+    geometry = get_geometry(4, 4, 3)
+    build_book(path, plies=PLIES, depth=DEPTH, geometry=geometry)
+    with OpeningBook(path) as book:
+        assert book.geometry is geometry
+        assert book.lookup(BitBoard()) is None  # Tablero estándar
+        pos = BitBoard(geometry)
+        pos.make_move(0)
+        move = book.lookup(pos)
+        mirror = BitBoard(geometry)
+        mirror.make_move(3)
+        assert book.lookup(mirror) == 3 - move
+        values = _move_values(pos)
+        assert values[move] == max(values.values())
+
+
+def test_rejects_keys_that_do_not_fit(tmp_path):
+    geometry = get_geometry(7, 9, 5)
+    assert (geometry.rows + 1) * geometry.cols > KEY_BITS
+    with pytest.raises(ValueError):
+        build_book(str(tmp_path / "big.bin"), plies=1, depth=1, geometry=geometry)
@@ -0,0 +1,56 @@
+"""
+Búsqueda paralela de la raíz: con las tablas vacías elige la misma
+jugada que find_best_move_minimax con cada driver, el valor de cada
+hijo es exacto por encima de alpha y cada proceso usa una tabla del
+tamaño que pide el agente.
+"""
+
+import pytest
+from src.agents import MinimaxAgent
+from src.bitboard import BitBoard, as_bitboard
+from src.evaluation import IncrementalBitBoard
+from src.minimax_search import DRIVERS, INFINITY, _search_root, find_best_move_minimax
+from src.move_ordering import MoveOrderer
+from src.parallel_search import ParallelSearcher, _child_value, _generations, _worker_tables
+from src.transposition import TranspositionTable
+from .positions import random_positions
+
+
+@pytest.mark.parametrize("driver", DRIVERS)
+def test_child_values_are_exact_above_alpha(driver):
+    for i, pos in enumerate(random_positions(14, 30, max_moves=25)):
+        depth = 1 + i % 5
+        root = as_bitboard(pos, pos.player, IncrementalBitBoard)
+        _, best, _ = _search_root(root, depth, root.get_valid_moves())
+        for col in root.get_valid_moves():
+            child = IncrementalBitBoard.from_bitboard(root)
+            child.make_move(col)
+            exact = _child_value(child, depth, -INFINITY, TranspositionTable(1), None, driver)
+            bounded = _child_value(child, depth, best, TranspositionTable(1), None, driver)
+            assert exact <= best
+            # Por encima de alpha, el valor exacto; si no, una cota superior
+            assert bounded == exact if exact > best else bounded <= best
+
+
+@pytest.mark.parametrize("driver", DRIVERS)
+def test_parallel_matches_serial_search(driver):
+    with ParallelSearcher(workers=2, driver=driver) as searcher:
+        for i, pos in enumerate(random_positions(15, 8, max_moves=20)):
+            depth = 3 + i % 3
+            searcher.clear()
+            serial = find_best_move_minimax(pos, depth, pos.player, TranspositionTable(max_mb=4),
+                                            MoveOrderer(), driver=driver)
+            assert searcher.find_best_move(pos, depth, pos.player) == serial, (pos.history, depth)
+
+
+@pytest.mark.parametrize("tt_mb", [0, 1, 16])
+def test_agent_passes_its_table_size_to_each_worker(tt_mb):
+    agent = MinimaxAgent(workers=2, tt_mb=tt_mb)
+    assert agent.parallel.tt_mb == tt_mb
+    # Así crea sus tablas cada proceso (aquí, en el propio proceso del test)
+    tt, _ = _worker_tables((next(_generations), 1), 2, BitBoard(), False, agent.parallel.tt_mb, "alphabeta")
+    if tt_mb:
+        assert tt.max_mb == tt_mb
+    else:
+        assert tt is None
+    agent.close()
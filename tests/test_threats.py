@@ -0,0 +1,68 @@
+"""
+Resultados forzados del análisis de amenazas frente al EndgameSolver en
+tableros pequeños: las victorias y derrotas que dan Minimax (a cualquier
+profundidad) y Expectimax (_forced_value) son reales y no más lentas que
+las exactas.
+"""
+
+import pytest
+from src.endgame_solver import EndgameSolver, win_distance
+from src.evaluation import IncrementalBitBoard, mate_distance
+from src.expectimax_search import _forced_value
+from src.geometry import get_geometry
+from src.minimax_search import INFINITY, negamax
+from .positions import random_positions
+
+GEOMETRIES = (get_geometry(4, 5, 3), get_geometry(4, 4, 3), get_geometry(5, 6, 4))
+EMPTY = 10
+
+
+def _endgames(seed, count):
+    """'count' posiciones por variante con entre 1 y EMPTY casillas libres."""
+    for geometry in GEOMETRIES:
+        yield from random_positions(seed, count, [geometry], geometry.size - EMPTY, geometry.size - 1)
+
+
+def _exact(solver, pos):
+    """Jugadas hasta la victoria con juego perfecto (impar: gana quien mueve), o None."""
+    return win_distance(pos.moves, solver.solve(pos, pos.player), pos.geometry.size)
+
+
+@pytest.mark.parametrize("depth", [1, 2, 3, 4, EMPTY])
+def test_negamax_mates_match_solver(depth):
+    solver = EndgameSolver()
+    mates = 0
+    for pos in _endgames(21, 40):
+        exact = _exact(solver, pos)
+        search = IncrementalBitBoard.from_bitboard(pos)
+        value = negamax(search, depth, -INFINITY, INFINITY)
+        distance = mate_distance(value, pos.moves, pos.geometry)
+        if depth >= pos.geometry.size - pos.moves:
+            # Hasta el final del tablero el valor es exacto
+            assert distance == exact, (pos.history, depth)
+            if exact is None:
+                assert value == 0
+        elif distance is not None:
+            # Una victoria o derrota encontrada antes del final es real y
+            # como mucho tan lenta como la exacta
+            mates += 1
+            assert exact is not None and exact % 2 == distance % 2, (pos.history, depth)
+            assert exact <= distance, (pos.history, depth)
+    if depth < EMPTY:
+        assert mates > 0
+
+
+def test_expectimax_forced_values_match_solver():
+    solver = EndgameSolver()
+    forced = 0
+    for pos in _endgames(22, 40):
+        for maximizing in (True, False):
+            if _forced_value(pos, maximizing) is None:
+                continue
+            forced += 1
+            exact = _exact(solver, pos)
+            if maximizing:
+                assert exact == 1, pos.history  # Victoria inmediata de MAX
+            else:
+                assert exact == 2, pos.history  # El rival pierde haga lo que haga
+    assert forced > 0
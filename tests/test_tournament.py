@@ -0,0 +1,37 @@
+"""
+Torneos en otra variante: las partidas se juegan en la geometría pedida
+y el fichero de resultados la guarda y la exige al reanudar. Los agentes
+Minimax del torneo resuelven los finales con el solver.
+"""
+
+import pytest
+from src.agents import ENDGAME_CELLS
+from src.bitboard import BitBoard
+from src.config import MAX_PLAYER
+from src.game_records import read_geometry, read_records
+from src.geometry import get_geometry
+from src.tournament import AgentSpec, run_tournament
+
+
+def test_tournament_plays_the_variant(tmp_path):
+    path = str(tmp_path / "variant.c4g")
+    geometry = get_geometry(4, 5, 3)
+    specs = [AgentSpec.parse("minimax:2"), AgentSpec.parse("random")]
+    records = list(run_tournament(specs, games_per_pair=2, results_path=path, geometry=geometry))
+    assert len(records) == 4
+    assert read_geometry(path) is geometry
+    for record in read_records(path):
+        pos = BitBoard(geometry)
+        for col in record.moves:
+            assert not pos.is_terminal() and pos.can_play(col)
+            pos.make_move(col)
+        assert pos.is_terminal()
+    # Reanudar en la misma variante no repite partidas; en otra, falla
+    assert list(run_tournament(specs, games_per_pair=2, results_path=path, geometry=geometry)) == []
+    with pytest.raises(ValueError):
+        list(run_tournament(specs, games_per_pair=2, results_path=path))
+
+
+def test_minimax_agents_solve_endgames():
+    agent = AgentSpec.parse("minimax:4").build(MAX_PLAYER)
+    assert agent.endgame_cells == ENDGAME_CELLS and agent.solver is not None